@@ -1,11 +1,12 @@
 package de.cispa.sflkitlib;
 
 import de.cispa.sflkitlib.events.JCodec;
+import de.cispa.sflkitlib.events.JCompressedOutputStream;
 import de.cispa.sflkitlib.events.JPickle;
 
-import java.io.FileNotFoundException;
 import java.io.FileOutputStream;
 import java.io.IOException;
+import java.io.OutputStream;
 import java.util.Collection;
 
 public class JLib {
@@ -13,18 +14,28 @@ public class JLib {
                                                         "EVENTS_PATH" : System.getenv(
             "EVENTS_PATH");
 
-    private static FileOutputStream EVENT_TRACE_FILE;
+    private static final String EVENT_TRACE_COMPRESSION = System.getenv("EVENTS_COMPRESSION");
+
+    private static OutputStream EVENT_TRACE_FILE;
 
     static {
         try {
-            EVENT_TRACE_FILE = new FileOutputStream(EVENT_TRACE_FILE_PATH);
-        } catch (FileNotFoundException e) {
+            EVENT_TRACE_FILE = open();
+        } catch (IOException e) {
             throw new RuntimeException(e);
         }
 
         Runtime.getRuntime().addShutdownHook(new Thread(JLib::dump_events));
     }
 
+    private static OutputStream open() throws IOException {
+        OutputStream stream = new FileOutputStream(EVENT_TRACE_FILE_PATH);
+        if ("zlib".equalsIgnoreCase(EVENT_TRACE_COMPRESSION)) {
+            return new JCompressedOutputStream(stream);
+        }
+        return stream;
+    }
+
     public static void dump_events() {
         try {
             EVENT_TRACE_FILE.flush();
@@ -40,8 +51,8 @@ public class JLib {
     public static void reset() {
         dump_events();
         try {
-            EVENT_TRACE_FILE = new FileOutputStream(EVENT_TRACE_FILE_PATH);
-        } catch (FileNotFoundException e) {
+            EVENT_TRACE_FILE = open();
+        } catch (IOException e) {
             throw new RuntimeException(e);
         }
     }
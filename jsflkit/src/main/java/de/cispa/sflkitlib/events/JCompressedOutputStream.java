@@ -0,0 +1,88 @@
+package de.cispa.sflkitlib.events;
+
+import java.io.ByteArrayOutputStream;
+import java.io.IOException;
+import java.io.OutputStream;
+import java.nio.charset.StandardCharsets;
+import java.util.zip.Deflater;
+
+public class JCompressedOutputStream extends OutputStream {
+    public static final byte[] MAGIC = "SFLKITZ".getBytes(StandardCharsets.US_ASCII);
+    public static final byte VERSION = 1;
+    public static final byte ZLIB = 1;
+    public static final int DEFAULT_BLOCK_SIZE = 1 << 20;
+
+    private final OutputStream out;
+    private final byte[] block;
+    private final byte[] chunk = new byte[65536];
+    private final Deflater deflater = new Deflater();
+    private int size = 0;
+
+    public JCompressedOutputStream(OutputStream out) throws IOException {
+        this(out, DEFAULT_BLOCK_SIZE);
+    }
+
+    public JCompressedOutputStream(OutputStream out, int blockSize) throws IOException {
+        this.out = out;
+        this.block = new byte[Math.max(blockSize, 1)];
+        out.write(MAGIC);
+        out.write(VERSION);
+        out.write(ZLIB);
+    }
+
+    @Override
+    public void write(int b) throws IOException {
+        block[size++] = (byte) b;
+        if (size == block.length) {
+            writeBlock();
+        }
+    }
+
+    @Override
+    public void write(byte[] b, int off, int len) throws IOException {
+        while (len > 0) {
+            int n = Math.min(len, block.length - size);
+            System.arraycopy(b, off, block, size, n);
+            size += n;
+            off += n;
+            len -= n;
+            if (size == block.length) {
+                writeBlock();
+            }
+        }
+    }
+
+    private void writeBlock() throws IOException {
+        if (size == 0) {
+            return;
+        }
+        deflater.reset();
+        deflater.setInput(block, 0, size);
+        deflater.finish();
+        ByteArrayOutputStream compressed = new ByteArrayOutputStream();
+        while (!deflater.finished()) {
+            int n = deflater.deflate(chunk);
+            compressed.write(chunk, 0, n);
+        }
+        out.write(JCodec.encodeInt(compressed.size()));
+        out.write(JCodec.encodeInt(size));
+        compressed.writeTo(out);
+        size = 0;
+    }
+
+    @Override
+    public void flush() throws IOException {
+        writeBlock();
+        out.flush();
+    }
+
+    @Override
+    public void close() throws IOException {
+        try {
+            flush();
+        } finally {
+            deflater.end();
+            out.close();
+        }
+    }
+}
@@ -1,9 +1,15 @@
 from os import PathLike
 from pathlib import Path
+from typing import Optional, List
 
 from sflkit.analysis.analyzer import Analyzer
+from sflkit.analysis.columns import dump_columns
+from sflkit.analysis.coverage import CoverageAnalyzer
+from sflkit.analysis.process import ProcessAnalyzer, PartialResult
 from sflkit.config import Config, parse_config
+from sflkit.events.store import EventStore, compact as compact_event_files
 from sflkit.instrumentation.dir_instrumentation import DirInstrumentation
+from sflkit.model.model import MetaModel
 
 __version__ = "0.5.7"
 
@@ -46,29 +52,83 @@ def run(config_path: PathLike, output: PathLike = None):
     run_config(conf, output)
 
 
-def analyze_config(conf: Config, analysis_dump: PathLike = None):
-    analyzer = Analyzer(conf.failing, conf.passing, conf.factory)
-    analyzer.analyze()
+def compact_config(conf: Config, output: PathLike = None) -> EventStore:
+    if output is None:
+        output = (Path.cwd() / "store").absolute()
+    return compact_event_files(conf.failing + conf.passing, output)
+
+
+def compact(config_path: PathLike, output: PathLike = None) -> EventStore:
+    conf = parse_config(config_path)
+    return compact_config(conf, output)
+
+
+def analyze_config(
+    conf: Config,
+    analysis_dump: PathLike = None,
+    partials: Optional[List[PathLike]] = None,
+):
+    if partials is not None:
+        analyzer = Analyzer(
+            meta_model=MetaModel(PartialResult.merge(partials).finalize())
+        )
+    else:
+        if CoverageAnalyzer.is_supported(conf.predicates):
+            analyzer = CoverageAnalyzer(conf.failing, conf.passing, conf.predicates)
+        else:
+            analyzer = Analyzer(
+                conf.failing, conf.passing, conf.factory, materialize=True
+            )
+        analyzer.analyze()
     if analysis_dump:
-        analyzer.dump(analysis_dump)
+        if str(analysis_dump).endswith(".npz"):
+            dump_columns(analyzer, analysis_dump)
+        else:
+            analyzer.dump(analysis_dump)
+    suggestions = analyzer.get_top_suggestions(
+        conf.target_path, conf.metrics, conf.predicates, k=None
+    )
     results = dict()
     for analysis_type in conf.predicates:
-        results[analysis_type.name] = dict()
-        for metric in conf.metrics:
-            try:
-                results[analysis_type.name][metric.__name__] = (
-                    analyzer.get_sorted_suggestions(
-                        conf.target_path, metric, analysis_type
-                    )
-                )
-            except (AttributeError, ValueError, TypeError) as e:
-                raise e
+        results[analysis_type.name] = {
+            metric.__name__: suggestions[analysis_type][metric]
+            for metric in conf.metrics
+        }
     return results
 
 
-def analyze(config_path: PathLike, analysis_dump: PathLike = None):
+def analyze(
+    config_path: PathLike,
+    analysis_dump: PathLike = None,
+    partials: Optional[List[PathLike]] = None,
+):
+    conf = parse_config(config_path)
+    return analyze_config(conf, analysis_dump, partials)
+
+
+def analyze_partial_config(
+    conf: Config, output: PathLike = None, workers: int = 4
+) -> PartialResult:
+    """
+    Analyzes the event files of the config and writes the observations of the
+    analysis objects to a partial result, which analyze_config can merge with
+    the partial results of other event files.
+    """
+    if output is None:
+        output = (Path.cwd() / "partial.json").absolute()
+    analyzer = ProcessAnalyzer(
+        conf.failing, conf.passing, conf.factory, workers=workers, materialize=True
+    )
+    result = analyzer.collect()
+    result.dump(output)
+    return result
+
+
+def analyze_partial(
+    config_path: PathLike, output: PathLike = None, workers: int = 4
+) -> PartialResult:
     conf = parse_config(config_path)
-    return analyze_config(conf, analysis_dump)
+    return analyze_partial_config(conf, output, workers)
 
 
 __all__ = [
@@ -82,6 +142,13 @@ __all__ = [
     "instrument_config",
     "analyze",
     "analyze_config",
+    "analyze_partial",
+    "analyze_partial_config",
+    "compact",
+    "compact_config",
     "Analyzer",
+    "CoverageAnalyzer",
+    "ProcessAnalyzer",
+    "PartialResult",
     "Config",
 ]
@@ -44,6 +44,10 @@ If you want to add new spectra or predicates, please register them here and in s
 
 
 class AnalysisObject(abc.ABC):
+    # the attributes keeping the observations of the runs, which an AnalysisTable
+    # removes from the objects it binds
+    RUNS = ("hits",)
+
     function_finder = None
     loop_finder = None
     branch_finder = None
@@ -59,6 +63,8 @@ class AnalysisObject(abc.ABC):
         self.suspiciousness: float = 0
         self.last_evaluation: EvaluationResult = EvaluationResult.UNOBSERVED
         self.hits: dict[EventFile, dict[Optional[int], Any]] = dict()
+        # the column of the object in the HitRecorder of its model, if any
+        self._column: Optional[int] = None
 
     def adjust_weight(self, event_file: EventFile, weight: float):
         pass
@@ -101,6 +107,51 @@ class AnalysisObject(abc.ABC):
     def hit(self, id_: EventFile, event, scope: Scope = None):
         raise NotImplementedError()
 
+    def hit_repeated(self, id_: EventFile, event, repeat: int, scope: Scope = None):
+        for _ in range(repeat):
+            self.hit(id_, event, scope=scope)
+
+    def observe(self, id_: EventFile, event, scope: Scope = None) -> bool:
+        """
+        Evaluates a hit as hit does and returns whether it observed the object,
+        without recording it in the hits of the object, e.g., to record it in a
+        HitRecorder instead.
+        """
+        raise NotImplementedError()
+
+    def observe_repeated(
+        self, id_: EventFile, event, repeat: int, scope: Scope = None
+    ) -> bool:
+        observed = False
+        for _ in range(repeat):
+            observed = self.observe(id_, event, scope=scope) or observed
+        return observed
+
+    def clear_runs(self):
+        """
+        Removes the hits of all runs, e.g., before the object is sent to another
+        process.
+        """
+        self.hits = dict()
+
+    def clear_run(self, event_file: EventFile):
+        """
+        Removes the hits of a single run.
+        """
+        self.hits.pop(event_file, None)
+
+    @abc.abstractmethod
+    def collapse(self, event_file: EventFile, failing: bool):
+        """
+        Counts the observations of a finished run as finalize does and removes its
+        hits, such that finalize only needs to compute the remaining counts.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def get_locations(self, metric=None, base_dir: str = ""):
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_suggestion(self):
         raise NotImplementedError()
@@ -1,10 +1,14 @@
+import heapq
 import json
 import os
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Callable, Set, Dict, Optional, Any, Type
+from typing import List, Callable, Set, Dict, Optional, Any, Type, Iterable, Tuple
+
+from sflkitlib.events.event import Event
 
 from sflkit.analysis.analysis_type import AnalysisType, AnalysisObject
 from sflkit.analysis.factory import AnalysisFactory
+from sflkit.analysis.matrix import HitRecorder
 from sflkit.analysis.predicate import (
     Branch,
     ScalarPair,
@@ -19,9 +23,14 @@ from sflkit.analysis.predicate import (
     Condition,
     FunctionErrorPredicate,
 )
+from sflkit.analysis.similarity import Counts, get_coefficient, get_metrics
 from sflkit.analysis.spectra import Line, Function, DefUse, Loop, Length
 from sflkit.analysis.suggestion import Suggestion
+from sflkit.analysis.table import AnalysisTable
 from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
+from sflkit.events.store import EventStore
+from sflkit.language.meta import IDGenerator
 from sflkit.model.model import Model, MetaModel
 from sflkit.model.parallel import ParallelModel
 
@@ -44,6 +53,9 @@ class Analyzer:
         model_class: Type[Model] = None,
         parallel: bool = False,
         workers: int = 4,
+        materialize: bool = False,
+        streaming: bool = False,
+        table: bool = False,
     ):
         if (
             relevant_event_files is None
@@ -66,7 +78,18 @@ class Analyzer:
                 else:
                     model_class = Model
             self.model = model_class(factory)
+            self.model.streaming = streaming
+            if table:
+                self.model.table = AnalysisTable()
+            # the parallel models keep the hits of the objects for their weights
+            # and the streaming mode collapses them after every run, otherwise the
+            # objects are bound to the table as soon as they were recorded
+            if not streaming and not isinstance(self.model, ParallelModel):
+                self.model.recorder = HitRecorder(self.model.table)
         self.workers = workers
+        # create the analysis objects of the static factories from the mapping
+        # before analyzing the event files
+        self.materialize = materialize
         self.paths: Dict[int, os.PathLike] = dict()
         self.max_suspiciousness = 0
         self.min_suspiciousness = 0
@@ -74,12 +97,26 @@ class Analyzer:
         self.median_suspiciousness = 0
 
     def _analyze(self, event_file):
+        with event_file:
+            self.analyze_runs(event_file, event_file.load_runs())
+
+    def analyze_runs(
+        self, event_file: EventFile, runs: Iterable[Tuple[Event, int]]
+    ) -> None:
+        """
+        Analyzes the run length encoded events of a single event file, e.g., while
+        they are streamed from a running test. If the analysis fails, the
+        observations of the event file are discarded and the error is raised.
+        """
         if self.meta:
             raise NotImplementedError("Not implemented for meta/loaded analyzer")
         self.model.prepare(event_file)
-        with event_file:
-            for event in event_file.load():
-                event.handle(self.model, event_file)
+        try:
+            for event, repeat in runs:
+                self.model.handle_repeated(event, event_file, repeat)
+        except BaseException:
+            self.model.discard(event_file)
+            raise
         self.model.follow_up(event_file)
 
     def _finalize(self):
@@ -90,14 +127,22 @@ class Analyzer:
     def analyze(self):
         if self.meta:
             raise NotImplementedError("Not implemented for meta/loaded analyzer")
+        event_files = self.relevant_event_files + self.irrelevant_event_files
+        if self.model.streaming:
+            # the runs are collapsed by whether they failed once they are analyzed
+            for event_file in self.relevant_event_files:
+                event_file.failing = True
+            for event_file in self.irrelevant_event_files:
+                event_file.failing = False
+        if self.materialize and event_files:
+            self.model.factory.materialize(event_files[0].mapping)
         if self.workers > 1:
-            event_files = self.relevant_event_files + self.irrelevant_event_files
             for event_file in event_files:
                 self.paths[event_file.run_id] = event_file.path
             with ThreadPoolExecutor(max_workers=self.workers) as executor:
                 list(executor.map(self._analyze, event_files))
         else:
-            for event_file in self.relevant_event_files + self.irrelevant_event_files:
+            for event_file in event_files:
                 self.paths[event_file.run_id] = event_file.path
                 self._analyze(event_file)
         self._finalize()
@@ -109,6 +154,22 @@ class Analyzer:
     def dumps(self, indent: Optional[int] = None):
         return json.dumps(self.get_analysis(), cls=AnalysisEncoder, indent=indent)
 
+    @staticmethod
+    def from_store(
+        path: os.PathLike,
+        mapping: EventMapping,
+        factory: AnalysisFactory,
+        **kwargs,
+    ):
+        store = EventStore(path)
+        run_id_generator = IDGenerator()
+        return Analyzer(
+            store.get_event_files(run_id_generator, mapping, failing=True),
+            store.get_event_files(run_id_generator, mapping, failing=False),
+            factory,
+            **kwargs,
+        )
+
     @staticmethod
     def load(path: os.PathLike):
         return Analyzer(meta_model=MetaModel(load_analysis_json(path)))
@@ -149,25 +210,34 @@ class Analyzer:
     ) -> List[Suggestion]:
         suggestions = dict()
         suspiciousness = list()
-        for suggestion in map(
-            lambda p: p.get_suggestion(
-                metric=metric, base_dir=base_dir, use_weight=use_weight
-            ),
-            analysis,
-        ):
+        analysis = list(analysis)
+        metrics = get_metrics(analysis, metric, use_weight=use_weight)
+        if metrics is None:
+            object_suggestions = map(
+                lambda p: p.get_suggestion(
+                    metric=metric, base_dir=base_dir, use_weight=use_weight
+                ),
+                analysis,
+            )
+        else:
+            # the similarity coefficients of all objects are computed at once and
+            # assigned to the objects as get_suggestion does
+            metrics = metrics.tolist()
+            for obj, value in zip(analysis, metrics):
+                obj.suspiciousness = value
+            object_suggestions = map(
+                lambda p, m: Suggestion(p.get_locations(metric, base_dir=base_dir), m),
+                analysis,
+                metrics,
+            )
+        for suggestion in object_suggestions:
             suspiciousness.append(suggestion.suspiciousness)
             if suggestion.suspiciousness not in suggestions:
                 suggestions[suggestion.suspiciousness] = set(suggestion.lines)
             else:
                 suggestions[suggestion.suspiciousness] |= set(suggestion.lines)
 
-        if suspiciousness:
-            self.max_suspiciousness = max(suspiciousness)
-            self.min_suspiciousness = min(suspiciousness)
-            self.mean_suspiciousness = sum(suspiciousness) / len(suspiciousness)
-            self.median_suspiciousness = sorted(suspiciousness)[
-                len(suspiciousness) // 2
-            ]
+        self._assign_statistics(suspiciousness)
 
         return sorted(
             [
@@ -177,9 +247,99 @@ class Analyzer:
             reverse=True,
         )[:]
 
+    def _assign_statistics(self, suspiciousness: List[float]):
+        if suspiciousness:
+            self.max_suspiciousness = max(suspiciousness)
+            self.min_suspiciousness = min(suspiciousness)
+            self.mean_suspiciousness = sum(suspiciousness) / len(suspiciousness)
+            self.median_suspiciousness = sorted(suspiciousness)[
+                len(suspiciousness) // 2
+            ]
+
+    def get_analysis_index(self) -> Dict[AnalysisType, List[AnalysisObject]]:
+        """
+        Groups the analysis objects by their type in a single pass.
+        """
+        index = dict()
+        for obj in self.model.get_analysis():
+            index.setdefault(obj.analysis_type(), []).append(obj)
+        return index
+
+    def get_top_suggestions(
+        self,
+        base_dir,
+        metrics: Iterable[Optional[Callable]] = (None,),
+        types: Optional[Iterable[AnalysisType]] = None,
+        k: Optional[int] = 100,
+        use_weight: bool = False,
+    ) -> Dict[Optional[AnalysisType], Dict[Optional[Callable], List[Suggestion]]]:
+        """
+        Returns for each type and metric the k sorted suggestions with the highest
+        suspiciousness, or all sorted suggestions if k is None. All combinations
+        are computed in one pass over the analysis objects, reusing their counts
+        for the similarity coefficients. If types is None, the objects of all
+        types are ranked together under the key None. Unlike get_suggestion, the
+        suspiciousness of the objects is not assigned, such that several metrics
+        can be computed at the same time.
+        """
+        if types is None:
+            groups = {None: list(self.model.get_analysis())}
+        else:
+            index = self.get_analysis_index()
+            groups = {type_: index.get(type_, []) for type_ in types}
+        metrics = list(metrics)
+        results = dict()
+        for type_, objects in groups.items():
+            results[type_] = dict()
+            counts = None
+            for metric in metrics:
+                values = None
+                if metric is None or get_coefficient(metric) is not None:
+                    if counts is None:
+                        counts = Counts.from_spectra(objects)
+                    values = get_metrics(
+                        objects, metric, use_weight=use_weight, counts=counts
+                    )
+                if values is None:
+                    values = [
+                        obj.get_metric(metric, use_weight=use_weight) for obj in objects
+                    ]
+                else:
+                    values = values.tolist()
+                results[type_][metric] = self._select_suggestions(
+                    base_dir, objects, values, metric, k
+                )
+        return results
+
+    @staticmethod
+    def _select_suggestions(
+        base_dir,
+        objects: List[AnalysisObject],
+        values: List[float],
+        metric: Optional[Callable],
+        k: Optional[int],
+    ) -> List[Suggestion]:
+        distinct = set(values)
+        if k is None:
+            top = sorted(distinct, reverse=True)
+        else:
+            top = heapq.nlargest(k, distinct)
+        # only the objects of the selected suggestions are located
+        lines = {value: set() for value in top}
+        for obj, value in zip(objects, values):
+            if value in lines:
+                lines[value].update(obj.get_locations(metric, base_dir=base_dir))
+        return [Suggestion(list(lines[value]), value) for value in top]
+
     def get_coverage_per_run(
         self, type_: AnalysisType = None
     ) -> Dict[EventFile, Set[AnalysisObject]]:
+        if getattr(self.model, "matrix", None) is not None:
+            return self.model.matrix.get_coverage_per_run(type_)
+        if getattr(self.model, "recorder", None) is not None:
+            return self.model.get_matrix(
+                self.relevant_event_files + self.irrelevant_event_files
+            ).get_coverage_per_run(type_)
         if type_:
             objects = self.get_analysis_by_type(type_)
         else:
@@ -0,0 +1,311 @@
+import heapq
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Any
+
+import numpy
+
+from sflkit.analysis.analysis_type import AnalysisType, AnalysisObject
+from sflkit.analysis.analyzer import Analyzer, deserialize
+from sflkit.analysis.similarity import Counts, get_coefficient
+from sflkit.analysis.suggestion import Suggestion
+from sflkit.model.model import MetaModel
+
+COLUMNS_VERSION = 1
+
+
+class AnalysisColumns:
+    """
+    The serialized analysis objects as columns, one per key of their serialized
+    form. Keys with integer values become an integer column, keys with numeric
+    values a float column and all other keys an index into a table of distinct
+    JSON encoded values, e.g., the files and variables. A mask marks the objects
+    that do not have a key. The columns are written to and read from a NumPy .npz
+    file, the objects are only deserialized when they are accessed.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, numpy.ndarray],
+        strings: Sequence[str],
+    ):
+        self.columns = columns
+        self.strings = list(strings)
+        self.types: numpy.ndarray = columns["int.type"]
+        self._values: Optional[List[Any]] = None
+        self._objects: Dict[int, AnalysisObject] = dict()
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> AnalysisObject:
+        return self.get_objects([index])[0]
+
+    def __iter__(self):
+        return iter(self.get_objects(range(len(self))))
+
+    @staticmethod
+    def from_objects(objects: Iterable[AnalysisObject]) -> "AnalysisColumns":
+        rows = [obj.serialize() for obj in objects]
+        keys = dict()
+        for row in rows:
+            for key in row:
+                keys[key] = None
+        strings = dict()
+        columns = dict()
+        for key in keys:
+            values = [row.get(key) for row in rows]
+            present = [key in row for row in rows]
+            if not all(present):
+                columns[f"missing.{key}"] = ~numpy.array(present, dtype=bool)
+            found = [value for value, p in zip(values, present) if p]
+            if all(type(value) is int for value in found):
+                columns[f"int.{key}"] = numpy.array(
+                    [value if p else 0 for value, p in zip(values, present)],
+                    dtype=numpy.int64,
+                )
+            elif all(type(value) in (int, float) for value in found):
+                columns[f"float.{key}"] = numpy.array(
+                    [value if p else 0 for value, p in zip(values, present)],
+                    dtype=numpy.float64,
+                )
+            else:
+                column = numpy.zeros(len(rows), dtype=numpy.int32)
+                for i, (value, p) in enumerate(zip(values, present)):
+                    if p:
+                        column[i] = strings.setdefault(json.dumps(value), len(strings))
+                columns[f"str.{key}"] = column
+        if "int.type" not in columns:
+            columns["int.type"] = numpy.zeros(len(rows), dtype=numpy.int64)
+        return AnalysisColumns(columns, list(strings))
+
+    def dump(self, path: os.PathLike):
+        with open(path, "wb") as f:
+            numpy.savez(
+                f,
+                version=numpy.array(COLUMNS_VERSION),
+                strings=numpy.array(self.strings, dtype=str),
+                **self.columns,
+            )
+
+    @staticmethod
+    def load(path: os.PathLike) -> "AnalysisColumns":
+        with numpy.load(path, allow_pickle=False) as data:
+            if "version" not in data or int(data["version"]) != COLUMNS_VERSION:
+                raise ValueError(f"{path} is not a columnar analysis")
+            columns = {
+                key: data[key]
+                for key in data.files
+                if key not in ("version", "strings")
+            }
+            return AnalysisColumns(columns, data["strings"].tolist())
+
+    def indices(self, type_: AnalysisType = None) -> numpy.ndarray:
+        """
+        Returns the indices of the objects of a type or of all objects.
+        """
+        if type_ is None:
+            return numpy.arange(len(self))
+        return numpy.flatnonzero(self.types == type_.value)
+
+    def _numbers(self, key: str, indices: numpy.ndarray) -> numpy.ndarray:
+        """
+        Returns the numeric values of a key for the objects at the indices, 0 for
+        the objects without the key, e.g., if no object was dumped.
+        """
+        for kind in ("int", "float"):
+            column = self.columns.get(f"{kind}.{key}")
+            if column is not None:
+                return column[indices]
+        if f"str.{key}" in self.columns:
+            raise ValueError(f"{key} is not a numeric column")
+        return numpy.zeros(len(indices), dtype=numpy.int64)
+
+    def _present(self, key: str, indices: numpy.ndarray) -> numpy.ndarray:
+        """
+        Returns a mask of the objects at the indices that have a key.
+        """
+        absent = self.columns.get(f"missing.{key}")
+        if absent is not None:
+            return ~absent[indices]
+        present = any(
+            f"{kind}.{key}" in self.columns for kind in ("int", "float", "str")
+        )
+        return numpy.full(len(indices), present, dtype=bool)
+
+    def get_counts(self, type_: AnalysisType = None) -> Counts:
+        """
+        Returns the counts of the objects of a type without deserializing them.
+        """
+        indices = self.indices(type_)
+        return Counts(
+            self._numbers("failed_observed", indices),
+            self._numbers("failed_not_observed", indices),
+            self._numbers("passed_observed", indices),
+            self._numbers("passed_not_observed", indices),
+        )
+
+    def get_metrics(
+        self,
+        type_: AnalysisType = None,
+        metric: Callable = None,
+        use_weight: bool = False,
+        counts: Optional[Counts] = None,
+    ) -> Optional[numpy.ndarray]:
+        """
+        Computes the suspiciousness of the objects of a type from their columns,
+        as their get_metric does, without deserializing them. Without a metric,
+        the spectra are ranked by Ochiai and the predicates by their increase of
+        true. Returns None if metric is not a similarity coefficient. The counts
+        of the objects can be passed to compute several metrics on them.
+        """
+        indices = self.indices(type_)
+        if counts is None:
+            counts = self.get_counts(type_)
+        if metric is None:
+            values = counts.compute("Ochiai")
+            predicates = self._present("increase_true", indices)
+            if predicates.any():
+                increase = self._numbers("increase_true", indices)[predicates]
+                values[predicates] = numpy.where(numpy.isnan(increase), 0, increase)
+        else:
+            name = get_coefficient(metric)
+            if name is None:
+                return None
+            values = counts.compute(name)
+        if use_weight:
+            values *= self._numbers("weight", indices)
+        return values
+
+    def get_objects(self, indices: Iterable[int]) -> List[AnalysisObject]:
+        """
+        Returns the objects with the given indices, deserializing those that were
+        not accessed before.
+        """
+        indices = list(indices)
+        missing = [index for index in indices if index not in self._objects]
+        if missing:
+            if self._values is None:
+                self._values = [json.loads(string) for string in self.strings]
+            rows = [dict() for _ in missing]
+            for name, column in self.columns.items():
+                kind, key = name.split(".", 1)
+                if kind == "missing":
+                    continue
+                values = column[missing].tolist()
+                if kind == "str":
+                    values = [self._values[value] for value in values]
+                absent = self.columns.get(f"missing.{key}")
+                if absent is None:
+                    for row, value in zip(rows, values):
+                        row[key] = value
+                else:
+                    for row, value, skip in zip(rows, values, absent[missing].tolist()):
+                        if not skip:
+                            row[key] = value
+            for index, row in zip(missing, rows):
+                self._objects[index] = deserialize(row)
+        return [self._objects[index] for index in indices]
+
+
+class ColumnarModel(MetaModel):
+    """
+    A model of loaded analysis columns that deserializes the analysis objects
+    the first time they are requested.
+    """
+
+    def __init__(self, columns: AnalysisColumns):
+        super().__init__()
+        self.columns = columns
+        self.loaded = False
+
+    def get_analysis(self) -> Set[AnalysisObject]:
+        if not self.loaded:
+            self.analysis_objects = set(self.columns)
+            self.loaded = True
+        return self.analysis_objects
+
+
+class ColumnarAnalyzer(Analyzer):
+    """
+    An analyzer of loaded analysis columns that ranks the objects from their
+    columns and only deserializes the objects it needs for the suggestions.
+    """
+
+    def __init__(self, columns: AnalysisColumns):
+        super().__init__(meta_model=ColumnarModel(columns))
+        self.columns = columns
+
+    def get_sorted_suggestions(
+        self,
+        base_dir,
+        metric: Callable = None,
+        type_: AnalysisType = None,
+        use_weight: bool = False,
+    ) -> List[Suggestion]:
+        values = self.columns.get_metrics(type_, metric, use_weight=use_weight)
+        if values is None:
+            return super().get_sorted_suggestions(
+                base_dir, metric=metric, type_=type_, use_weight=use_weight
+            )
+        # all objects are located, such that all of them are deserialized
+        objects = self.columns.get_objects(self.columns.indices(type_).tolist())
+        values = values.tolist()
+        for obj, value in zip(objects, values):
+            obj.suspiciousness = value
+        self._assign_statistics(values)
+        return self._select_suggestions(base_dir, objects, values, metric, None)
+
+    def get_top_suggestions(
+        self,
+        base_dir,
+        metrics: Iterable[Optional[Callable]] = (None,),
+        types: Optional[Iterable[AnalysisType]] = None,
+        k: Optional[int] = 100,
+        use_weight: bool = False,
+    ) -> Dict[Optional[AnalysisType], Dict[Optional[Callable], List[Suggestion]]]:
+        """
+        Returns the suggestions as Analyzer.get_top_suggestions does, but ranks the
+        objects from their count columns and only deserializes the objects with
+        one of the k highest suspiciousness values.
+        """
+        metrics = list(metrics)
+        results = dict()
+        for type_ in [None] if types is None else types:
+            results[type_] = dict()
+            indices = self.columns.indices(type_)
+            counts = self.columns.get_counts(type_)
+            for metric in metrics:
+                values = self.columns.get_metrics(
+                    type_, metric, use_weight=use_weight, counts=counts
+                )
+                if values is None:
+                    objects = self.columns.get_objects(indices.tolist())
+                    values = [
+                        obj.get_metric(metric, use_weight=use_weight) for obj in objects
+                    ]
+                    results[type_][metric] = self._select_suggestions(
+                        base_dir, objects, values, metric, k
+                    )
+                    continue
+                values = values.tolist()
+                distinct = set(values)
+                if k is not None:
+                    distinct = set(heapq.nlargest(k, distinct))
+                selected = [i for i, value in enumerate(values) if value in distinct]
+                results[type_][metric] = self._select_suggestions(
+                    base_dir,
+                    self.columns.get_objects(indices[selected].tolist()),
+                    [values[i] for i in selected],
+                    metric,
+                    k,
+                )
+        return results
+
+
+def dump_columns(analyzer: Analyzer, path: os.PathLike):
+    AnalysisColumns.from_objects(analyzer.get_analysis()).dump(path)
+
+
+def load_columns(path: os.PathLike) -> ColumnarAnalyzer:
+    return ColumnarAnalyzer(AnalysisColumns.load(path))
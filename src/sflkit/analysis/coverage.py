@@ -0,0 +1,175 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Collection, Dict, Set, Tuple
+
+import numpy
+from sflkitlib.events import EventType
+
+from sflkit.analysis.analysis_type import AnalysisType, AnalysisObject
+from sflkit.analysis.analyzer import Analyzer
+from sflkit.analysis.matrix import HitMatrix
+from sflkit.analysis.predicate import Branch
+from sflkit.analysis.spectra import Line, Function, Spectrum
+from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
+from sflkit.model.model import MetaModel
+
+COVERAGE_TYPES = {AnalysisType.LINE, AnalysisType.BRANCH, AnalysisType.FUNCTION}
+
+
+class CoverageAnalyzer(Analyzer):
+    """
+    An analyzer for the spectra that only depend on whether an event occurred in a
+    run, i.e., lines, functions and branches. Instead of handling every event, it
+    collects the unique event ids of each run and derives the observations of all
+    analysis objects from a runs x objects coverage matrix. The resulting analysis
+    objects and suggestions equal those of the Analyzer.
+    """
+
+    def __init__(
+        self,
+        relevant_event_files: List[EventFile],
+        irrelevant_event_files: List[EventFile],
+        analysis_types: Optional[Collection[AnalysisType]] = None,
+        else_: bool = True,
+        workers: int = 4,
+    ):
+        super().__init__(meta_model=MetaModel(), workers=workers)
+        self.relevant_event_files = relevant_event_files
+        self.irrelevant_event_files = irrelevant_event_files
+        self.analysis_types = set(analysis_types or COVERAGE_TYPES)
+        if not self.analysis_types <= COVERAGE_TYPES:
+            raise ValueError(
+                f"Coverage analysis does not support "
+                f"{', '.join(map(str, self.analysis_types - COVERAGE_TYPES))}"
+            )
+        self.else_ = else_
+        self.event_files: List[EventFile] = list()
+        self.objects: List[Spectrum] = list()
+        # whether an object was hit in a run and whether it was hit or evaluated,
+        # which only differs for branches whose other branch was taken
+        self.matrix: Optional[HitMatrix] = None
+
+    @staticmethod
+    def is_supported(analysis_types: Collection[AnalysisType]) -> bool:
+        return bool(analysis_types) and set(analysis_types) <= COVERAGE_TYPES
+
+    def _get_keys(
+        self, mapping: EventMapping
+    ) -> Tuple[List[Tuple], numpy.ndarray, numpy.ndarray]:
+        """
+        Builds the keys of all objects the events of the mapping can hit together
+        with two dense arrays mapping an event id to the object it observes and to
+        the object it only evaluates, -1 if there is none.
+        """
+        size = max(mapping.mapping, default=-1) + 1
+        observes = numpy.full(size, -1, dtype=numpy.int64)
+        evaluates = numpy.full(size, -1, dtype=numpy.int64)
+        keys = dict()
+        for event_id, event in mapping.mapping.items():
+            if not mapping.is_valid(event):
+                continue
+            if (
+                event.event_type == EventType.LINE
+                and AnalysisType.LINE in self.analysis_types
+            ):
+                key = (Line.analysis_type(), event.file, event.line)
+                observes[event_id] = keys.setdefault(key, (len(keys), event))[0]
+            elif (
+                event.event_type == EventType.FUNCTION_ENTER
+                and AnalysisType.FUNCTION in self.analysis_types
+            ):
+                key = (
+                    Function.analysis_type(),
+                    event.file,
+                    event.line,
+                    event.function_id,
+                )
+                observes[event_id] = keys.setdefault(key, (len(keys), event))[0]
+            elif (
+                event.event_type == EventType.BRANCH
+                and AnalysisType.BRANCH in self.analysis_types
+            ):
+                then = event.then_id < event.else_id
+                key = (Branch.analysis_type(), event.file, event.line, event.then_id)
+                observes[event_id] = keys.setdefault(
+                    key, (len(keys), (event, then, event.then_id))
+                )[0]
+                if self.else_ and event.else_id >= 0:
+                    key = (
+                        Branch.analysis_type(),
+                        event.file,
+                        event.line,
+                        event.else_id,
+                    )
+                    evaluates[event_id] = keys.setdefault(
+                        key, (len(keys), (event, not then, event.else_id))
+                    )[0]
+        return list(keys.items()), observes, evaluates
+
+    @staticmethod
+    def _create_object(key: Tuple, event) -> Spectrum:
+        if key[0] == AnalysisType.LINE:
+            return Line(event)
+        elif key[0] == AnalysisType.FUNCTION:
+            return Function(event)
+        else:
+            event, then, then_id = event
+            return Branch(event, then=then, then_id=then_id)
+
+    @staticmethod
+    def _get_event_ids(event_file: EventFile) -> numpy.ndarray:
+        event_ids = [numpy.empty(0, dtype=numpy.int64)]
+        with event_file:
+            for batch in event_file.load_batches():
+                event_ids.append(numpy.unique(batch.event_ids))
+        return numpy.unique(numpy.concatenate(event_ids))
+
+    def analyze(self):
+        self.event_files = self.relevant_event_files + self.irrelevant_event_files
+        for event_file in self.event_files:
+            self.paths[event_file.run_id] = event_file.path
+        if not self.event_files:
+            self.model = MetaModel()
+            return
+        keys, observes, evaluates = self._get_keys(self.event_files[0].mapping)
+        observed = numpy.zeros((len(self.event_files), len(keys)), dtype=bool)
+        evaluated = numpy.zeros((len(self.event_files), len(keys)), dtype=bool)
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                runs = list(executor.map(self._get_event_ids, self.event_files))
+        else:
+            runs = list(map(self._get_event_ids, self.event_files))
+        for run, event_ids in enumerate(runs):
+            event_ids = event_ids[event_ids < len(observes)]
+            objects = observes[event_ids]
+            objects = objects[objects >= 0]
+            observed[run, objects] = True
+            evaluated[run, objects] = True
+            objects = evaluates[event_ids]
+            evaluated[run, objects[objects >= 0]] = True
+        # only objects hit or evaluated in some run exist, as with the factories
+        present = numpy.flatnonzero(evaluated.any(axis=0))
+        self.objects = [
+            self._create_object(keys[i][0], keys[i][1][1]) for i in present.tolist()
+        ]
+        self.matrix = HitMatrix.from_arrays(
+            self.event_files,
+            self.objects,
+            observed[:, present],
+            evaluated[:, present],
+        )
+        self._finalize()
+        self.model = MetaModel(set(self.objects))
+
+    def _finalize(self):
+        self.matrix.finalize(
+            range(len(self.relevant_event_files), len(self.event_files)),
+            range(len(self.relevant_event_files)),
+        )
+
+    def get_coverage_per_run(
+        self, type_: AnalysisType = None
+    ) -> Dict[EventFile, Set[AnalysisObject]]:
+        if self.matrix is None:
+            return dict()
+        return self.matrix.get_coverage_per_run(type_)
@@ -1,6 +1,8 @@
 import abc
+import bisect
+import zlib
 from threading import Lock
-from typing import List, Type, Set
+from typing import List, Type, Set, Optional, FrozenSet, Dict, Tuple, Sequence
 
 from sflkitlib.events import EventType
 from sflkitlib.events.event import DefEvent
@@ -10,6 +12,7 @@ from sflkit.analysis.predicate import (
     Branch,
     Condition,
     Comp,
+    ComparisonGroup,
     ScalarPair,
     VariablePredicate,
     ReturnPredicate,
@@ -23,14 +26,42 @@ from sflkit.analysis.predicate import (
 )
 from sflkit.analysis.spectra import Line, Function, Loop, DefUse, Length
 from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
 from sflkit.model.scope import Scope
 
+# the event types entering and exiting the scopes of the model
+SCOPE_EVENT_TYPES = frozenset(
+    {EventType.FUNCTION_ENTER, EventType.FUNCTION_EXIT, EventType.FUNCTION_ERROR}
+)
+
 
 class AnalysisFactory(abc.ABC):
+    # the event types for which the factory can return analysis objects, None if
+    # the factory needs to see all events
+    EVENT_TYPES: Optional[FrozenSet[EventType]] = None
+    # whether the factory depends on the variable scopes of the model, which are
+    # entered and exited by the SCOPE_EVENT_TYPES
+    SCOPED = False
+
     def __init__(self):
         self.objects = dict()
         self._lock = Lock()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def event_types(self) -> Optional[FrozenSet[EventType]]:
+        return self.EVENT_TYPES
+
+    def is_scoped(self) -> bool:
+        return self.SCOPED
+
     @abc.abstractmethod
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
@@ -44,9 +75,25 @@ class AnalysisFactory(abc.ABC):
         else:
             return self.default()
 
+    def handle_repeated(
+        self, event, event_file: EventFile, repeat: int, scope: Scope = None
+    ):
+        """
+        Handles an event that occurred repeat times in a row. The analysis objects
+        are looked up once, hitting them repeat times is left to the caller.
+        """
+        return self.handle(event, event_file, scope=scope)
+
     def reset(self, event_file: EventFile):
         pass
 
+    def materialize(self, mapping: EventMapping):
+        """
+        Creates the analysis objects of all events in mapping upfront, if the
+        factory supports it.
+        """
+        pass
+
     @staticmethod
     def default():
         return list()
@@ -59,36 +106,141 @@ class CombinationFactory(AnalysisFactory):
     def __init__(self, factories: List[AnalysisFactory]):
         super().__init__()
         self.factories = factories
+        self.routes: Dict[EventType, Tuple[AnalysisFactory, ...]] = dict()
+        self.build_routes()
+
+    def build_routes(self):
+        """
+        Builds the table of the factories that handle each event type, such that an
+        event is only passed to the factories interested in it. Needs to be called
+        again if the factories change.
+        """
+        self.routes = {
+            event_type: tuple(
+                factory
+                for factory in self.factories
+                if factory.event_types() is None or event_type in factory.event_types()
+            )
+            for event_type in EventType
+        }
+
+    def event_types(self) -> Optional[FrozenSet[EventType]]:
+        event_types = set()
+        for factory in self.factories:
+            if factory.event_types() is None:
+                return None
+            event_types.update(factory.event_types())
+        return frozenset(event_types)
+
+    def is_scoped(self) -> bool:
+        return any(factory.is_scoped() for factory in self.factories)
 
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
-        return sum(
-            [factory.handle(event, event_file, scope) for factory in self.factories],
-            start=list(),
-        )
+        analysis = list()
+        for factory in self.routes.get(event.event_type, ()):
+            analysis.extend(factory.handle(event, event_file, scope))
+        return analysis
+
+    def handle_repeated(
+        self, event, event_file: EventFile, repeat: int, scope: Scope = None
+    ):
+        analysis = list()
+        for factory in self.routes.get(event.event_type, ()):
+            analysis.extend(factory.handle_repeated(event, event_file, repeat, scope))
+        return analysis
 
     def reset(self, event_file: EventFile):
         [f.reset(event_file) for f in self.factories]
 
+    def materialize(self, mapping: EventMapping):
+        [f.materialize(mapping) for f in self.factories]
+
     def get_all(self) -> Set[AnalysisObject]:
         return set().union(*map(lambda f: f.get_all(), self.factories))
 
 
-class LineFactory(AnalysisFactory):
+class StaticAnalysisFactory(AnalysisFactory, abc.ABC):
+    """
+    A factory whose analysis objects only depend on the events in the mapping and
+    not on the values of a run. Once materialized, the objects of an event are
+    looked up by its id without locking, and only the objects of events that
+    occurred are reported.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.materialized: Optional[List[Optional[Tuple[AnalysisObject, ...]]]] = None
+        self.seen: Optional[bytearray] = None
+
+    @abc.abstractmethod
+    def create(self, event) -> List:
+        """
+        Returns the analysis objects of event and creates the missing ones.
+        """
+        raise NotImplementedError()
+
+    def materialize(self, mapping: EventMapping):
+        events = [
+            event
+            for event in mapping.mapping.values()
+            if event.event_type in self.EVENT_TYPES
+        ]
+        size = max((event.event_id for event in mapping.mapping.values()), default=-1)
+        materialized = [None] * (size + 1)
+        for event in events:
+            materialized[event.event_id] = tuple(self.create(event))
+        seen = bytearray(size + 1)
+        if self.seen is not None:
+            # keep the events seen before materializing again
+            seen[: len(self.seen)] = self.seen[: len(seen)]
+        self.seen = seen
+        self.materialized = materialized
+
+    def get_objects(self, event) -> Sequence:
+        materialized = self.materialized
+        if materialized is not None and event.event_id < len(materialized):
+            objects = materialized[event.event_id]
+            if objects is not None:
+                self.seen[event.event_id] = 1
+                return objects
+        return self.create(event)
+
+    def _get_seen(self, objects: Set[AnalysisObject]) -> Set[AnalysisObject]:
+        if self.materialized is None:
+            return objects
+        seen, unseen = set(), set()
+        for event_id, materialized in enumerate(self.materialized):
+            if materialized:
+                (seen if self.seen[event_id] else unseen).update(materialized)
+        return objects - (unseen - seen)
+
+    def get_all(self) -> Set[AnalysisObject]:
+        return self._get_seen(super().get_all())
+
+
+class LineFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.LINE})
+
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
         if event.event_type == EventType.LINE:
-            key = (Line.analysis_type(), event.file, event.line)
-            with self._lock:
-                if key not in self.objects:
-                    self.objects[key] = Line(event)
-            return [self.objects[key]]
+            return self.get_objects(event)
         return []
 
+    def create(self, event) -> List[AnalysisObject]:
+        key = (Line.analysis_type(), event.file, event.line)
+        with self._lock:
+            if key not in self.objects:
+                self.objects[key] = Line(event)
+        return [self.objects[key]]
+
+
+class BranchFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.BRANCH})
 
-class BranchFactory(AnalysisFactory):
     def __init__(self, else_: bool = True):
         super().__init__()
         self.else_ = else_
@@ -97,43 +249,54 @@ class BranchFactory(AnalysisFactory):
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
         if event.event_type == EventType.BRANCH:
-            key = (Branch.analysis_type(), event.file, event.line, event.then_id)
-            then = event.then_id < event.else_id
+            return self.get_objects(event)
+        return []
+
+    def create(self, event) -> List[AnalysisObject]:
+        key = (Branch.analysis_type(), event.file, event.line, event.then_id)
+        then = event.then_id < event.else_id
+        with self._lock:
+            if key not in self.objects:
+                self.objects[key] = Branch(event, then=then, then_id=event.then_id)
+        if self.else_ and event.else_id >= 0:
+            else_key = (
+                Branch.analysis_type(),
+                event.file,
+                event.line,
+                event.else_id,
+            )
             with self._lock:
-                if key not in self.objects:
-                    self.objects[key] = Branch(event, then=then, then_id=event.then_id)
-            if self.else_ and event.else_id >= 0:
-                else_key = (
-                    Branch.analysis_type(),
-                    event.file,
-                    event.line,
-                    event.else_id,
-                )
-                with self._lock:
-                    if else_key not in self.objects:
-                        self.objects[else_key] = Branch(
-                            event, then=not then, then_id=event.else_id
-                        )
-                return [self.objects[key], self.objects[else_key]]
-            return [self.objects[key]]
+                if else_key not in self.objects:
+                    self.objects[else_key] = Branch(
+                        event, then=not then, then_id=event.else_id
+                    )
+            return [self.objects[key], self.objects[else_key]]
+        return [self.objects[key]]
 
-        return []
 
+class FunctionFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.FUNCTION_ENTER})
 
-class FunctionFactory(AnalysisFactory):
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
         if event.event_type == EventType.FUNCTION_ENTER:
-            key = (Function.analysis_type(), event.file, event.line, event.function_id)
-            with self._lock:
-                if key not in self.objects:
-                    self.objects[key] = Function(event)
-            return [self.objects[key]]
+            return self.get_objects(event)
         return []
 
+    def create(self, event) -> List[AnalysisObject]:
+        key = (Function.analysis_type(), event.file, event.line, event.function_id)
+        with self._lock:
+            if key not in self.objects:
+                self.objects[key] = Function(event)
+        return [self.objects[key]]
+
+
+class LoopFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset(
+        {EventType.LOOP_BEGIN, EventType.LOOP_HIT, EventType.LOOP_END}
+    )
 
-class LoopFactory(AnalysisFactory):
     def __init__(self, hit_0: bool = True, hit_1: bool = True, hit_more: bool = True):
         super().__init__()
         self.hit_0 = hit_0
@@ -141,7 +304,9 @@ class LoopFactory(AnalysisFactory):
         self.hit_more = hit_more
 
     def get_all(self) -> Set[AnalysisObject]:
-        return set(obj for value in self.objects.values() for obj in value)
+        return self._get_seen(
+            set(obj for value in self.objects.values() for obj in value)
+        )
 
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
@@ -151,29 +316,45 @@ class LoopFactory(AnalysisFactory):
             EventType.LOOP_HIT,
             EventType.LOOP_END,
         ):
-            key = (Loop.analysis_type(), event.file, event.line, event.loop_id)
-            with self._lock:
-                if key not in self.objects:
-                    self.objects[key] = []
-                    if self.hit_0:
-                        self.objects[key].append(Loop(event, Loop.evaluate_hit_0)),
-                    if self.hit_1:
-                        self.objects[key].append(Loop(event, Loop.evaluate_hit_1)),
-                    if self.hit_more:
-                        self.objects[key].append(Loop(event, Loop.evaluate_hit_more)),
+            objects = self.get_objects(event)
             if event.event_type == EventType.LOOP_BEGIN:
-                for obj in self.objects[key]:
+                for obj in objects:
                     obj.start_loop(thread_id=event.thread_id)
             elif event.event_type == EventType.LOOP_HIT:
-                for obj in self.objects[key]:
+                for obj in objects:
                     obj.hit_loop(thread_id=event.thread_id)
             elif event.event_type == EventType.LOOP_END:
-                return self.objects[key][:]
+                return list(objects)
             return list()
         return []
 
+    def create(self, event) -> List[AnalysisObject]:
+        key = (Loop.analysis_type(), event.file, event.line, event.loop_id)
+        with self._lock:
+            if key not in self.objects:
+                self.objects[key] = []
+                if self.hit_0:
+                    self.objects[key].append(Loop(event, Loop.evaluate_hit_0)),
+                if self.hit_1:
+                    self.objects[key].append(Loop(event, Loop.evaluate_hit_1)),
+                if self.hit_more:
+                    self.objects[key].append(Loop(event, Loop.evaluate_hit_more)),
+        return self.objects[key]
+
+    def handle_repeated(
+        self, event, event_file: EventFile, repeat: int, scope: Scope = None
+    ):
+        analysis = super().handle_repeated(event, event_file, repeat, scope=scope)
+        if event.event_type == EventType.LOOP_HIT and repeat > 1:
+            for obj in self.get_objects(event):
+                obj.hit_loop(thread_id=event.thread_id, hits=repeat - 1)
+        return analysis
+
 
 class DefUseFactory(AnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.DEF, EventType.USE})
+    SCOPED = True
+
     def __init__(self):
         super().__init__()
         self.id_to_def: dict[EventFile, dict[tuple[str, int], DefEvent]] = dict()
@@ -250,26 +431,32 @@ class DefUseFactory(AnalysisFactory):
         return []
 
 
-class ConditionFactory(AnalysisFactory):
+class ConditionFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.CONDITION})
+
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
-        objects = list()
         if event.event_type == EventType.CONDITION:
-            for negate in (True, False):
-                key = (
-                    Condition.analysis_type(),
-                    event.file,
-                    event.line,
-                    event.condition,
-                    negate,
-                )
-                with self._lock:
-                    if key not in self.objects:
-                        self.objects[key] = Condition(
-                            event.file, event.line, event.condition, negate=negate
-                        )
-                objects.append(self.objects[key])
+            return self.get_objects(event)
+        return []
+
+    def create(self, event) -> List[AnalysisObject]:
+        objects = list()
+        for negate in (True, False):
+            key = (
+                Condition.analysis_type(),
+                event.file,
+                event.line,
+                event.condition,
+                negate,
+            )
+            with self._lock:
+                if key not in self.objects:
+                    self.objects[key] = Condition(
+                        event.file, event.line, event.condition, negate=negate
+                    )
+            objects.append(self.objects[key])
         return objects
 
 
@@ -297,61 +484,186 @@ class ComparisonFactory(AnalysisFactory, abc.ABC):
             self.comparators.append(Comp.GT)
         if ge:
             self.comparators.append(Comp.GE)
+        # the predicates of the same pair of values, evaluated together
+        self.groups: Dict[Tuple, ComparisonGroup] = dict()
 
 
 class ScalarPairFactory(ComparisonFactory):
+    """
+    Creates the comparisons of a defined variable with the other visible
+    variables of a compatible type. The pairs of a definition site can be
+    budgeted: max_pairs bounds the number of other variables per site, max_depth
+    only considers the variables defined at most max_depth scopes above the
+    definition, e.g., 0 for the same function, and sample keeps a fraction of the
+    pairs. Both decisions rank the pairs by a hash of the pair and seed, sample
+    keeps the pairs of a rank below the fraction and max_pairs the max_pairs
+    pairs of the lowest ranks of a site. A pair of a lower rank evicts the pair
+    of the highest rank once the budget is exhausted, such that the pairs kept
+    are independent of the order of the events and of the scheduling of the
+    runs. A pair is kept only if it was kept from its first occurrence on, hence
+    it has seen all of its observations. The hashes of the rejected and evicted
+    pairs are remembered, suppressed counts each of these pairs once per site.
+    """
+
+    EVENT_TYPES = frozenset({EventType.DEF})
+    SCOPED = True
+
+    def __init__(
+        self,
+        eq: bool = True,
+        ne: bool = True,
+        lt: bool = True,
+        le: bool = True,
+        gt: bool = True,
+        ge: bool = True,
+        max_pairs: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        sample: float = 1.0,
+        seed: int = 0,
+    ):
+        super().__init__(eq=eq, ne=ne, lt=lt, le=le, gt=gt, ge=ge)
+        self.max_pairs = max_pairs
+        self.max_depth = max_depth
+        self.sample = sample
+        self.seed = seed
+        # the ranks and group keys of the kept pairs per definition site, sorted
+        self.pairs: Dict[Tuple[str, int, str], List[Tuple[int, Tuple]]] = dict()
+        # the hashes of the group keys of the rejected and evicted pairs
+        self.rejected: Set[int] = set()
+        # the number of rejected and evicted pairs per definition site
+        self.suppressed: Dict[Tuple[str, int, str], int] = dict()
+
+    def __getstate__(self):
+        # the hashes of the strings differ between processes, a rejected pair is
+        # rejected again by its rank after unpickling
+        state = super().__getstate__()
+        state["rejected"] = set()
+        return state
+
+    def get_suppressed(self, site: Optional[Tuple[str, int, str]] = None) -> int:
+        """
+        Returns the number of distinct candidate pairs rejected by the budgets,
+        for the definition site (file, line, var) or for all sites.
+        """
+        if site is None:
+            return sum(self.suppressed.values())
+        return self.suppressed.get(site, 0)
+
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
         if event.event_type == EventType.DEF:
-            variables = scope.get_all_vars()
+            if self.max_depth is None:
+                variables = scope.get_all_vars()
+            else:
+                variables = scope.get_vars(self.max_depth)
             objects = list()
             if event.type_ in ["int", "float", "bool", "str", "bytes"]:
                 for types in (["int", "float", "bool"], ["str"], ["bytes"]):
                     if event.type_ in types:
                         for variable in variables:
                             if variable.type_ in types:
-                                for comp in self.comparators:
-                                    key = (
-                                        ScalarPair.analysis_type(),
-                                        event.file,
-                                        event.line,
-                                        event.var,
-                                        variable.var,
-                                        comp,
-                                        types[0],
+                                group = self.get_group(
+                                    event, variable.var, types[0], self.comparators
+                                )
+                                if group is not None:
+                                    objects.extend(
+                                        group.evaluate(event_file, event, scope)
                                     )
-                                    with self._lock:
-                                        if key not in self.objects:
-                                            self.objects[key] = ScalarPair(
-                                                event, comp, variable.var
-                                            )
-                                    objects.append(self.objects[key])
             else:
-                for variable in variables:
-                    if variable.type_ == event.type_:
-                        for comp in (Comp.EQ, Comp.NE):
-                            if comp in self.comparators:
-                                key = (
-                                    ScalarPair.analysis_type(),
-                                    event.file,
-                                    event.line,
-                                    event.var,
-                                    variable.var,
-                                    comp,
-                                    event.type_,
-                                )
-                                with self._lock:
-                                    if key not in self.objects:
-                                        self.objects[key] = ScalarPair(
-                                            event, comp, variable.var
-                                        )
-                                objects.append(self.objects[key])
+                comparators = [
+                    comp for comp in (Comp.EQ, Comp.NE) if comp in self.comparators
+                ]
+                if comparators:
+                    for variable in variables:
+                        if variable.type_ == event.type_:
+                            group = self.get_group(
+                                event, variable.var, event.type_, comparators
+                            )
+                            if group is not None:
+                                objects.extend(group.evaluate(event_file, event, scope))
             return objects
         return []
 
+    def _rank(self, pair: Tuple[str, int, str, str, str]) -> int:
+        return zlib.crc32(":".join(map(str, (self.seed,) + pair)).encode())
+
+    def _reject(self, group_key: Tuple):
+        site = group_key[1:4]
+        self.rejected.add(hash(group_key))
+        self.suppressed[site] = self.suppressed.get(site, 0) + 1
+
+    def _evict(self, group_key: Tuple):
+        group = self.groups.pop(group_key)
+        for comp in group.comparisons:
+            self.objects.pop(group_key[:5] + (comp, group_key[5]), None)
+        self._reject(group_key)
+
+    def _admit(self, group_key: Tuple) -> bool:
+        """
+        Decides whether a pair that has no group yet is created, needs the lock.
+        A rejected pair is never admitted later, the sampling is deterministic and
+        the rank a pair needs to be kept at a site only decreases.
+        """
+        rank = self._rank(group_key[1:])
+        if self.sample < 1 and rank / 2**32 >= self.sample:
+            self._reject(group_key)
+            return False
+        if self.max_pairs is None:
+            return True
+        site = group_key[1:4]
+        kept = self.pairs.setdefault(site, list())
+        entry = (rank, group_key)
+        if len(kept) >= self.max_pairs:
+            if not kept or entry > kept[-1]:
+                self._reject(group_key)
+                return False
+            self._evict(kept.pop()[1])
+        bisect.insort(kept, entry)
+        return True
+
+    def get_group(
+        self, event, var: str, type_: str, comparators: List[Comp]
+    ) -> Optional[ComparisonGroup]:
+        group_key = (
+            ScalarPair.analysis_type(),
+            event.file,
+            event.line,
+            event.var,
+            var,
+            type_,
+        )
+        group = self.groups.get(group_key)
+        if group is None:
+            if hash(group_key) in self.rejected:
+                return None
+            with self._lock:
+                group = self.groups.get(group_key)
+                if group is None:
+                    if hash(group_key) in self.rejected or not self._admit(group_key):
+                        return None
+                    group = ComparisonGroup()
+                    for comp in comparators:
+                        key = (
+                            ScalarPair.analysis_type(),
+                            event.file,
+                            event.line,
+                            event.var,
+                            var,
+                            comp,
+                            type_,
+                        )
+                        if key not in self.objects:
+                            self.objects[key] = ScalarPair(event, comp, var)
+                        group.add(self.objects[key])
+                    self.groups[group_key] = group
+        return group
+
 
 class VariableFactory(ComparisonFactory):
+    EVENT_TYPES = frozenset({EventType.DEF})
+    SCOPED = True
+
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
@@ -360,25 +672,42 @@ class VariableFactory(ComparisonFactory):
             "float",
             "bool",
         ]:
-            objects = list()
-            for comp in self.comparators:
-                key = (
-                    VariablePredicate.analysis_type(),
-                    event.file,
-                    event.line,
-                    event.var,
-                    comp,
-                    "int",
-                )
-                with self._lock:
-                    if key not in self.objects:
-                        self.objects[key] = VariablePredicate(event, comp)
-                objects.append(self.objects[key])
-            return objects
+            return self.get_group(event).evaluate(event_file, event, scope)
         return []
 
+    def get_group(self, event) -> ComparisonGroup:
+        group_key = (
+            VariablePredicate.analysis_type(),
+            event.file,
+            event.line,
+            event.var,
+            "int",
+        )
+        group = self.groups.get(group_key)
+        if group is None:
+            with self._lock:
+                group = self.groups.get(group_key)
+                if group is None:
+                    group = ComparisonGroup()
+                    for comp in self.comparators:
+                        key = (
+                            VariablePredicate.analysis_type(),
+                            event.file,
+                            event.line,
+                            event.var,
+                            comp,
+                            "int",
+                        )
+                        if key not in self.objects:
+                            self.objects[key] = VariablePredicate(event, comp)
+                        group.add(self.objects[key])
+                    self.groups[group_key] = group
+        return group
+
 
 class ReturnFactory(ComparisonFactory):
+    EVENT_TYPES = frozenset({EventType.FUNCTION_EXIT})
+
     def get_analysis(
         self, event, event_file: EventFile, scope: Scope = None
     ) -> List[AnalysisObject]:
@@ -449,6 +778,8 @@ class ReturnFactory(ComparisonFactory):
 
 
 class ConstantCompFactory(AnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.DEF})
+
     def __init__(self, class_: Type[AnalysisObject]):
         super().__init__()
         self.class_ = class_
@@ -491,6 +822,8 @@ class EmptyBytesFactory(ConstantCompFactory):
 
 
 class PredicateFunctionFactory(AnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.DEF})
+
     def __init__(self, class_: Type[AnalysisObject]):
         super().__init__()
         self.class_ = class_
@@ -529,6 +862,8 @@ class ContainsSpecialFactory(PredicateFunctionFactory):
 
 
 class LengthFactory(AnalysisFactory):
+    EVENT_TYPES = frozenset({EventType.LEN})
+
     def __init__(
         self, length_0: bool = True, length_1: bool = True, length_more: bool = True
     ):
@@ -564,7 +899,11 @@ class LengthFactory(AnalysisFactory):
         return []
 
 
-class FunctionErrorFactory(AnalysisFactory):
+class FunctionErrorFactory(StaticAnalysisFactory):
+    EVENT_TYPES = frozenset(
+        {EventType.FUNCTION_ENTER, EventType.FUNCTION_ERROR, EventType.FUNCTION_EXIT}
+    )
+
     def __init__(self):
         super().__init__()
         self.function_mapping = dict()
@@ -574,22 +913,33 @@ class FunctionErrorFactory(AnalysisFactory):
     ) -> List[AnalysisObject]:
         if event.event_type == EventType.FUNCTION_ENTER:
             self.function_mapping[event.function_id] = event.line
-        if event.event_type in (EventType.FUNCTION_ERROR, EventType.FUNCTION_EXIT):
-            line = self.function_mapping.get(event.function_id, event.line)
-            key = (
-                FunctionErrorPredicate.analysis_type(),
-                event.file,
-                line,
-                event.function_id,
-            )
-            with self._lock:
-                if key not in self.objects:
-                    self.objects[key] = FunctionErrorPredicate(
-                        event.file, line, event.function
-                    )
-            return [self.objects[key]]
+        elif event.event_type in (EventType.FUNCTION_ERROR, EventType.FUNCTION_EXIT):
+            return self.get_objects(event)
         return []
 
+    def materialize(self, mapping: EventMapping):
+        for event in mapping.mapping.values():
+            if event.event_type == EventType.FUNCTION_ENTER:
+                self.function_mapping[event.function_id] = event.line
+        super().materialize(mapping)
+
+    def create(self, event) -> List[AnalysisObject]:
+        if event.event_type == EventType.FUNCTION_ENTER:
+            return []
+        line = self.function_mapping.get(event.function_id, event.line)
+        key = (
+            FunctionErrorPredicate.analysis_type(),
+            event.file,
+            line,
+            event.function_id,
+        )
+        with self._lock:
+            if key not in self.objects:
+                self.objects[key] = FunctionErrorPredicate(
+                    event.file, line, event.function
+                )
+        return [self.objects[key]]
+
 
 analysis_factory_mapping = {
     AnalysisType.LINE: LineFactory,
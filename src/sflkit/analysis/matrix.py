@@ -0,0 +1,334 @@
+from threading import Lock
+from typing import List, Dict, Set, Sequence, Optional, Tuple
+
+import numpy
+
+from sflkit.analysis.analysis_type import AnalysisType, AnalysisObject
+from sflkit.analysis.predicate import Predicate
+from sflkit.analysis.table import AnalysisTable
+from sflkit.events.event_file import EventFile
+
+
+class HitMatrix:
+    """
+    The observations of the analysis objects in a set of runs as two bit matrices
+    of runs x objects, packed along the runs, i.e., whether a run observed an
+    object, e.g., hit a line or evaluated a predicate to true, and whether a run
+    evaluated an object at all. The runs that evaluated a predicate without
+    observing it are its false observations. The counts of finalize become column
+    sums and the coverage of a run a row of the matrix.
+    """
+
+    def __init__(
+        self,
+        runs: Sequence[EventFile],
+        objects: Sequence[AnalysisObject],
+        observed: Optional[numpy.ndarray] = None,
+        evaluated: Optional[numpy.ndarray] = None,
+    ):
+        self.runs: List[EventFile] = list(runs)
+        self.objects: List[AnalysisObject] = list(objects)
+        self.run_index: Dict[EventFile, int] = {
+            run: index for index, run in enumerate(self.runs)
+        }
+        shape = ((len(self.runs) + 7) // 8, len(self.objects))
+        self.observed = (
+            numpy.zeros(shape, dtype=numpy.uint8) if observed is None else observed
+        )
+        self.evaluated = (
+            numpy.zeros(shape, dtype=numpy.uint8) if evaluated is None else evaluated
+        )
+
+    @staticmethod
+    def from_arrays(
+        runs: Sequence[EventFile],
+        objects: Sequence[AnalysisObject],
+        observed: numpy.ndarray,
+        evaluated: numpy.ndarray,
+    ) -> "HitMatrix":
+        """
+        Creates the matrix from two boolean arrays of runs x objects.
+        """
+        return HitMatrix(
+            runs,
+            objects,
+            numpy.packbits(observed, axis=0),
+            numpy.packbits(evaluated, axis=0),
+        )
+
+    @staticmethod
+    def from_hits(
+        runs: Sequence[EventFile], objects: Sequence[AnalysisObject]
+    ) -> "HitMatrix":
+        """
+        Creates the matrix from the hits of the objects in the runs. Only the runs
+        in which an object was hit are visited, not all runs for every object.
+        """
+        matrix = HitMatrix(runs, objects)
+        observed_runs, observed_objects = list(), list()
+        evaluated_runs, evaluated_objects = list(), list()
+        for index, obj in enumerate(matrix.objects):
+            for event_file in obj.hits:
+                run = matrix.run_index.get(event_file)
+                if run is None:
+                    continue
+                evaluated_runs.append(run)
+                evaluated_objects.append(index)
+                if obj._check_hits(event_file):
+                    observed_runs.append(run)
+                    observed_objects.append(index)
+        matrix.set(matrix.observed, observed_runs, observed_objects)
+        matrix.set(matrix.evaluated, evaluated_runs, evaluated_objects)
+        return matrix
+
+    @staticmethod
+    def set(matrix: numpy.ndarray, runs: Sequence[int], objects: Sequence[int]):
+        runs = numpy.asarray(runs, dtype=numpy.int64)
+        objects = numpy.asarray(objects, dtype=numpy.int64)
+        numpy.bitwise_or.at(
+            matrix,
+            (runs >> 3, objects),
+            (0x80 >> (runs & 7)).astype(numpy.uint8),
+        )
+
+    def column(self, index: int) -> Tuple[List[int], List[int]]:
+        """
+        Returns the indices of the runs that observed and that evaluated an object.
+        """
+        size = len(self.runs)
+        return (
+            numpy.flatnonzero(
+                numpy.unpackbits(self.observed[:, index])[:size]
+            ).tolist(),
+            numpy.flatnonzero(
+                numpy.unpackbits(self.evaluated[:, index])[:size]
+            ).tolist(),
+        )
+
+    def mask(self, runs: Sequence[int]) -> numpy.ndarray:
+        """
+        Returns the packed column of the given runs.
+        """
+        mask = numpy.zeros(len(self.runs), dtype=bool)
+        mask[numpy.asarray(runs, dtype=numpy.int64)] = True
+        return numpy.packbits(mask)
+
+    @staticmethod
+    def count(matrix: numpy.ndarray, mask: numpy.ndarray) -> numpy.ndarray:
+        """
+        Counts per object the runs in mask that are set in matrix.
+        """
+        return (
+            numpy.bitwise_count(matrix & mask[:, None])
+            .sum(axis=0, dtype=numpy.int64)
+            .reshape(matrix.shape[1])
+        )
+
+    def row(self, run: int) -> numpy.ndarray:
+        """
+        Returns the indices of the objects evaluated in a run.
+        """
+        return numpy.flatnonzero(self.evaluated[run >> 3] & (0x80 >> (run & 7)))
+
+    def finalize(
+        self,
+        passed: Sequence[int],
+        failed: Sequence[int],
+        table: Optional[AnalysisTable] = None,
+    ):
+        """
+        Adds the observations in the passed and failed runs to the counts of the
+        objects and computes their metrics, as AnalysisObject.analyze does. If a
+        table is given, the objects are bound to it and updated all at once.
+        """
+        passing, failing = self.mask(passed), self.mask(failed)
+        unobserved = self.evaluated & ~self.observed
+        failed_observed = self.count(self.observed, failing)
+        passed_observed = self.count(self.observed, passing)
+        failed_unobserved = self.count(unobserved, failing)
+        passed_unobserved = self.count(unobserved, passing)
+        if table is not None:
+            # bound objects keep no weights, as set_weight does without weights
+            weights = [
+                (
+                    sum(obj.weights.values()) / len(obj.weights)
+                    if obj._table is None and obj.weights
+                    else 0
+                )
+                for obj in self.objects
+            ]
+            rows = table.bind(self.objects)
+            table.finalize(
+                rows,
+                failed_observed,
+                passed_observed,
+                failed_unobserved,
+                passed_unobserved,
+                len(passed),
+                len(failed),
+            )
+            table.columns["weight"][rows] = weights
+            table.calculate(rows)
+            return
+        failed_observed = failed_observed.tolist()
+        passed_observed = passed_observed.tolist()
+        failed_unobserved = failed_unobserved.tolist()
+        passed_unobserved = passed_unobserved.tolist()
+        for i, obj in enumerate(self.objects):
+            obj.failed_observed += failed_observed[i]
+            obj.passed_observed += passed_observed[i]
+            obj.set_passed(len(passed))
+            obj.set_failed(len(failed))
+            obj.set_weight()
+            if isinstance(obj, Predicate):
+                obj.true_relevant += failed_observed[i]
+                obj.true_irrelevant += passed_observed[i]
+                obj.false_relevant += failed_unobserved[i]
+                obj.false_irrelevant += passed_unobserved[i]
+            obj.calculate()
+
+    def get_coverage_per_run(
+        self, type_: AnalysisType = None
+    ) -> Dict[EventFile, Set[AnalysisObject]]:
+        coverage = dict()
+        for run, event_file in enumerate(self.runs):
+            objects = {
+                self.objects[i]
+                for i in self.row(run).tolist()
+                if type_ is None or self.objects[i].analysis_type() == type_
+            }
+            if objects:
+                coverage[event_file] = objects
+        return coverage
+
+
+# the flags of an object in the buffer of a run
+EVALUATED = 1
+OBSERVED = 3
+
+
+class HitRecorder:
+    """
+    Records the observations of the analysis objects into the bit matrices of a
+    HitMatrix while the runs are analyzed, instead of counting the hits of every
+    object per run. Each object gets a column when it is first hit. A run records
+    into a buffer of one byte per object, which is packed into the matrices once
+    the run is finished, such that runs analyzed by different threads do not
+    share the bytes they update. If a table is given, the objects first hit in a
+    run are bound to it when the run is finished.
+    """
+
+    def __init__(self, table: Optional[AnalysisTable] = None):
+        self.runs: List[EventFile] = list()
+        self.objects: List[AnalysisObject] = list()
+        self.observed = numpy.zeros((0, 0), dtype=numpy.uint8)
+        self.evaluated = numpy.zeros((0, 0), dtype=numpy.uint8)
+        self.buffers: Dict[EventFile, bytearray] = dict()
+        self.table = table
+        self.bound = 0
+        self._lock = Lock()
+
+    def start(self, event_file: EventFile):
+        self.buffers[event_file] = bytearray(len(self.objects))
+
+    def get_column(self, obj: AnalysisObject) -> int:
+        column = obj._column
+        if (
+            column is None
+            or column >= len(self.objects)
+            or self.objects[column] is not obj
+        ):
+            with self._lock:
+                column = obj._column
+                if (
+                    column is None
+                    or column >= len(self.objects)
+                    or self.objects[column] is not obj
+                ):
+                    column = len(self.objects)
+                    self.objects.append(obj)
+                    obj._column = column
+        return column
+
+    def record(self, event_file: EventFile, obj: AnalysisObject, observed: bool):
+        column = self.get_column(obj)
+        buffer = self.buffers[event_file]
+        if column >= len(buffer):
+            buffer.extend(bytes(len(self.objects) - len(buffer)))
+        buffer[column] |= OBSERVED if observed else EVALUATED
+
+    def _grow(self, runs: int, objects: int):
+        rows, columns = self.observed.shape
+        if runs <= 8 * rows and objects <= columns:
+            return
+        shape = (
+            max((runs + 7) // 8, 2 * rows),
+            max(objects, 2 * columns if objects > columns else columns),
+        )
+        for name in ("observed", "evaluated"):
+            matrix = numpy.zeros(shape, dtype=numpy.uint8)
+            matrix[:rows, :columns] = getattr(self, name)
+            setattr(self, name, matrix)
+
+    def stop(self, event_file: EventFile):
+        """
+        Packs the buffer of a finished run into the matrices.
+        """
+        buffer = numpy.frombuffer(self.buffers.pop(event_file), dtype=numpy.uint8)
+        with self._lock:
+            run = len(self.runs)
+            self.runs.append(event_file)
+            self._grow(run + 1, len(self.objects))
+            bit = numpy.uint8(0x80 >> (run & 7))
+            self.evaluated[run >> 3, numpy.flatnonzero(buffer)] |= bit
+            self.observed[run >> 3, numpy.flatnonzero(buffer == OBSERVED)] |= bit
+            self._bind()
+
+    def discard(self, event_file: EventFile):
+        """
+        Drops the buffer of a run that was not analyzed completely, the objects
+        first hit in it keep their columns.
+        """
+        self.buffers.pop(event_file, None)
+        with self._lock:
+            self._bind()
+
+    def _bind(self):
+        if self.table is not None and self.bound < len(self.objects):
+            self.table.bind(self.objects[self.bound :])
+            self.bound = len(self.objects)
+
+    def get_matrix(
+        self, runs: Sequence[EventFile], objects: Sequence[AnalysisObject]
+    ) -> HitMatrix:
+        """
+        Returns the packed matrix of the given objects, without unpacking the
+        recorded bits. Its runs are the recorded runs followed by the given runs
+        that were not recorded, objects and runs that were not recorded have no
+        observations.
+        """
+        recorded = set(self.runs)
+        runs = self.runs + [run for run in runs if run not in recorded]
+        rows, width = (len(runs) + 7) // 8, len(self.objects)
+        columns = numpy.fromiter(
+            (
+                (
+                    obj._column
+                    if obj._column is not None
+                    and obj._column < width
+                    and self.objects[obj._column] is obj
+                    else width
+                )
+                for obj in objects
+            ),
+            dtype=numpy.int64,
+            count=len(objects),
+        )
+        matrices = list()
+        for matrix in (self.observed, self.evaluated):
+            # the column after the recorded objects is empty
+            padded = numpy.zeros((rows, width + 1), dtype=numpy.uint8)
+            recorded_rows = min(rows, matrix.shape[0])
+            padded[:recorded_rows, :width] = matrix[:recorded_rows, :width]
+            matrices.append(padded[:, columns])
+        return HitMatrix(runs, objects, *matrices)
@@ -1,6 +1,6 @@
 import enum
 from abc import ABC
-from typing import Tuple, Callable, Optional, List, Type, Any
+from typing import Tuple, Callable, Optional, List, Type, Any, Dict, Iterable
 
 from sflkitlib.events import EventType
 from sflkitlib.events.event import (
@@ -18,12 +18,25 @@ from sflkit.analysis.analysis_type import (
     AnalysisObject,
 )
 from sflkit.analysis.spectra import Spectrum
-from sflkit.analysis.suggestion import Suggestion, Location
+from sflkit.analysis.suggestion import Location
+from sflkit.analysis.table import Column
 from sflkit.events.event_file import EventFile
 from sflkit.model.scope import Scope
 
 
 class Predicate(Spectrum, ABC):
+    RUNS = Spectrum.RUNS + ("total_hits",)
+
+    true_relevant = Column()
+    false_relevant = Column()
+    true_irrelevant = Column()
+    false_irrelevant = Column()
+    fail_true = Column()
+    fail_false = Column()
+    context = Column()
+    increase_true = Column()
+    increase_false = Column()
+
     def __init__(self, file, line):
         super().__init__(file, line)
         self.true_relevant = 0
@@ -88,6 +101,27 @@ class Predicate(Spectrum, ABC):
                 else:
                     self.false_relevant_observed()
 
+    def clear_runs(self):
+        super().clear_runs()
+        self.total_hits = dict()
+
+    def clear_run(self, event_file: EventFile):
+        super().clear_run(event_file)
+        self.total_hits.pop(event_file, None)
+
+    def collapse(self, event_file: EventFile, failing: bool):
+        if event_file in self.hits:
+            if self._check_hits(event_file):
+                if failing:
+                    self.true_relevant_observed()
+                else:
+                    self.true_irrelevant_observed()
+            elif failing:
+                self.false_relevant_observed()
+            else:
+                self.false_irrelevant_observed()
+        super().collapse(event_file, failing)
+
     def hit(self, id_, event: Event, scope: Scope = None):
         if id_ not in self.total_hits:
             self.total_hits[id_] = dict()
@@ -99,7 +133,7 @@ class Predicate(Spectrum, ABC):
         if event.thread_id not in self.hits[id_]:
             self.hits[id_][event.thread_id] = 0
         self.total_hits[id_][event.thread_id] += 1
-        if self._evaluate_predicate(event, scope):
+        if self.observe(id_, event, scope=scope):
             self.hits[id_][event.thread_id] += 1
             self.last_evaluation[id_][event.thread_id] = EvaluationResult.TRUE
         else:
@@ -110,6 +144,17 @@ class Predicate(Spectrum, ABC):
             metric = Predicate.IncreaseTrue
         return super().get_metric(metric, use_weight=use_weight)
 
+    def observe(self, id_, event: Event, scope: Scope = None) -> bool:
+        return bool(self._evaluate(id_, event, scope))
+
+    def observe_repeated(
+        self, id_, event: Event, repeat: int, scope: Scope = None
+    ) -> bool:
+        return AnalysisObject.observe_repeated(self, id_, event, repeat, scope=scope)
+
+    def _evaluate(self, id_, event: Event, scope: Scope) -> bool:
+        return self._evaluate_predicate(event, scope)
+
     def _evaluate_predicate(self, event: Event, scope: Scope):
         return False
 
@@ -249,6 +294,17 @@ class Branch(Predicate):
         return [EventType.BRANCH]
 
     def hit(self, id_, event: BranchEvent, scope: Scope = None):
+        self.hit_repeated(id_, event, 1, scope=scope)
+
+    def observe(self, id_, event: BranchEvent, scope: Scope = None) -> bool:
+        return event.then_id == self.then_id
+
+    def observe_repeated(
+        self, id_, event: BranchEvent, repeat: int, scope: Scope = None
+    ) -> bool:
+        return self.observe(id_, event, scope=scope)
+
+    def hit_repeated(self, id_, event: BranchEvent, repeat: int, scope: Scope = None):
         if id_ not in self.total_hits:
             self.total_hits[id_] = dict()
         if event.thread_id not in self.total_hits[id_]:
@@ -258,24 +314,19 @@ class Branch(Predicate):
             self.last_evaluation[id_] = dict()
         if event.thread_id not in self.hits[id_]:
             self.hits[id_][event.thread_id] = 0
-        self.total_hits[id_][event.thread_id] += 1
-        if event.then_id == self.then_id:
-            self.hits[id_][event.thread_id] += 1
+        self.total_hits[id_][event.thread_id] += repeat
+        if self.observe(id_, event, scope=scope):
+            self.hits[id_][event.thread_id] += repeat
             self.last_evaluation[id_][event.thread_id] = EvaluationResult.TRUE
         else:
             self.last_evaluation[id_][event.thread_id] = EvaluationResult.FALSE
 
-    def get_suggestion(
-        self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
-    ):
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
         if metric == Predicate.IncreaseFalse:
             finder = self.branch_finder(self.file, self.line, not self.then)
         else:
             finder = self.branch_finder(self.file, self.line, self.then)
-        return Suggestion(
-            [Location(self.file, line) for line in finder.get_locations(base_dir)],
-            self.get_metric(metric, use_weight=use_weight),
-        )
+        return [Location(self.file, line) for line in finder.get_locations(base_dir)]
 
     def __str__(self):
         return f"{self.analysis_type()}:{self.file}:{self.line}:{'then' if self.then else 'else'}:{self.then_id}"
@@ -305,6 +356,39 @@ class Comp(enum.Enum):
         else:
             raise ValueError(f"Unknown comparison operator: {self}")
 
+    @staticmethod
+    def evaluate_all(x, y, comparators: Iterable["Comp"]) -> Dict["Comp", bool]:
+        """
+        Evaluates the comparators on the same pair of values. The values are only
+        compared for equality and ordering as far as the comparators need it, and
+        the results of the comparators are derived from these.
+        """
+        comparators = set(comparators)
+        equal = less = greater = False
+        if comparators & EQUALITY:
+            equal = bool(x == y)
+        if comparators & LESS:
+            less = bool(x < y)
+        if comparators & GREATER:
+            greater = bool(x > y)
+        results = dict()
+        for comp in comparators:
+            if comp == Comp.EQ:
+                results[comp] = equal
+            elif comp == Comp.NE:
+                results[comp] = not equal
+            elif comp == Comp.LT:
+                results[comp] = less
+            elif comp == Comp.LE:
+                results[comp] = less or equal
+            elif comp == Comp.GT:
+                results[comp] = greater
+            elif comp == Comp.GE:
+                results[comp] = greater or equal
+            else:
+                raise ValueError(f"Unknown comparison operator: {comp}")
+        return results
+
     def __repr__(self):
         return self.name
 
@@ -312,10 +396,64 @@ class Comp(enum.Enum):
         return self.name
 
 
+# the comparators that need the values to be compared for equality, for less
+# than and for greater than
+EQUALITY = frozenset({Comp.EQ, Comp.NE, Comp.LE, Comp.GE})
+LESS = frozenset({Comp.LT, Comp.LE})
+GREATER = frozenset({Comp.GT, Comp.GE})
+
+
+class ComparisonGroup:
+    """
+    The comparison predicates of the same pair of values, e.g., of a defined
+    variable and another visible variable. The factory evaluates the group once
+    per event, which looks up both values once and derives the results of all
+    comparators, and the predicates of the group take their results from it.
+    Only the results of the last evaluation are kept, for the run and event
+    that caused it. If the predicates are hit by another run or event, they
+    evaluate themselves.
+    """
+
+    def __init__(self):
+        self.comparisons: Dict[Comp, "Comparison"] = dict()
+        self.last: Optional[Tuple[EventFile, Event, Dict[Comp, bool]]] = None
+
+    def add(self, comparison: "Comparison"):
+        comparison.group = self
+        self.comparisons[comparison.op] = comparison
+
+    def evaluate(
+        self, event_file: EventFile, event: Event, scope: Scope
+    ) -> List["Comparison"]:
+        """
+        Evaluates the predicates of the group for the current values in scope and
+        returns the predicates.
+        """
+        comparisons = list(self.comparisons.values())
+        if comparisons:
+            self.last = (
+                event_file,
+                event,
+                Comp.evaluate_all(
+                    comparisons[0]._get_first(scope),
+                    comparisons[0]._get_second(scope),
+                    self.comparisons,
+                ),
+            )
+        return comparisons
+
+
 class Comparison(Predicate, ABC):
     def __init__(self, file, line, op: Comp):
         super().__init__(file, line)
         self.op = op
+        self.group: Optional[ComparisonGroup] = None
+
+    def __getstate__(self):
+        # the results of the group are only valid in the current analysis
+        state = super().__getstate__()
+        state["group"] = None
+        return state
 
     def serialize(self):
         default = super().serialize()
@@ -331,6 +469,13 @@ class Comparison(Predicate, ABC):
             EventType.FUNCTION_ERROR,
         ]
 
+    def _evaluate(self, id_, event: Event, scope: Scope) -> bool:
+        if self.group is not None:
+            last = self.group.last
+            if last is not None and last[0] is id_ and last[1] is event:
+                return last[2][self.op]
+        return self._evaluate_predicate(event, scope)
+
     def _evaluate_predicate(self, event: Event, scope_: Scope) -> bool:
         return self._compare(self._get_first(scope_), self._get_second(scope_))
 
@@ -1092,6 +1237,9 @@ class Condition(Predicate):
     def events():
         return [EventType.CONDITION]
 
+    def observe(self, id_, event: ConditionEvent, scope: Scope = None) -> bool:
+        return bool(event.value) != self.negate
+
     def hit(self, id_, event: ConditionEvent, scope: Scope = None):
         if id_ not in self.total_hits:
             self.total_hits[id_] = dict()
@@ -1104,7 +1252,7 @@ class Condition(Predicate):
             self.hits[id_][event.thread_id] = 0
             self.last_evaluation[id_][event.thread_id] = EvaluationResult.TRUE
         self.total_hits[id_][event.thread_id] += 1
-        if (self.negate and not event.value) or (not self.negate and event.value):
+        if self.observe(id_, event, scope=scope):
             self.hits[id_][event.thread_id] += 1
             self.last_evaluation[id_][event.thread_id] = EvaluationResult.TRUE
         else:
@@ -1182,14 +1330,9 @@ class FunctionErrorPredicate(Predicate):
     def _evaluate_predicate(self, event: Event, scope: Scope):
         return event.event_type == EventType.FUNCTION_ERROR
 
-    def get_suggestion(
-        self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
-    ):
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
         finder = self.function_finder(self.file, self.line, self.function)
-        return Suggestion(
-            [Location(self.file, line) for line in finder.get_locations(base_dir)],
-            self.get_metric(metric, use_weight=use_weight),
-        )
+        return [Location(self.file, line) for line in finder.get_locations(base_dir)]
 
     def __str__(self):
         return f"{self.analysis_type()}:{self.file}:{self.function}:{self.line}"
@@ -0,0 +1,470 @@
+import copy
+import json
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Set, Tuple, Type, Iterable
+
+from sflkit.analysis.analysis_type import AnalysisType, AnalysisObject
+from sflkit.analysis.analyzer import Analyzer, deserialize
+from sflkit.analysis.factory import AnalysisFactory
+from sflkit.analysis.predicate import Predicate
+from sflkit.analysis.spectra import Spectrum
+from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
+from sflkit.model.model import Model, MetaModel
+
+# an analysis object without the hits of its runs, the ids of the runs in which it
+# was observed and in which it was evaluated, and its weights per run
+Partial = Tuple[Spectrum, List[int], List[int], Dict[int, float]]
+
+# the state of a worker process, set once when the process starts
+_mappings: List[EventMapping] = list()
+_factory: bytes = b""
+_model_class: Type[Model] = Model
+_materialize: bool = False
+
+
+def _init_worker(
+    mappings: List[EventMapping],
+    factory: bytes,
+    model_class: Type[Model],
+    materialize: bool,
+):
+    global _mappings, _factory, _model_class, _materialize
+    _mappings = mappings
+    _factory = factory
+    _model_class = model_class
+    _materialize = materialize
+
+
+def _analyze_partial(event_files: List[Tuple[int, EventFile]]) -> List[Partial]:
+    for mapping, event_file in event_files:
+        event_file.mapping = _mappings[mapping]
+    event_files = [event_file for _, event_file in event_files]
+    return _collect_partial(event_files, _factory, _model_class, _materialize)
+
+
+def _collect_partial(
+    event_files: List[EventFile],
+    factory: bytes,
+    model_class: Type[Model],
+    materialize: bool,
+) -> List[Partial]:
+    analyzer = Analyzer(
+        event_files,
+        list(),
+        pickle.loads(factory),
+        model_class=model_class,
+        workers=1,
+    )
+    if materialize and event_files:
+        analyzer.model.factory.materialize(event_files[0].mapping)
+    for event_file in event_files:
+        analyzer._analyze(event_file)
+    matrix = analyzer.model.get_matrix(event_files)
+    partial = list()
+    for index, obj in enumerate(matrix.objects):
+        observed, evaluated = matrix.column(index)
+        observed = [matrix.runs[run].run_id for run in observed]
+        evaluated = [matrix.runs[run].run_id for run in evaluated]
+        weights = {e.run_id: weight for e, weight in obj.weights.items()}
+        obj.clear_runs()
+        partial.append((obj, observed, evaluated, weights))
+    return partial
+
+
+class PartialResult:
+    """
+    The observations of the analysis objects in a set of runs, i.e., for each
+    object the runs that observed it, the runs that evaluated it and its weights
+    per run. Partial results of disjoint sets of runs, e.g., analyzed on different
+    machines, can be merged and finalized into the analysis objects that an
+    analysis of all runs at once produces.
+    """
+
+    VERSION = 1
+
+    def __init__(self):
+        # the path of each run and whether it failed
+        self.runs: List[Tuple[str, bool]] = list()
+        self.objects: Dict[AnalysisObject, AnalysisObject] = dict()
+        self.observed: Dict[AnalysisObject, Set[int]] = dict()
+        self.evaluated: Dict[AnalysisObject, Set[int]] = dict()
+
+    def __len__(self):
+        return len(self.runs)
+
+    def add_run(self, path: os.PathLike, failing: bool) -> int:
+        self.runs.append((str(path), failing))
+        return len(self.runs) - 1
+
+    def add(
+        self,
+        obj: Spectrum,
+        observed: Iterable[int],
+        evaluated: Iterable[int],
+        weights: Dict[int, float],
+    ):
+        """
+        Adds the observations of obj in the runs with the given indices.
+        """
+        if obj not in self.objects:
+            obj.clear_runs()
+            self.objects[obj] = obj
+            self.observed[obj] = set()
+            self.evaluated[obj] = set()
+        obj = self.objects[obj]
+        self.observed[obj].update(observed)
+        self.evaluated[obj].update(evaluated)
+        obj.weights.update(weights)
+
+    def update(self, other: "PartialResult"):
+        """
+        Merges the partial result of other runs into this one.
+        """
+        offset = len(self.runs)
+        self.runs.extend(other.runs)
+        for obj in other.objects:
+            self.add(
+                obj,
+                (run + offset for run in other.observed[obj]),
+                (run + offset for run in other.evaluated[obj]),
+                {run + offset: weight for run, weight in obj.weights.items()},
+            )
+
+    def remove(self, runs: Iterable[int]):
+        """
+        Removes the observations of the runs with the given indices. The indices
+        of the remaining runs are shifted to close the gaps. Objects that were only
+        evaluated in the removed runs are dropped.
+        """
+        removed = set(runs)
+        index = dict()
+        kept = list()
+        for run, entry in enumerate(self.runs):
+            if run not in removed:
+                index[run] = len(kept)
+                kept.append(entry)
+        self.runs = kept
+        for obj in list(self.objects):
+            evaluated = {index[run] for run in self.evaluated[obj] if run in index}
+            if self.evaluated[obj] and not evaluated:
+                del self.objects[obj], self.observed[obj], self.evaluated[obj]
+                continue
+            self.evaluated[obj] = evaluated
+            self.observed[obj] = {
+                index[run] for run in self.observed[obj] if run in index
+            }
+            obj.weights = {
+                index[run]: weight
+                for run, weight in obj.weights.items()
+                if run in index
+            }
+
+    def finalize(self) -> Set[AnalysisObject]:
+        """
+        Computes the spectra and predicate counts of the objects as
+        Model.finalize does and returns the objects.
+        """
+        failing = {run for run, (_, failed) in enumerate(self.runs) if failed}
+        passing = set(range(len(self.runs))) - failing
+        for obj, observed in self.observed.items():
+            unobserved = self.evaluated[obj] - observed
+            obj.failed_observed = len(observed & failing)
+            obj.passed_observed = len(observed & passing)
+            obj.set_passed(len(passing))
+            obj.set_failed(len(failing))
+            obj.set_weight()
+            if isinstance(obj, Predicate):
+                obj.true_relevant = obj.failed_observed
+                obj.true_irrelevant = obj.passed_observed
+                obj.false_relevant = len(unobserved & failing)
+                obj.false_irrelevant = len(unobserved & passing)
+                # calculate keeps the values whose denominator is zero, which
+                # need to be those of a fresh predicate after runs were removed
+                obj.fail_true = 0
+                obj.fail_false = 0
+                obj.context = 1
+                obj.increase_true = 0
+                obj.increase_false = 0
+            obj.calculate()
+        return set(self.objects)
+
+    def serialize(self) -> dict:
+        return {
+            "version": self.VERSION,
+            "runs": self.runs,
+            "objects": [
+                {
+                    "object": obj.serialize(),
+                    "observed": sorted(self.observed[obj]),
+                    "evaluated": sorted(self.evaluated[obj]),
+                    "weights": obj.weights,
+                }
+                for obj in self.objects
+            ],
+        }
+
+    def dump(self, path: os.PathLike):
+        with open(path, "w") as f:
+            json.dump(self.serialize(), f, separators=(",", ":"))
+
+    @staticmethod
+    def load(path: os.PathLike) -> "PartialResult":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != PartialResult.VERSION:
+            raise ValueError(f"{path} is not a partial result")
+        return PartialResult.deserialize(data)
+
+    @staticmethod
+    def deserialize(data: dict) -> "PartialResult":
+        result = PartialResult()
+        result.runs = [(run_path, failing) for run_path, failing in data["runs"]]
+        for entry in data["objects"]:
+            result.add(
+                deserialize(entry["object"]),
+                entry["observed"],
+                entry["evaluated"],
+                {int(run): weight for run, weight in entry["weights"].items()},
+            )
+        return result
+
+    @staticmethod
+    def merge(paths: Iterable[os.PathLike]) -> "PartialResult":
+        result = PartialResult()
+        for path in paths:
+            result.update(PartialResult.load(path))
+        return result
+
+
+class ProcessAnalyzer(Analyzer):
+    """
+    An analyzer that distributes the event files over a pool of processes. Each
+    process analyzes a chunk of the event files with a fresh copy of the factory
+    and returns for every analysis object the runs that observed and evaluated it.
+    The analyzer merges these partial results by the analysis objects and computes
+    their spectra and metrics as Model.finalize does. The mappings and the factory
+    are sent once to every process rather than with every chunk.
+    """
+
+    def __init__(
+        self,
+        relevant_event_files: List[EventFile],
+        irrelevant_event_files: List[EventFile],
+        factory: AnalysisFactory,
+        model_class: Type[Model] = None,
+        parallel: bool = False,
+        workers: int = 4,
+        materialize: bool = False,
+        chunks_per_worker: int = 4,
+    ):
+        super().__init__(
+            relevant_event_files,
+            irrelevant_event_files,
+            factory,
+            model_class=model_class,
+            parallel=parallel,
+            workers=workers,
+            materialize=materialize,
+        )
+        self.factory = factory
+        self.model_class = type(self.model)
+        self.chunks_per_worker = max(chunks_per_worker, 1)
+        self.event_files: List[EventFile] = list()
+        self.result = PartialResult()
+
+    def _get_chunks(
+        self, event_files: List[EventFile], mappings: List[EventMapping]
+    ) -> List[List[Tuple[int, EventFile]]]:
+        """
+        Splits the event files into chunks for the workers. The event files are
+        sent without their mapping, the workers look it up by its index instead.
+        """
+        tasks = list()
+        for event_file in event_files:
+            for index, mapping in enumerate(mappings):
+                if mapping is event_file.mapping:
+                    break
+            else:
+                index = len(mappings)
+                mappings.append(event_file.mapping)
+            detached = copy.copy(event_file)
+            detached.mapping = None
+            tasks.append((index, detached))
+        size = math.ceil(len(tasks) / (self.workers * self.chunks_per_worker))
+        return [tasks[i : i + size] for i in range(0, len(tasks), size)]
+
+    def collect(self) -> PartialResult:
+        """
+        Analyzes the event files in the worker processes and collects their
+        partial results without finalizing the analysis objects.
+        """
+        if self.meta:
+            raise NotImplementedError("Not implemented for meta/loaded analyzer")
+        runs = dict()
+        for failing, event_files in (
+            (True, self.relevant_event_files),
+            (False, self.irrelevant_event_files),
+        ):
+            for event_file in event_files:
+                self.paths[event_file.run_id] = event_file.path
+                self.event_files.append(event_file)
+                runs[event_file.run_id] = self.result.add_run(event_file.path, failing)
+        if self.event_files:
+            mappings = list()
+            chunks = self._get_chunks(self.event_files, mappings)
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    mappings,
+                    pickle.dumps(self.factory),
+                    self.model_class,
+                    self.materialize,
+                ),
+            ) as executor:
+                for partial in executor.map(_analyze_partial, chunks):
+                    for obj, observed, evaluated, weights in partial:
+                        self.result.add(
+                            obj,
+                            (runs[run] for run in observed),
+                            (runs[run] for run in evaluated),
+                            {runs[run]: weight for run, weight in weights.items()},
+                        )
+        return self.result
+
+    def analyze(self):
+        self.collect()
+        self._finalize()
+
+    def _finalize(self):
+        self.model = MetaModel(self.result.finalize())
+
+    def get_coverage_per_run(
+        self, type_: AnalysisType = None
+    ) -> Dict[EventFile, Set[AnalysisObject]]:
+        coverage = dict()
+        for obj, evaluated in self.result.evaluated.items():
+            if type_ is None or obj.analysis_type() == type_:
+                for run in evaluated:
+                    coverage.setdefault(self.event_files[run], set()).add(obj)
+        return coverage
+
+
+class IncrementalAnalyzer(Analyzer):
+    """
+    An analyzer whose state can be extended by new runs and reduced by runs
+    without analyzing the event files of the other runs again. The state keeps for
+    every analysis object the runs that observed and evaluated it, as a
+    PartialResult, and the run ids of the included runs. It can be dumped and
+    loaded to update an analysis across sessions, the factory is not part of it.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        factory: AnalysisFactory,
+        model_class: Type[Model] = None,
+        materialize: bool = False,
+    ):
+        super().__init__(
+            list(),
+            list(),
+            factory,
+            model_class=model_class,
+            workers=1,
+            materialize=materialize,
+        )
+        self.factory = pickle.dumps(factory)
+        self.model_class = type(self.model)
+        self.result = PartialResult()
+        self.run_ids: List[int] = list()
+
+    def __contains__(self, run_id: int):
+        return run_id in self.run_ids
+
+    def add_runs(self, event_files: Iterable[EventFile]):
+        """
+        Analyzes the event files and adds their observations to the state. The
+        failing attribute of an event file decides whether the run failed. A run
+        whose id is already included is replaced, e.g., by a rerun of its test.
+        """
+        event_files = list(event_files)
+        if not event_files:
+            return
+        self._remove_runs(
+            event_file.run_id
+            for event_file in event_files
+            if event_file.run_id in self.run_ids
+        )
+        runs = dict()
+        for event_file in event_files:
+            self.paths[event_file.run_id] = event_file.path
+            runs[event_file.run_id] = self.result.add_run(
+                event_file.path, event_file.failing
+            )
+            self.run_ids.append(event_file.run_id)
+        for obj, observed, evaluated, weights in _collect_partial(
+            event_files, self.factory, self.model_class, self.materialize
+        ):
+            self.result.add(
+                obj,
+                (runs[run] for run in observed),
+                (runs[run] for run in evaluated),
+                {runs[run]: weight for run, weight in weights.items()},
+            )
+        self._finalize()
+
+    def remove_runs(self, run_ids: Iterable[int]):
+        """
+        Removes the observations of the runs with the given ids from the state.
+        """
+        self._remove_runs(run_ids)
+        self._finalize()
+
+    def _remove_runs(self, run_ids: Iterable[int]):
+        run_ids = set(run_ids)
+        self.result.remove(
+            run for run, run_id in enumerate(self.run_ids) if run_id in run_ids
+        )
+        self.run_ids = [run_id for run_id in self.run_ids if run_id not in run_ids]
+        for run_id in run_ids:
+            self.paths.pop(run_id, None)
+
+    def analyze(self):
+        self._finalize()
+
+    def _finalize(self):
+        self.model = MetaModel(self.result.finalize())
+
+    def dump_state(self, path: os.PathLike):
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "run_ids": self.run_ids,
+                    "result": self.result.serialize(),
+                },
+                f,
+                separators=(",", ":"),
+            )
+
+    @staticmethod
+    def load_state(
+        path: os.PathLike, factory: AnalysisFactory, **kwargs
+    ) -> "IncrementalAnalyzer":
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data.get("version") != IncrementalAnalyzer.VERSION:
+            raise ValueError(f"{path} is not an incremental analysis")
+        analyzer = IncrementalAnalyzer(factory, **kwargs)
+        analyzer.result = PartialResult.deserialize(data["result"])
+        analyzer.run_ids = list(data["run_ids"])
+        for run_id, (run_path, _) in zip(analyzer.run_ids, analyzer.result.runs):
+            analyzer.paths[run_id] = run_path
+        analyzer._finalize()
+        return analyzer
@@ -1,4 +1,10 @@
+from typing import Callable, Dict, Optional, Sequence, Iterable
+
+import numpy
+
 from sflkit.analysis import spectra
+from sflkit.analysis.predicate import Predicate
+from sflkit.analysis.table import AnalysisTable
 
 similarity_coefficients = [
     "AMPLE",
@@ -48,10 +54,213 @@ similarity_coefficients = [
 ]
 
 
+class Counts:
+    """
+    The counts of a set of spectra as arrays, on which the similarity coefficients
+    are computed for all spectra at once. A division by zero makes the coefficient
+    of a spectrum undefined, which, like a NaN, yields 0 as Spectrum.get_metric
+    does.
+    """
+
+    def __init__(
+        self,
+        failed_observed: Sequence[float],
+        failed_not_observed: Sequence[float],
+        passed_observed: Sequence[float],
+        passed_not_observed: Sequence[float],
+    ):
+        self.fo = numpy.asarray(failed_observed, dtype=numpy.float64)
+        self.fn = numpy.asarray(failed_not_observed, dtype=numpy.float64)
+        self.po = numpy.asarray(passed_observed, dtype=numpy.float64)
+        self.pn = numpy.asarray(passed_not_observed, dtype=numpy.float64)
+        self.f = self.fo + self.fn
+        self.p = self.po + self.pn
+        self.undefined = numpy.zeros(self.fo.shape, dtype=bool)
+
+    @staticmethod
+    def from_spectra(objects: Iterable[spectra.Spectrum]) -> "Counts":
+        objects = list(objects)
+        table = AnalysisTable.of(objects)
+        if table is not None:
+            return Counts.from_table(table, table.rows(objects))
+        return Counts(
+            [o.failed_observed for o in objects],
+            [o.failed_not_observed for o in objects],
+            [o.passed_observed for o in objects],
+            [o.passed_not_observed for o in objects],
+        )
+
+    @staticmethod
+    def from_table(table: AnalysisTable, rows: numpy.ndarray) -> "Counts":
+        return Counts(
+            table.columns["failed_observed"][rows],
+            table.columns["failed_not_observed"][rows],
+            table.columns["passed_observed"][rows],
+            table.columns["passed_not_observed"][rows],
+        )
+
+    def __len__(self):
+        return len(self.fo)
+
+    def div(self, a, b) -> numpy.ndarray:
+        a, b = numpy.broadcast_arrays(a, b)
+        zero = b == 0
+        self.undefined |= zero
+        return numpy.divide(a, b, out=numpy.zeros(zero.shape), where=~zero)
+
+    def compute(self, metric: str) -> numpy.ndarray:
+        self.undefined = numpy.zeros(self.fo.shape, dtype=bool)
+        with numpy.errstate(invalid="ignore"):
+            result = numpy.broadcast_to(
+                COEFFICIENTS[metric](self), self.fo.shape
+            ).astype(numpy.float64)
+        result[self.undefined | numpy.isnan(result)] = 0
+        return result
+
+
+COEFFICIENTS: Dict[str, Callable[[Counts], numpy.ndarray]] = {
+    "AMPLE": lambda c: abs(c.div(c.fo, c.f) - c.div(c.po, c.p)),
+    "AMPLE2": lambda c: c.div(c.fo, c.f) - c.div(c.po, c.p),
+    "Anderberg": lambda c: c.div(c.fo, c.fo + 2 * (c.fn + c.po)),
+    "ArithmeticMean": lambda c: c.div(
+        2 * c.fo * c.pn - 2 * c.fn * c.po, (c.fo + c.po) * (c.fn + c.pn) * c.f * c.p
+    ),
+    "Binary": lambda c: numpy.where(c.fo < c.f, 0, 1),
+    "CBIInc": lambda c: c.div(c.fo, c.fo + c.po) - c.div(c.f, c.f + c.p),
+    "Cohen": lambda c: c.div(
+        2 * c.fo * c.pn - 2 * c.fn * c.po,
+        (c.fo + c.po) * c.p + c.f * (c.fn + c.pn),
+    ),
+    "Crosstab": lambda c: _crosstab(c),
+    "Dice": lambda c: c.div(2 * c.fo, c.f + c.po),
+    "DStar": lambda c: c.div(c.fo**2, c.fn + c.po),
+    "Euclid": lambda c: numpy.sqrt(c.fo + c.pn),
+    "Fleiss": lambda c: c.div(
+        4 * c.fo * c.pn - 4 * c.fn * c.po - (c.fn - c.po) ** 2,
+        (2 * c.fo + c.fn + c.po) + (2 * c.pn + c.fn + c.po),
+    ),
+    "GP02": lambda c: 2 * (c.fo + numpy.sqrt(c.pn)) + numpy.sqrt(c.po),
+    "GP03": lambda c: numpy.sqrt(abs(c.fo**2 - numpy.sqrt(c.po))),
+    "GP13": lambda c: c.fo * (1 + c.div(1, 2 * c.po + c.fo)),
+    "GP19": lambda c: c.fo * numpy.sqrt(abs(c.po - c.fo + c.fn - c.pn)),
+    "Goodman": lambda c: c.div(2 * c.fo - c.fn - c.po, 2 * c.fo + c.fn + c.po),
+    "Hamann": lambda c: c.div(c.fo + c.pn - c.fn - c.po, c.f + c.p),
+    "HammingEtc": lambda c: c.fo + c.pn,
+    "HarmonicMean": lambda c: c.div(
+        (c.fo * c.pn - c.fn * c.po) * ((c.fo + c.po) * (c.fn + c.pn) + c.f * c.p),
+        (c.fo + c.po) * (c.fn + c.pn) * c.f * c.p,
+    ),
+    "Jaccard": lambda c: c.div(c.fo, c.f + c.po),
+    "Kulczynski1": lambda c: c.div(c.fo, c.fn + c.po),
+    "Kulczynski2": lambda c: 0.5 * (c.div(c.fo, c.f) + c.div(c.fo, c.fo + c.po)),
+    "M1": lambda c: c.div(c.fo + c.pn, c.fn + c.po),
+    "M2": lambda c: c.div(c.fo, c.fo + c.pn + 2 * (c.fn + c.po)),
+    "Naish1": lambda c: numpy.where(c.fo < c.f, -1, c.pn),
+    "Naish2": lambda c: c.fo - c.div(c.po, c.p + 1),
+    "Ochiai": lambda c: c.div(c.fo, numpy.sqrt(c.f * (c.fo + c.po))),
+    "Ochiai2": lambda c: c.div(
+        c.fo * c.pn, numpy.sqrt((c.fo + c.po) * (c.fn + c.pn) * c.f * c.p)
+    ),
+    "PairScoring": lambda c: c.fo * (2 * c.pn + c.po),
+    "qe": lambda c: c.div(c.fo, c.fo + c.po),
+    "RogersAndTanimoto": lambda c: c.div(c.fo + c.pn, c.fo + c.pn + 2 * (c.fn + c.po)),
+    "Rogot1": lambda c: 0.5
+    * (c.div(c.fo, 2 * c.fo + c.fn + c.po) + c.div(c.pn, 2 * c.pn + c.fn + c.po)),
+    "Rogot2": lambda c: 0.25
+    * (
+        c.div(c.fo, c.fo + c.po)
+        + c.div(c.fo, c.f)
+        + c.div(c.pn, c.p)
+        + c.div(c.pn, c.fn + c.pn)
+    ),
+    "RusselAndRao": lambda c: c.div(c.fo, c.f + c.p),
+    "Scott": lambda c: c.div(
+        4 * c.fo * c.pn - 4 * c.fn * c.po - (c.fn - c.po) ** 2,
+        (2 * c.fo + c.fn + c.po) * (2 * c.pn + c.fn + c.po),
+    ),
+    "SimpleMatching": lambda c: c.div(c.fo + c.pn, c.f + c.p),
+    "Sokal": lambda c: c.div(2 * (c.fo + c.pn), 2 * (c.fo + c.pn) + c.fn + c.po),
+    "SorensenDice": lambda c: c.div(2 * c.fo, 2 * c.fo + c.fn + c.po),
+    "Tarantula": lambda c: c.div(c.div(c.fo, c.f), c.div(c.fo, c.f) + c.div(c.po, c.p)),
+    "Wong1": lambda c: c.fo,
+    "Wong2": lambda c: c.fo - c.po,
+    "Wong3": lambda c: c.fo
+    - numpy.where(
+        c.po <= 2,
+        c.po,
+        numpy.where(c.po <= 10, 2 + 0.1 * (c.po - 2), 2.8 + 0.001 * (c.po - 10)),
+    ),
+    "Zoltar": lambda c: c.div(c.fo, c.f + c.po + c.div(10000 * c.fn * c.po, c.fo)),
+}
+
+
+def _crosstab(c: Counts) -> numpy.ndarray:
+    observed_failed = c.div((c.fo + c.po) * c.f, c.f + c.p)
+    observed_passed = c.div((c.fo + c.po) * c.p, c.f + c.p)
+    not_observed_failed = c.div((c.fn + c.pn) * c.f, c.f + c.p)
+    not_observed_passed = c.div((c.fn + c.pn) * c.p, c.f + c.p)
+    return (
+        c.div((c.fn - observed_failed) ** 2, observed_failed)
+        + c.div((c.po - observed_passed) ** 2, observed_passed)
+        + c.div((c.fn - not_observed_failed) ** 2, not_observed_failed)
+        + c.div((c.pn - not_observed_passed) ** 2, not_observed_passed)
+    )
+
+
+def compute(
+    counts: Counts, metrics: Optional[Iterable[str]] = None
+) -> Dict[str, numpy.ndarray]:
+    """
+    Computes the given similarity coefficients, all if metrics is None, for all
+    spectra of counts.
+    """
+    if metrics is None:
+        metrics = similarity_coefficients
+    return {metric: counts.compute(metric) for metric in metrics}
+
+
+def get_coefficient(metric: Optional[Callable]) -> Optional[str]:
+    """
+    Returns the name of the similarity coefficient if metric is one of the
+    coefficients of Spectrum, None otherwise.
+    """
+    name = getattr(metric, "__name__", None)
+    if name in COEFFICIENTS and getattr(spectra.Spectrum, name, None) is metric:
+        return name
+    return None
+
+
+def get_metrics(
+    objects: Sequence[spectra.Spectrum],
+    metric: Callable = None,
+    use_weight: bool = False,
+    counts: Optional[Counts] = None,
+) -> Optional[numpy.ndarray]:
+    """
+    Computes the suspiciousness of the objects with metric at once, as their
+    get_metric does. Returns None if metric is not a similarity coefficient of
+    all objects, e.g., the default metric of predicates. The counts of the
+    objects can be passed to compute several metrics on them.
+    """
+    if metric is None:
+        if any(isinstance(o, Predicate) for o in objects):
+            return None
+        metric = spectra.Spectrum.Ochiai
+    name = get_coefficient(metric)
+    if name is None:
+        return None
+    if counts is None:
+        counts = Counts.from_spectra(objects)
+    result = counts.compute(name)
+    if use_weight:
+        result *= numpy.asarray([o.weight for o in objects], dtype=numpy.float64)
+    return result
+
+
 def _get_similarity_coefficients(similarity_coefficient):
-    return lambda po, pn, fo, fn: getattr(
-        spectra.DummySpectrum("", 0, po, pn, fo, fn), similarity_coefficient
-    )()
+    return lambda po, pn, fo, fn: float(
+        Counts([fo], [fn], [po], [pn]).compute(similarity_coefficient)[0]
+    )
 
 
 for sc in similarity_coefficients:
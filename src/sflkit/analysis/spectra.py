@@ -10,6 +10,7 @@ from sflkit.analysis.analysis_type import (
     MetaEvent,
 )
 from sflkit.analysis.suggestion import Suggestion, Location
+from sflkit.analysis.table import Column
 from sflkit.events.event_file import EventFile
 from sflkit.model.scope import Scope
 from sflkitlib.events import EventType
@@ -26,6 +27,16 @@ from sflkitlib.events.event import (
 
 
 class Spectrum(AnalysisObject, ABC):
+    RUNS = ("hits", "last_evaluation", "weights")
+
+    passed = Column()
+    passed_observed = Column()
+    passed_not_observed = Column()
+    failed = Column()
+    failed_observed = Column()
+    failed_not_observed = Column()
+    weight = Column()
+
     def __init__(
         self,
         file: str,
@@ -36,6 +47,9 @@ class Spectrum(AnalysisObject, ABC):
         failed_not_observed: int = 0,
     ):
         super().__init__()
+        # the table that stores the counters and the row of the object in it
+        self._table = None
+        self._row = None
         self.file = file
         self.line = line
         self.passed = passed_observed + passed_not_observed
@@ -48,6 +62,17 @@ class Spectrum(AnalysisObject, ABC):
         self.weights: Dict[int, float] = dict()
         self.weight: float = 1
 
+    def __getstate__(self):
+        # a copy of an object bound to a table carries its counters
+        state = self.__dict__.copy()
+        state["_column"] = None
+        if self._table is not None:
+            state.update(self._table.get_values(self._row))
+            state.update({name: dict() for name in self.RUNS})
+            state["_table"] = None
+            state["_row"] = None
+        return state
+
     def __hash__(self):
         return hash((self.file, self.line, self.analysis_type()))
 
@@ -110,11 +135,16 @@ class Spectrum(AnalysisObject, ABC):
         except ZeroDivisionError:
             return 0
 
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
+        return [Location(self.file, self.line)]
+
     def get_suggestion(
         self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
     ):
         self.assign_suspiciousness(metric, use_weight=use_weight)
-        return Suggestion([Location(self.file, self.line)], self.suspiciousness)
+        return Suggestion(
+            self.get_locations(metric, base_dir=base_dir), self.suspiciousness
+        )
 
     def assign_suspiciousness(self, metric: Callable = None, use_weight: bool = False):
         self.suspiciousness = self.get_metric(metric, use_weight=use_weight)
@@ -130,6 +160,29 @@ class Spectrum(AnalysisObject, ABC):
             self.hits[id_] = {event.thread_id: 1}
             self.last_evaluation[id_] = {event.thread_id: EvaluationResult.TRUE}
 
+    def observe(self, id_, event, scope: Scope = None) -> bool:
+        return True
+
+    def observe_repeated(self, id_, event, repeat: int, scope: Scope = None) -> bool:
+        return self.observe(id_, event, scope=scope)
+
+    def clear_runs(self):
+        super().clear_runs()
+        self.last_evaluation = dict()
+        self.weights = dict()
+
+    def clear_run(self, event_file: EventFile):
+        super().clear_run(event_file)
+        self.last_evaluation.pop(event_file, None)
+
+    def collapse(self, event_file: EventFile, failing: bool):
+        if self._check_hits(event_file):
+            if failing:
+                self.fail_observed()
+            else:
+                self.pass_observed()
+        self.clear_run(event_file)
+
     def pass_observed(self):
         self.passed_observed += 1
 
@@ -582,6 +635,17 @@ class Line(Spectrum):
     def events():
         return [EventType.LINE]
 
+    def hit_repeated(self, id_, event, repeat: int, scope: Scope = None):
+        if id_ in self.hits:
+            if event.thread_id in self.hits[id_]:
+                self.hits[id_][event.thread_id] += repeat
+            else:
+                self.hits[id_][event.thread_id] = repeat
+            self.last_evaluation[id_][event.thread_id] = EvaluationResult.TRUE
+        else:
+            self.hits[id_] = {event.thread_id: repeat}
+            self.last_evaluation[id_] = {event.thread_id: EvaluationResult.TRUE}
+
 
 class Function(Spectrum):
     def __init__(self, event: FunctionEnterEvent | MetaEvent):
@@ -637,14 +701,9 @@ class Function(Spectrum):
     def events():
         return [EventType.FUNCTION_ENTER]
 
-    def get_suggestion(
-        self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
-    ):
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
         finder = self.function_finder(self.file, self.line, self.function)
-        return Suggestion(
-            [Location(self.file, line) for line in finder.get_locations(base_dir)],
-            self.get_metric(metric, use_weight=use_weight),
-        )
+        return [Location(self.file, line) for line in finder.get_locations(base_dir)]
 
     def __str__(self):
         return f"{self.analysis_type()}:{self.file}:{self.function}:{self.line}"
@@ -730,13 +789,8 @@ class DefUse(Spectrum):
             EventType.FUNCTION_ERROR,
         ]
 
-    def get_suggestion(
-        self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
-    ):
-        return Suggestion(
-            [Location(self.file, self.line), Location(self.use_file, self.use_line)],
-            self.get_metric(metric, use_weight=use_weight),
-        )
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
+        return [Location(self.file, self.line), Location(self.use_file, self.use_line)]
 
     def __str__(self):
         return f"{self.analysis_type()}:{self.file}:{self.line}:{self.use_file}:{self.use_line}:{self.var}"
@@ -822,24 +876,36 @@ class Loop(ModifiableSpectrum):
     def start_loop(self, thread_id: Optional[int] = None):
         self.loop_stack.setdefault(thread_id, []).append(0)
 
-    def hit_loop(self, thread_id: Optional[int] = None):
+    def clear_runs(self):
+        super().clear_runs()
+        self.loop_stack = dict()
+
+    def hit_loop(self, thread_id: Optional[int] = None, hits: int = 1):
         if thread_id in self.loop_stack:
             if self.loop_stack[thread_id]:
-                self.loop_stack[thread_id][-1] += 1
+                self.loop_stack[thread_id][-1] += hits
             else:
-                self.loop_stack[thread_id].append(1)
+                self.loop_stack[thread_id].append(hits)
         else:
-            self.loop_stack[thread_id] = [1]
+            self.loop_stack[thread_id] = [hits]
 
-    def hit(self, id_, event, scope: Scope = None):
+    def _pop_loop(self, thread_id: Optional[int] = None) -> int:
         if (
             self.loop_stack
-            and event.thread_id in self.loop_stack
-            and self.loop_stack[event.thread_id]
+            and thread_id in self.loop_stack
+            and self.loop_stack[thread_id]
         ):
-            hits = self.loop_stack[event.thread_id].pop()
-        else:
-            hits = 0
+            return self.loop_stack[thread_id].pop()
+        return 0
+
+    def observe(self, id_, event, scope: Scope = None) -> bool:
+        return bool(self.evaluate_hit(self._pop_loop(event.thread_id)))
+
+    def observe_repeated(self, id_, event, repeat: int, scope: Scope = None) -> bool:
+        return AnalysisObject.observe_repeated(self, id_, event, repeat, scope=scope)
+
+    def hit(self, id_, event, scope: Scope = None):
+        hits = self._pop_loop(event.thread_id)
         result = (
             EvaluationResult.TRUE if self.evaluate_hit(hits) else EvaluationResult.FALSE
         )
@@ -860,14 +926,9 @@ class Loop(ModifiableSpectrum):
                     return True
         return False
 
-    def get_suggestion(
-        self, metric: Callable = None, base_dir: str = "", use_weight: bool = False
-    ):
+    def get_locations(self, metric: Callable = None, base_dir: str = ""):
         finder = self.loop_finder(self.file, self.line)
-        return Suggestion(
-            [Location(self.file, line) for line in finder.get_locations(base_dir)],
-            self.get_metric(metric, use_weight=use_weight),
-        )
+        return [Location(self.file, line) for line in finder.get_locations(base_dir)]
 
     def __str__(self):
         return f"{self.analysis_type()}:{self.file}:{self.line}"
@@ -956,6 +1017,9 @@ class Length(ModifiableSpectrum):
     def events():
         return [EventType.LEN]
 
+    def observe(self, id_, event, scope: Scope = None) -> bool:
+        return bool(self.evaluate_length(event.length))
+
     def hit(self, id_, event, scope: Scope = None):
         result = (
             EvaluationResult.TRUE
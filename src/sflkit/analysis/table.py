@@ -0,0 +1,203 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Any
+
+import numpy
+
+SPECTRUM_COLUMNS = {
+    "passed": numpy.int64,
+    "passed_observed": numpy.int64,
+    "passed_not_observed": numpy.int64,
+    "failed": numpy.int64,
+    "failed_observed": numpy.int64,
+    "failed_not_observed": numpy.int64,
+    "weight": numpy.float64,
+}
+
+PREDICATE_COLUMNS = {
+    "true_relevant": numpy.int64,
+    "false_relevant": numpy.int64,
+    "true_irrelevant": numpy.int64,
+    "false_irrelevant": numpy.int64,
+    "fail_true": numpy.float64,
+    "fail_false": numpy.float64,
+    "context": numpy.float64,
+    "increase_true": numpy.float64,
+    "increase_false": numpy.float64,
+}
+
+COLUMNS = {**SPECTRUM_COLUMNS, **PREDICATE_COLUMNS}
+
+
+class Column:
+    """
+    A counter of an analysis object. The counter is a private attribute of the
+    object until the object is bound to an AnalysisTable, afterward it is stored
+    in the column of the table at the row of the object.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attribute = f"_{name}"
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        table = obj._table
+        if table is None:
+            return getattr(obj, self.attribute)
+        return table.columns[self.name][obj._row].item()
+
+    def __set__(self, obj, value):
+        table = obj._table
+        if table is None:
+            setattr(obj, self.attribute, value)
+        else:
+            table.columns[self.name][obj._row] = value
+
+
+class AnalysisTable:
+    """
+    The counters of a set of analysis objects as a struct of arrays, one column
+    per counter and one row per object. The bound objects become views of their
+    rows and keep their API, while finalize and calculate update the counters of
+    all objects at once. Binding removes the counters and the per-run hits from
+    the objects, the hits of bound objects are only recorded by a HitRecorder.
+    """
+
+    def __init__(self, capacity: int = 0):
+        self.size = 0
+        self.columns: Dict[str, numpy.ndarray] = {
+            name: numpy.zeros(capacity, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.predicates = numpy.zeros(capacity, dtype=bool)
+        self.objects: List[Any] = list()
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, size: int):
+        capacity = len(self.predicates)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name, column in self.columns.items():
+            self.columns[name] = numpy.resize(column, capacity)
+        self.predicates = numpy.resize(self.predicates, capacity)
+
+    def bind(self, objects: Iterable[Any]) -> numpy.ndarray:
+        """
+        Moves the counters of the objects into the table and returns their rows.
+        Objects that are already bound to the table keep their rows.
+        """
+        objects = list(objects)
+        new = list()
+        for obj in objects:
+            if obj._table is None:
+                new.append(obj)
+            elif obj._table is not self:
+                raise ValueError(f"{obj} is bound to another table")
+        start, end = self.size, self.size + len(new)
+        self._grow(end)
+        for name, column in self.columns.items():
+            attribute = f"_{name}"
+            column[start:end] = [getattr(obj, attribute, 0) for obj in new]
+        self.predicates[start:end] = [hasattr(obj, "_true_relevant") for obj in new]
+        for row, obj in enumerate(new, start):
+            # the counters now live in the table and the observations of the runs
+            # in the HitRecorder of the model, the object only keeps its identity
+            for name in COLUMNS:
+                attribute = f"_{name}"
+                if hasattr(obj, attribute):
+                    delattr(obj, attribute)
+            for name in obj.RUNS:
+                if hasattr(obj, name):
+                    delattr(obj, name)
+            obj._table = self
+            obj._row = row
+        self.objects.extend(new)
+        self.size = end
+        return self.rows(objects)
+
+    @staticmethod
+    def rows(objects: Sequence[Any]) -> numpy.ndarray:
+        return numpy.fromiter(
+            (obj._row for obj in objects),
+            dtype=numpy.int64,
+            count=len(objects),
+        )
+
+    @staticmethod
+    def of(objects: Sequence[Any]) -> Optional["AnalysisTable"]:
+        """
+        Returns the table if all objects are bound to the same one.
+        """
+        if not objects:
+            return None
+        table = getattr(objects[0], "_table", None)
+        if table is None or any(
+            getattr(obj, "_table", None) is not table for obj in objects
+        ):
+            return None
+        return table
+
+    def get_values(self, row: int) -> Dict[str, Any]:
+        """
+        Returns the counters of a row as the private attributes of its object.
+        """
+        names = COLUMNS if self.predicates[row] else SPECTRUM_COLUMNS
+        return {f"_{name}": self.columns[name][row].item() for name in names}
+
+    def finalize(
+        self,
+        rows: numpy.ndarray,
+        failed_observed: numpy.ndarray,
+        passed_observed: numpy.ndarray,
+        failed_unobserved: numpy.ndarray,
+        passed_unobserved: numpy.ndarray,
+        passed: int,
+        failed: int,
+    ):
+        """
+        Adds the observations to the counters of the rows, as HitMatrix.finalize
+        does for single objects, and sets the number of passed and failed runs.
+        """
+        columns = self.columns
+        columns["failed_observed"][rows] += failed_observed
+        columns["passed_observed"][rows] += passed_observed
+        columns["passed"][rows] = passed
+        columns["passed_not_observed"][rows] = passed - columns["passed_observed"][rows]
+        columns["failed"][rows] = failed
+        columns["failed_not_observed"][rows] = failed - columns["failed_observed"][rows]
+        mask = self.predicates[rows]
+        predicates = rows[mask]
+        columns["true_relevant"][predicates] += failed_observed[mask]
+        columns["true_irrelevant"][predicates] += passed_observed[mask]
+        columns["false_relevant"][predicates] += failed_unobserved[mask]
+        columns["false_irrelevant"][predicates] += passed_unobserved[mask]
+
+    def calculate(self, rows: Optional[numpy.ndarray] = None):
+        """
+        Computes Fail, Context and Increase of the predicates in the rows as
+        Predicate.calculate does. A value whose denominator is zero is kept.
+        """
+        if rows is None:
+            rows = numpy.arange(self.size)
+        rows = rows[self.predicates[rows]]
+        columns = self.columns
+        true_relevant = columns["true_relevant"][rows].astype(numpy.float64)
+        false_relevant = columns["false_relevant"][rows].astype(numpy.float64)
+        true = true_relevant + columns["true_irrelevant"][rows]
+        false = false_relevant + columns["false_irrelevant"][rows]
+        total = true + false
+        fail_true = columns["fail_true"][rows]
+        numpy.divide(true_relevant, true, out=fail_true, where=true != 0)
+        fail_false = columns["fail_false"][rows]
+        numpy.divide(false_relevant, false, out=fail_false, where=false != 0)
+        context = columns["context"][rows]
+        numpy.divide(
+            true_relevant + false_relevant, total, out=context, where=total != 0
+        )
+        columns["fail_true"][rows] = fail_true
+        columns["fail_false"][rows] = fail_false
+        columns["context"][rows] = context
+        columns["increase_true"][rows] = fail_true - context
+        columns["increase_false"][rows] = fail_false - context
@@ -16,6 +16,9 @@ INSTRUMENT = "instrument"
 RUN = "run"
 ANALYZE = "analyze"
 READ = "read"
+COMPACT = "compact"
+MAP = "map"
+REDUCE = "reduce"
 
 
 class ResultEncoder(json.JSONEncoder):
@@ -55,6 +58,14 @@ def main(*args: str, stdout=sys.stdout, stderr=sys.stderr):
         results = sflkit.analyze(args.config, args.analysis)
         with open(args.out, "w") as output:
             json.dump(results, output, cls=ResultEncoder, indent=4)
+    elif args.command == MAP:
+        sflkit.analyze_partial(args.config, args.out, args.workers)
+    elif args.command == REDUCE:
+        results = sflkit.analyze(args.config, args.analysis, args.partials)
+        with open(args.out, "w") as output:
+            json.dump(results, output, cls=ResultEncoder, indent=4)
+    elif args.command == COMPACT:
+        sflkit.compact(args.config, args.out)
     elif args.command == READ:
         mapping = EventMapping.load_from_file(hash_identifier(args.target))
         with EventFile(args.event_file, 0, mapping) as event_file:
@@ -111,7 +122,7 @@ def parse_args(args=None, namespace=None):
         dest="analysis",
         default=None,
         help="The dump file of the counts of the relevant and irrelevant, "
-        "true and false analysis objects",
+        "true and false analysis objects, as columns if it ends with .npz",
     )
     analyze_parser.add_argument(
         "-o",
@@ -121,6 +132,65 @@ def parse_args(args=None, namespace=None):
         help="The report of the final results, i.e. the suggestions sorted by analysis",
     )
 
+    map_parser = commands.add_parser(
+        MAP,
+        description="The map command analyzes the event files of the config and "
+        "writes the observations of the analysis objects to a partial result, such "
+        "that the event files can be analyzed on several machines.",
+        help="execute the analysis of a part of the event files",
+    )
+    map_parser.add_argument(
+        "-c", "--config", dest="config", required=True, help="path to the config file"
+    )
+    map_parser.add_argument(
+        "-o",
+        "--out",
+        dest="out",
+        default="partial.json",
+        help="The output path of the partial result.",
+    )
+    map_parser.add_argument(
+        "-w",
+        "--workers",
+        dest="workers",
+        type=int,
+        default=4,
+        help="The number of processes analyzing the event files.",
+    )
+
+    reduce_parser = commands.add_parser(
+        REDUCE,
+        description="The reduce command merges the partial results of the map "
+        "command and reports the results of the analysis of all their event files.",
+        help="merge partial results of the analysis",
+    )
+    reduce_parser.add_argument(
+        "-c", "--config", dest="config", required=True, help="path to the config file"
+    )
+    reduce_parser.add_argument(
+        "-p",
+        "--partials",
+        dest="partials",
+        nargs="+",
+        required=True,
+        help="The partial results to merge.",
+    )
+    reduce_parser.add_argument(
+        "-a",
+        "--analysis",
+        dest="analysis",
+        default=None,
+        help="The dump file of the counts of the relevant and irrelevant, "
+        "true and false analysis objects, as columns if it ends with .npz",
+    )
+    reduce_parser.add_argument(
+        "-o",
+        "--out",
+        dest="out",
+        default="out.json",
+        help="The report of the final results, i.e. the suggestions sorted by analysis",
+    )
+
     run_parser = commands.add_parser(
         RUN,
         description="The run command executes the tests of the subject and creates the event files.",
@@ -137,6 +207,24 @@ def parse_args(args=None, namespace=None):
         help="The output path of the event files.",
     )
 
+    compact_parser = commands.add_parser(
+        COMPACT,
+        description="The compact command converts the event files of a subject into "
+        "a columnar event store that can be analyzed without decoding the event "
+        "files again.",
+        help="compact the event files into an event store",
+    )
+    compact_parser.add_argument(
+        "-c", "--config", dest="config", required=True, help="path to the config file"
+    )
+    compact_parser.add_argument(
+        "-o",
+        "--out",
+        dest="out",
+        default=None,
+        help="The output path of the event store.",
+    )
+
     read_parser = commands.add_parser(
         READ,
         description="The read command reads an event file and prints the events.",
@@ -4,13 +4,14 @@ import hashlib
 import os.path
 import queue
 from pathlib import Path
-from typing import List, Callable, Union, Optional
+from typing import List, Callable, Union, Optional, Collection, Dict, Any
 
 from sflkit.analysis.analysis_type import AnalysisType
 from sflkit.analysis.factory import (
     analysis_factory_mapping,
     CombinationFactory,
     AnalysisFactory,
+    SCOPE_EVENT_TYPES,
 )
 from sflkit.analysis.mapping import analysis_mapping
 from sflkit.analysis.predicate import Predicate
@@ -25,9 +26,13 @@ from sflkit.language.meta import (
 from sflkit.language.visitor import ASTVisitor
 from sflkit.events.mapping import EventMapping, InstrumentationError
 from sflkit.events.event_file import EventFile
+from sflkit.events.store import EventStore, StoredEventFile
 from sflkit.runners import RunnerType
 from sflkitlib.events import EventType
 
+# the budgets of the scalar pairs in the events section and their types
+SCALAR_PAIR_OPTIONS = {"max_pairs": int, "max_depth": int, "sample": float, "seed": int}
+
 
 class ConfigError(Exception):
     pass
@@ -49,6 +54,12 @@ class Config:
                                               all files inside the tree will be treated as event files
     failing=/path(,path)*                   : The event files of failing runs, if a dir is provided
                                               all files inside the tree will be treated as event files
+                                              (passing and failing can also point to an event store
+                                              created by sflkit compact)
+    max_pairs=number_of_pairs               : The number of SCALAR_PAIR partners per definition site
+    max_depth=number_of_scopes              : The number of scopes above a definition with SCALAR_PAIR partners
+    sample=fraction                         : The fraction of SCALAR_PAIR pairs kept
+    seed=number                             : The seed of the ranks of the SCALAR_PAIR pairs
 
     [instrumentation]
     path=/path/to/the/instrumented/subject
@@ -67,6 +78,8 @@ class Config:
         self.language: Language = None
         self.predicates = list()
         self.factory = None
+        # the budgets of the scalar pairs, passed to their factory
+        self.scalar_pairs: Dict[str, Union[int, float]] = dict()
         self.test_factory = None
         self.events = list()
         self.test_events = list()
@@ -107,6 +120,9 @@ class Config:
 
                 # events section
                 events = config["events"]
+                for option, type_ in SCALAR_PAIR_OPTIONS.items():
+                    if option in events:
+                        self.scalar_pairs[option] = type_(events[option])
                 if "predicates" in events:
                     # get the predicates
                     self.predicates = list(
@@ -118,7 +134,10 @@ class Config:
                     self.factory = CombinationFactory(
                         list(
                             map(
-                                lambda p: analysis_factory_mapping[p](), self.predicates
+                                lambda p: analysis_factory_mapping[p](
+                                    **self.get_factory_options(p)
+                                ),
+                                self.predicates,
                             )
                         )
                     )
@@ -186,6 +205,15 @@ class Config:
                     self.metrics = [Spectrum.Ochiai]
 
                 run_id_generator = IDGenerator()
+                # only the events needed by the predicates are decoded
+                if self.predicates:
+                    event_types = set(self.events) | set(self.test_events)
+                    # the scopes of the variables are kept even if the predicates
+                    # do not observe function events themselves
+                    if self.factory.is_scoped():
+                        event_types |= SCOPE_EVENT_TYPES
+                else:
+                    event_types = None
                 if "mapping" in events:
                     self.mapping_path = Path(events["mapping"])
                 try:
@@ -198,6 +226,7 @@ class Config:
                         run_id_generator,
                         self.mapping,
                         False,
+                        event_types=event_types,
                     )
                 if "failing" in events:
                     self.failing = self.get_event_files(
@@ -205,6 +234,7 @@ class Config:
                         run_id_generator,
                         self.mapping,
                         True,
+                        event_types=event_types,
                     )
                 # instrumentation section
                 instrument = config["instrumentation"]
@@ -258,6 +288,11 @@ class Config:
             except KeyError as e:
                 raise ConfigError(e)
 
+    def get_factory_options(self, predicate: AnalysisType) -> Dict[str, Any]:
+        if predicate == AnalysisType.SCALAR_PAIR:
+            return self.scalar_pairs
+        return dict()
+
     @staticmethod
     def create_from_values(
         target_path: Optional[str] = None,
@@ -312,7 +347,13 @@ class Config:
         return conf
 
     @staticmethod
-    def get_event_files(files, run_id_generator, mapping: EventMapping, failing):
+    def get_event_files(
+        files,
+        run_id_generator,
+        mapping: EventMapping,
+        failing,
+        event_types: Optional[Collection[EventType]] = None,
+    ):
         file_queue = queue.Queue()
         for f in files:
             file_queue.put(f)
@@ -320,7 +361,14 @@ class Config:
         while not file_queue.empty():
             element = file_queue.get()
             if os.path.exists(element):
-                if os.path.isdir(element):
+                if EventStore.is_store(element):
+                    result += EventStore(element).get_event_files(
+                        run_id_generator,
+                        mapping,
+                        failing=failing,
+                        event_types=event_types,
+                    )
+                elif os.path.isdir(element):
                     for f in os.listdir(element):
                         file_queue.put(os.path.join(element, f))
                 elif os.path.isfile(element) and not os.path.islink(element):
@@ -330,6 +378,7 @@ class Config:
                             run_id_generator.get_next_id(),
                             mapping,
                             failing=failing,
+                            event_types=event_types,
                         )
                     )
             else:
@@ -339,6 +388,7 @@ class Config:
                         run_id_generator.get_next_id(),
                         mapping,
                         failing=failing,
+                        event_types=event_types,
                     )
                 )
         return result
@@ -363,6 +413,10 @@ class Config:
         runner=None,
         workers=None,
         thread_support=None,
+        max_pairs=None,
+        max_depth=None,
+        sample=None,
+        seed=None,
     ):
         conf = configparser.ConfigParser()
         conf["target"] = dict()
@@ -390,6 +444,14 @@ class Config:
             conf["events"]["failing"] = failing
         if mapping_path:
             conf["events"]["mapping"] = mapping_path
+        for option, value in (
+            ("max_pairs", max_pairs),
+            ("max_depth", max_depth),
+            ("sample", sample),
+            ("seed", seed),
+        ):
+            if value is not None:
+                conf["events"][option] = str(value)
         if working:
             conf["instrumentation"]["path"] = working
         if include:
@@ -431,11 +493,13 @@ class Config:
         if self.metrics:
             conf["events"]["metrics"] = ",".join(m.__name__ for m in self.metrics)
         if self.passing:
-            conf["events"]["passing"] = ",".join(e.path for e in self.passing)
+            conf["events"]["passing"] = ",".join(get_event_paths(self.passing))
         if self.failing:
-            conf["events"]["failing"] = ",".join(e.path for e in self.failing)
+            conf["events"]["failing"] = ",".join(get_event_paths(self.failing))
         if self.mapping_path:
             conf["events"]["mapping"] = str(self.mapping_path)
+        for option, value in self.scalar_pairs.items():
+            conf["events"][option] = str(value)
         if self.instrument_working:
             conf["instrumentation"]["path"] = str(self.instrument_working)
         if self.instrument_include:
@@ -468,6 +532,18 @@ class Config:
         return hash_identifier(self.target_path)
 
 
+def get_event_paths(event_files: List[EventFile]) -> List[str]:
+    paths = list()
+    for event_file in event_files:
+        if isinstance(event_file, StoredEventFile):
+            path = str(event_file.store.path)
+        else:
+            path = str(event_file.path)
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
 def hash_identifier(path: os.PathLike):
     return hashlib.md5(str(path).encode("utf-8")).hexdigest()
 
@@ -0,0 +1,191 @@
+import enum
+import io
+import lzma
+import os
+import shutil
+import zlib
+from typing import BinaryIO, Iterator, Optional
+
+MAGIC = b"SFLKITZ"
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+BLOCK_HEADER_SIZE = 8
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+EVENTS_COMPRESSION = "EVENTS_COMPRESSION"
+
+
+class CompressionError(ValueError):
+    pass
+
+
+class Codec(enum.Enum):
+    ZLIB = 1
+    LZMA = 2
+
+    def compress(self, data: bytes) -> bytes:
+        if self == Codec.ZLIB:
+            return zlib.compress(data)
+        else:
+            return lzma.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        if self == Codec.ZLIB:
+            return zlib.decompress(data)
+        else:
+            return lzma.decompress(data)
+
+    @staticmethod
+    def get(codec: Optional[str]) -> Optional["Codec"]:
+        if codec is None or codec.lower() in ("", "none", "false", "0"):
+            return None
+        try:
+            return Codec[codec.upper()]
+        except KeyError:
+            raise CompressionError(f"Unknown compression codec {codec}")
+
+
+def is_compressed(fp: BinaryIO) -> bool:
+    """
+    Checks whether a file, opened in binary mode and positioned at its start, holds
+    a compressed event file. Raw event files start with the length of an id, which
+    never matches the magic.
+    """
+    if hasattr(fp, "peek"):
+        return fp.peek(len(MAGIC))[: len(MAGIC)] == MAGIC
+    position = fp.tell()
+    magic = fp.read(len(MAGIC))
+    fp.seek(position)
+    return magic == MAGIC
+
+
+def read_header(fp: BinaryIO) -> Codec:
+    header = fp.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or header[: len(MAGIC)] != MAGIC:
+        raise CompressionError("Not a compressed event file")
+    if header[len(MAGIC)] != VERSION:
+        raise CompressionError(f"Unsupported compression version {header[len(MAGIC)]}")
+    try:
+        return Codec(header[len(MAGIC) + 1])
+    except ValueError:
+        raise CompressionError(f"Unknown compression codec {header[len(MAGIC) + 1]}")
+
+
+def read_blocks(fp: BinaryIO) -> Iterator[bytes]:
+    """
+    Yields the decompressed blocks of a compressed event file. A truncated last
+    block, e.g. of a run that was killed, ends the iteration.
+    """
+    codec = read_header(fp)
+    while True:
+        header = fp.read(BLOCK_HEADER_SIZE)
+        if len(header) < BLOCK_HEADER_SIZE:
+            return
+        length = int.from_bytes(header[:4], "big")
+        data = fp.read(length)
+        if len(data) < length:
+            return
+        try:
+            yield codec.decompress(data)
+        except (zlib.error, lzma.LZMAError):
+            return
+
+
+class CompressedWriter(io.RawIOBase):
+    """
+    A writable file that compresses the written events in blocks of block_size
+    uncompressed bytes. Each block is prefixed by its compressed and uncompressed
+    length, such that readers can decompress the blocks independently.
+    """
+
+    def __init__(
+        self,
+        fp: BinaryIO,
+        codec: Codec = Codec.ZLIB,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        super().__init__()
+        self.fp = fp
+        self.codec = codec
+        self.block_size = max(block_size, 1)
+        self.buffer = bytearray()
+        self.fp.write(MAGIC + bytes([VERSION, codec.value]))
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self._write_block(bytes(self.buffer[: self.block_size]))
+            del self.buffer[: self.block_size]
+        return len(data)
+
+    def _write_block(self, block: bytes):
+        data = self.codec.compress(block)
+        self.fp.write(len(data).to_bytes(4, "big"))
+        self.fp.write(len(block).to_bytes(4, "big"))
+        self.fp.write(data)
+
+    def flush(self):
+        if self.buffer:
+            self._write_block(bytes(self.buffer))
+            self.buffer.clear()
+        if not self.fp.closed:
+            self.fp.flush()
+
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.fp.close()
+        super().close()
+
+
+class CompressedReader(io.RawIOBase):
+    """
+    A readable file that decompresses a compressed event file block by block.
+    """
+
+    def __init__(self, fp: BinaryIO):
+        super().__init__()
+        self.blocks = read_blocks(fp)
+        self.block = b""
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self.position >= len(self.block):
+            self.block = next(self.blocks, None)
+            self.position = 0
+            if self.block is None:
+                self.block = b""
+                return 0
+        size = min(len(buffer), len(self.block) - self.position)
+        buffer[:size] = self.block[self.position : self.position + size]
+        self.position += size
+        return size
+
+
+def compress_file(
+    source: os.PathLike,
+    destination: os.PathLike,
+    codec: Codec = Codec.ZLIB,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+):
+    """
+    Compresses the event file at source into destination and removes source.
+    Files that are already compressed are moved as they are.
+    """
+    with open(source, "rb") as fp:
+        compressed = is_compressed(fp)
+        if not compressed:
+            with CompressedWriter(
+                open(destination, "wb"), codec=codec, block_size=block_size
+            ) as writer:
+                shutil.copyfileobj(fp, writer, block_size)
+    if compressed:
+        shutil.move(source, destination)
+    else:
+        os.remove(source)
@@ -0,0 +1,600 @@
+from typing import Iterator, Optional, List, Collection, Tuple
+
+import numpy
+from sflkitlib.events import EventType
+from sflkitlib.events.codec import ENDIAN
+from sflkitlib.events.event import Event
+
+from sflkit.events.lazy import (
+    LazyValue,
+    instantiate_def_event,
+    instantiate_function_exit_event,
+)
+from sflkit.events.mapping import EventMapping
+
+DEFAULT_BATCH_SIZE = 65536
+
+NO_VALUE = -1
+
+# The payload layouts of the records following the event id
+PLAIN = 0
+DEF = 1
+EXIT = 2
+VAR = 3
+CONDITION = 4
+LEN = 5
+
+PAYLOADS = {
+    EventType.DEF: DEF,
+    EventType.FUNCTION_EXIT: EXIT,
+    EventType.USE: VAR,
+    EventType.TEST_DEF: VAR,
+    EventType.TEST_USE: VAR,
+    EventType.CONDITION: CONDITION,
+    EventType.LEN: LEN,
+}
+
+# The events without payload whose handling only hits analysis objects, such that a
+# run of identical events can be handled at once
+REPEATABLE = {EventType.LINE, EventType.BRANCH, EventType.LOOP_HIT}
+
+# The columns of a decoded batch
+OFFSET = 0
+EVENT_ID = 1
+THREAD_ID = 2
+VAR_ID = 3
+VALUE_OFFSET = 4
+VALUE_LENGTH = 5
+EXTRA = 6
+COLUMNS = 7
+
+# The number of bytes scanned at once by the vectorized decoding, the zero bytes
+# appended to them such that reading the fields of a record never leaves them and
+# the widest event id the scan reads, wider ones are decoded record by record
+SCAN_SIZE = 16384
+SCAN_PADDING = 16
+SCAN_ID_WIDTH = 4
+# The layout of the event ids that are not in the mapping
+UNKNOWN = 8
+
+
+def get_layouts(mapping: EventMapping) -> numpy.ndarray:
+    """
+    Returns the payload layout of every event id of the mapping as an array,
+    UNKNOWN for the ids without an event.
+    """
+    return numpy.array(
+        [
+            UNKNOWN if event is None else PAYLOADS.get(event.event_type, PLAIN)
+            for event in mapping.dense
+        ],
+        dtype=numpy.int64,
+    )
+
+
+def read_words(raw: numpy.ndarray) -> numpy.ndarray:
+    """
+    Returns the big endian integer of the 8 bytes starting at every byte of raw
+    but the last 7 ones.
+    """
+    words = numpy.empty(len(raw) - 7, dtype=numpy.uint64)
+    for r in range(8):
+        count = (len(words) - r + 7) // 8
+        words[r::8] = raw[r : r + 8 * count].view(">u8")
+    return words
+
+
+def read_ints(
+    words: numpy.ndarray, positions: numpy.ndarray, lengths: numpy.ndarray
+) -> numpy.ndarray:
+    """
+    Reads the big endian integers of lengths bytes following positions, at most
+    8 bytes of each.
+    """
+    shifts = (8 * (8 - numpy.clip(lengths, 1, 8))).astype(numpy.uint64)
+    return numpy.where(lengths > 0, words[positions + 1] >> shifts, 0).astype(
+        numpy.int64
+    )
+
+
+def read_fixed(
+    words: numpy.ndarray, positions: numpy.ndarray, width: int
+) -> numpy.ndarray:
+    """
+    Reads the big endian integers of width bytes starting at positions.
+    """
+    return (words[positions] >> numpy.uint64(64 - 8 * width)).astype(numpy.int64)
+
+
+def fits(data: numpy.ndarray, positions: numpy.ndarray) -> numpy.ndarray:
+    """
+    Returns whether the length prefixed integers at positions fit into an int64.
+    """
+    lengths = data[positions]
+    return (lengths < 8) | ((lengths == 8) & (data[positions + 1] < 0x80))
+
+
+class EventBatch:
+    """
+    A batch of decoded events stored as columns. Values are kept as offsets into
+    the decoded buffer, the events built from a batch carry the raw bytes of their
+    values and unpickle them only when the value is accessed. A batch may be run
+    length encoded, in which case every record stands for counts identical events.
+    """
+
+    def __init__(
+        self,
+        buffer,
+        mapping: EventMapping,
+        records: numpy.ndarray,
+        counts: Optional[numpy.ndarray] = None,
+        layouts: Optional[numpy.ndarray] = None,
+    ):
+        self.buffer = buffer
+        self.mapping = mapping
+        self.records = records
+        self.counts = counts
+        self.layouts = get_layouts(mapping) if layouts is None else layouts
+        self._types = dict()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Event]:
+        return self.events()
+
+    @property
+    def offsets(self) -> numpy.ndarray:
+        return self.records[:, OFFSET]
+
+    @property
+    def event_ids(self) -> numpy.ndarray:
+        return self.records[:, EVENT_ID]
+
+    @property
+    def thread_ids(self) -> numpy.ndarray:
+        return self.records[:, THREAD_ID]
+
+    @property
+    def var_ids(self) -> numpy.ndarray:
+        return self.records[:, VAR_ID]
+
+    @property
+    def value_offsets(self) -> numpy.ndarray:
+        return self.records[:, VALUE_OFFSET]
+
+    @property
+    def value_lengths(self) -> numpy.ndarray:
+        return self.records[:, VALUE_LENGTH]
+
+    @property
+    def extras(self) -> numpy.ndarray:
+        return self.records[:, EXTRA]
+
+    def get_value(self, offset: int, length: int) -> bytes:
+        return self.buffer[offset : offset + length]
+
+    def get_type(self, offset: int, length: int) -> str:
+        # the type follows the value and is prefixed by a 2 byte length
+        position = offset + length
+        raw = self.buffer[
+            position
+            + 2 : position
+            + 2
+            + int.from_bytes(self.buffer[position : position + 2], ENDIAN)
+        ]
+        if raw not in self._types:
+            self._types[raw] = raw.decode("utf8")
+        return self._types[raw]
+
+    def _instantiate_payloads(self, records: List[List[int]]) -> Iterator[Event]:
+        mapping = self.mapping.dense
+        for (
+            _,
+            event_id,
+            thread_id,
+            var_id,
+            value_offset,
+            value_length,
+            extra,
+        ) in records:
+            event = mapping[event_id]
+            payload = PAYLOADS[event.event_type]
+            if thread_id == NO_VALUE:
+                thread_id = None
+            if payload == DEF:
+                yield instantiate_def_event(
+                    event,
+                    var_id,
+                    LazyValue(self.get_value(value_offset, value_length)),
+                    self.get_type(value_offset, value_length),
+                    thread_id=thread_id,
+                )
+            elif payload == EXIT:
+                yield instantiate_function_exit_event(
+                    event,
+                    LazyValue(self.get_value(value_offset, value_length)),
+                    self.get_type(value_offset, value_length),
+                    thread_id=thread_id,
+                )
+            elif payload == VAR:
+                yield event.instantiate(var_id, thread_id=thread_id)
+            elif payload == CONDITION:
+                yield event.instantiate(bool(extra), thread_id=thread_id)
+            else:
+                yield event.instantiate(var_id, extra, thread_id=thread_id)
+
+    def _instantiate(self, records: numpy.ndarray) -> List[Event]:
+        """
+        Builds the events of the records. An event without payload is built once
+        per event and thread id of the batch and shared by all of its records,
+        only the events with a payload are built record by record.
+        """
+        events = numpy.empty(len(records), dtype=object)
+        plain = self.layouts[records[:, EVENT_ID]] == PLAIN
+        rows = numpy.flatnonzero(plain)
+        if len(rows):
+            threads, thread_index = numpy.unique(
+                records[rows, THREAD_ID], return_inverse=True
+            )
+            keys, inverse = numpy.unique(
+                records[rows, EVENT_ID] * len(threads) + thread_index.reshape(-1),
+                return_inverse=True,
+            )
+            mapping = self.mapping.dense
+            thread_ids = [None if t == NO_VALUE else t for t in threads.tolist()]
+            shared = numpy.empty(len(keys), dtype=object)
+            shared[:] = [
+                mapping[key // len(threads)].instantiate(
+                    thread_id=thread_ids[key % len(threads)]
+                )
+                for key in keys.tolist()
+            ]
+            events[rows] = shared[inverse.reshape(-1)]
+        rows = numpy.flatnonzero(~plain)
+        if len(rows):
+            events[rows] = list(self._instantiate_payloads(records[rows].tolist()))
+        return events.tolist()
+
+    def events(self) -> Iterator[Event]:
+        events = self._instantiate(self.records)
+        if self.counts is None:
+            yield from events
+        else:
+            for event, count in zip(events, self.counts.tolist()):
+                for _ in range(count):
+                    yield event
+
+    def get_runs(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Returns the rows starting a run of identical events and the length of each
+        run. Only events in REPEATABLE form runs, all other events are runs of
+        their own.
+        """
+        counts = self.counts
+        if counts is None:
+            counts = numpy.ones(len(self.records), dtype=numpy.int64)
+        if len(self.records) < 2:
+            return numpy.arange(len(self.records)), counts
+        event_ids = self.event_ids
+        same = (event_ids[1:] == event_ids[:-1]) & (
+            self.thread_ids[1:] == self.thread_ids[:-1]
+        )
+        if not same.any():
+            return numpy.arange(len(self.records)), counts
+        repeatable = [
+            event_id
+            for event_id in numpy.unique(event_ids[1:][same]).tolist()
+            if self.mapping.dense[event_id].event_type in REPEATABLE
+        ]
+        same &= numpy.isin(event_ids[1:], repeatable)
+        starts = numpy.flatnonzero(numpy.concatenate(([True], ~same)))
+        return starts, numpy.add.reduceat(counts, starts)
+
+    def compress_runs(self) -> "EventBatch":
+        """
+        Returns a run length encoded copy of this batch.
+        """
+        starts, counts = self.get_runs()
+        return EventBatch(
+            self.buffer, self.mapping, self.records[starts], counts, self.layouts
+        )
+
+    def runs(self) -> Iterator[Tuple[Event, int]]:
+        starts, counts = self.get_runs()
+        return zip(self._instantiate(self.records[starts]), counts.tolist())
+
+
+class EventDecoder:
+    """
+    Decodes the binary event format written by the runtime libraries (the python
+    sflkitlib and the JCodec of jsflkit) from an in-memory or memory-mapped buffer.
+
+    Each record consists of an optional length-prefixed thread id, a length-prefixed
+    event id and a payload whose layout depends on the type of the event. The
+    decoder scans SCAN_SIZE bytes at once with numpy: it computes the end of a
+    record for every byte as if a record started there and follows the chain of
+    records from the first byte by pointer doubling. Only the records the scan
+    cannot read, e.g., ones crossing the end of the scanned bytes, are decoded
+    one by one. The records are collected into batches of columns.
+    """
+
+    def __init__(
+        self,
+        mapping: EventMapping,
+        with_thread_id: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        event_types: Optional[Collection[EventType]] = None,
+    ):
+        self.mapping = mapping
+        self.with_thread_id = with_thread_id
+        self.batch_size = max(batch_size, 1)
+        self.event_types = None if event_types is None else set(event_types)
+        # the offset of the first record not decoded by the last decode and whether
+        # it stopped at data not belonging to the mapping
+        self.position = 0
+        self.stopped = False
+        self._payloads = None
+        self._layouts = None
+        self._needed = None
+
+    def is_needed(self, event_id: int) -> bool:
+        # the validity is a property of the event the id translates to, as for
+        # the events checked by EventMapping.is_valid
+        event = self.mapping.dense[event_id]
+        return event.event_id in self.mapping.valid and (
+            self.event_types is None or event.event_type in self.event_types
+        )
+
+    def get_payloads(self) -> List[Optional[int]]:
+        """
+        Returns the payload layout of every event id as a dense list. Event ids
+        that are invalid or whose type is not needed map to the negated layout
+        minus one, such that their records are skipped without building events,
+        unknown ids map to None.
+        """
+        payloads = [None] * len(self.mapping.dense)
+        for event_id, event in enumerate(self.mapping.dense):
+            if event is not None:
+                payload = PAYLOADS.get(event.event_type, PLAIN)
+                payloads[event_id] = (
+                    payload if self.is_needed(event_id) else -payload - 1
+                )
+        return payloads
+
+    def _prepare(self):
+        if self._payloads is None:
+            self._payloads = self.get_payloads()
+            # the last entry stands for all ids beyond the mapping
+            self._layouts = numpy.append(get_layouts(self.mapping), UNKNOWN)
+            self._needed = numpy.array(
+                [payload is not None and payload >= 0 for payload in self._payloads]
+                + [False],
+                dtype=bool,
+            )
+
+    def decode(
+        self, buffer, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[EventBatch]:
+        end = len(buffer) if end is None else end
+        self._prepare()
+        position = start
+        self.position = start
+        self.stopped = False
+        records: List[numpy.ndarray] = list()
+        size = 0
+        while position < end:
+            window = min(end, position + SCAN_SIZE)
+            scanned, position = self._scan(buffer, position, window)
+            if len(scanned):
+                records.append(scanned)
+                size += len(scanned)
+            # the record the scan stopped at is decoded on its own
+            done = False
+            if position < window:
+                record, next_position = self._decode_record(buffer, position, end)
+                done = next_position == position
+                position = next_position
+                if record is not None:
+                    records.append(numpy.array([record], dtype=numpy.int64))
+                    size += 1
+            while size >= self.batch_size:
+                batch, records = numpy.concatenate(records), list()
+                yield self._create_batch(buffer, batch[: self.batch_size])
+                if len(batch) > self.batch_size:
+                    records.append(batch[self.batch_size :])
+                size -= self.batch_size
+            if done:
+                break
+        self.position = position
+        if records:
+            yield self._create_batch(buffer, numpy.concatenate(records))
+
+    def _scan(self, buffer, start: int, end: int) -> Tuple[numpy.ndarray, int]:
+        """
+        Decodes the records in buffer[start:end] at once and returns the needed
+        ones and the offset of the first record not decoded, which is end if all
+        records were decoded.
+        """
+        size = end - start
+        raw = numpy.zeros(size + SCAN_PADDING, dtype=numpy.uint8)
+        raw[:size] = numpy.frombuffer(
+            buffer, dtype=numpy.uint8, count=size, offset=start
+        )
+        data, words = raw.astype(numpy.int64), read_words(raw)
+        # the record starting at each byte, read positions are clamped to the
+        # padding while the computed positions are not
+        positions = numpy.arange(size, dtype=numpy.int64)
+        valid = numpy.ones(size, dtype=bool)
+        if self.with_thread_id:
+            valid &= fits(data, positions)
+            positions = positions + 1 + data[positions]
+        read = numpy.minimum(positions, size)
+        lengths = data[read]
+        valid &= (lengths >= 1) & (lengths <= SCAN_ID_WIDTH)
+        event_ids = numpy.minimum(
+            read_ints(words, read, numpy.minimum(lengths, SCAN_ID_WIDTH)),
+            len(self._layouts) - 1,
+        )
+        positions = positions + 1 + lengths
+        layouts = self._layouts[event_ids]
+        valid &= layouts != UNKNOWN
+        ends = positions
+        special = numpy.flatnonzero(valid & (layouts != PLAIN))
+        payloads = self._scan_payloads(
+            data, words, size, layouts[special], ends[special]
+        )
+        ends[special] = payloads[0]
+        valid[special] &= payloads[1]
+        valid &= ends <= size
+
+        # follow the records from the first byte, after k steps the starts are
+        # the records reachable in less than 2**k records and jump skips 2**k
+        # records, such that the reached records of each step are new ones
+        jump = numpy.empty(size + 2, dtype=numpy.int64)
+        jump[:size] = numpy.where(valid, ends, size + 1)
+        jump[size:] = (size, size + 1)
+        starts = numpy.zeros(1, dtype=numpy.int64)
+        while True:
+            reached = jump[starts]
+            starts = numpy.concatenate((starts, reached[reached < size]))
+            if jump[0] >= size:
+                break
+            jump = jump[jump]
+        starts.sort()
+        if len(starts) and not valid[starts[-1]]:
+            position = start + int(starts[-1])
+            starts = starts[:-1]
+        else:
+            position = end
+
+        starts = starts[self._needed[event_ids[starts]]]
+        records = numpy.full((len(starts), COLUMNS), NO_VALUE, dtype=numpy.int64)
+        records[:, OFFSET] = start + starts
+        records[:, EVENT_ID] = event_ids[starts]
+        if self.with_thread_id:
+            records[:, THREAD_ID] = read_ints(words, starts, data[starts])
+        rows = numpy.flatnonzero(layouts[starts] != PLAIN)
+        if len(rows):
+            index = numpy.searchsorted(special, starts[rows])
+            for column, values in zip(
+                (VAR_ID, VALUE_OFFSET, VALUE_LENGTH, EXTRA), payloads[2:]
+            ):
+                records[rows, column] = values[index]
+            with_value = records[rows, VALUE_OFFSET] != NO_VALUE
+            records[rows[with_value], VALUE_OFFSET] += start
+        return records, position
+
+    @staticmethod
+    def _scan_payloads(
+        data: numpy.ndarray,
+        words: numpy.ndarray,
+        size: int,
+        layouts: numpy.ndarray,
+        positions: numpy.ndarray,
+    ) -> Tuple[numpy.ndarray, ...]:
+        """
+        Reads the payloads of the given layouts starting at positions and returns
+        their ends, whether they can be read and their var ids, value offsets,
+        value lengths and extras.
+        """
+        valid = numpy.ones(len(positions), dtype=bool)
+        var_ids = numpy.full(len(positions), NO_VALUE, dtype=numpy.int64)
+        value_offsets = var_ids.copy()
+        value_lengths = var_ids.copy()
+        extras = var_ids.copy()
+
+        with_var = (layouts == VAR) | (layouts == DEF) | (layouts == LEN)
+        read = numpy.minimum(positions, size)
+        valid &= ~with_var | fits(data, read)
+        var_ids = numpy.where(with_var, read_ints(words, read, data[read]), var_ids)
+        positions = numpy.where(with_var, positions + 1 + data[read], positions)
+
+        with_value = (layouts == DEF) | (layouts == EXIT)
+        read = numpy.minimum(positions, size)
+        value_lengths = numpy.where(
+            with_value, read_fixed(words, read, 4), value_lengths
+        )
+        value_offsets = numpy.where(with_value, positions + 4, value_offsets)
+        types = numpy.minimum(positions + 4 + numpy.maximum(value_lengths, 0), size)
+        positions = numpy.where(
+            with_value,
+            positions + 6 + value_lengths + read_fixed(words, types, 2),
+            positions,
+        )
+
+        with_len = layouts == LEN
+        read = numpy.minimum(positions, size)
+        valid &= ~with_len | fits(data, read)
+        extras = numpy.where(with_len, read_ints(words, read, data[read]), extras)
+        positions = numpy.where(with_len, positions + 1 + data[read], positions)
+
+        with_condition = layouts == CONDITION
+        extras = numpy.where(with_condition, data[read], extras)
+        positions = numpy.where(with_condition, positions + 1, positions)
+        return positions, valid, var_ids, value_offsets, value_lengths, extras
+
+    def _decode_record(
+        self, buffer, position: int, end: int
+    ) -> Tuple[Optional[Tuple[int, ...]], int]:
+        """
+        Decodes the record at position on its own and returns it, None if it is
+        not needed, and the offset of the following record. The offset is
+        position if the record is truncated or not an event of the mapping.
+        """
+        payloads = self._payloads
+        from_bytes = int.from_bytes
+        record = position
+        thread_id = var_id = value_offset = value_length = extra = NO_VALUE
+        try:
+            if self.with_thread_id:
+                n = buffer[position]
+                thread_id = from_bytes(buffer[position + 1 : position + 1 + n], ENDIAN)
+                position += 1 + n
+            n = buffer[position]
+            event_id = from_bytes(buffer[position + 1 : position + 1 + n], ENDIAN)
+            position += 1 + n
+            if position > end:
+                return None, record
+            payload = payloads[event_id] if event_id < len(payloads) else None
+            if payload is None:
+                # not an event of this mapping, the remaining data is corrupt
+                self.stopped = True
+                return None, record
+            valid = payload >= 0
+            if not valid:
+                payload = -payload - 1
+            if payload == VAR or payload == DEF or payload == LEN:
+                n = buffer[position]
+                var_id = from_bytes(buffer[position + 1 : position + 1 + n], ENDIAN)
+                position += 1 + n
+                if payload == LEN:
+                    n = buffer[position]
+                    extra = from_bytes(buffer[position + 1 : position + 1 + n], ENDIAN)
+                    position += 1 + n
+            if payload == DEF or payload == EXIT:
+                value_length = from_bytes(buffer[position : position + 4], ENDIAN)
+                value_offset = position + 4
+                position = value_offset + value_length
+                position += 2 + from_bytes(buffer[position : position + 2], ENDIAN)
+            elif payload == CONDITION:
+                extra = buffer[position]
+                position += 1
+        except IndexError:
+            return None, record
+        if position > end:
+            return None, record
+        if not valid:
+            return None, position
+        return (
+            record,
+            event_id,
+            thread_id,
+            var_id,
+            value_offset,
+            value_length,
+            extra,
+        ), position
+
+    def _create_batch(self, buffer, records: numpy.ndarray) -> EventBatch:
+        return EventBatch(buffer, self.mapping, records, layouts=self._layouts)
@@ -1,8 +1,19 @@
+import io
+import mmap
 import os
 from pickle import PickleError
+from typing import Iterator, Optional, Collection, Tuple
 
-from sflkitlib.events import event
+from sflkitlib.events import event, EventType
+from sflkitlib.events.event import Event
 
+from sflkit.events.compression import is_compressed, read_blocks, CompressedReader
+from sflkit.events.decoder import (
+    EventDecoder,
+    EventBatch,
+    DEFAULT_BATCH_SIZE,
+    REPEATABLE,
+)
 from sflkit.events.mapping import EventMapping
 
 
@@ -14,14 +25,21 @@ class EventFile(object):
         mapping: EventMapping,
         failing: bool = False,
         thread_support: bool = False,
+        bulk: bool = True,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        event_types: Optional[Collection[EventType]] = None,
     ):
         self.path = path
         self.run_id = run_id
         self.mapping = mapping
         self.failing = failing
         self.thread_support = thread_support
+        self.bulk = bulk
+        self.batch_size = batch_size
+        self.event_types = None if event_types is None else set(event_types)
         self._csv_reader = None
         self._file_pointer = None
+        self.compressed = False
 
     def __hash__(self):
         return hash(self.run_id)
@@ -31,8 +49,16 @@ class EventFile(object):
             return False
         return self.run_id == other.run_id
 
+    def __getstate__(self):
+        # the open file is not pickled, entering the event file opens it again
+        state = self.__dict__.copy()
+        state["_file_pointer"] = None
+        state["_csv_reader"] = None
+        return state
+
     def __enter__(self):
         self._file_pointer = open(self.path, "rb")
+        self.compressed = is_compressed(self._file_pointer)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -44,15 +70,83 @@ class EventFile(object):
     def __str__(self):
         return repr(self)
 
-    def load(self):
-        while self._file_pointer.peek(1):
+    def get_decoder(self) -> EventDecoder:
+        return EventDecoder(
+            self.mapping,
+            with_thread_id=self.thread_support,
+            batch_size=self.batch_size,
+            event_types=self.event_types,
+        )
+
+    def _load_compressed_batches(self) -> Iterator[EventBatch]:
+        decoder = self.get_decoder()
+        rest = b""
+        for block in read_blocks(self._file_pointer):
+            buffer = rest + block
+            yield from decoder.decode(buffer)
+            if decoder.stopped:
+                return
+            rest = buffer[decoder.position :]
+
+    def load_batches(self) -> Iterator[EventBatch]:
+        if self.compressed:
+            yield from self._load_compressed_batches()
+            return
+        if os.fstat(self._file_pointer.fileno()).st_size == 0:
+            return
+        buffer = mmap.mmap(self._file_pointer.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield from self.get_decoder().decode(buffer)
+        finally:
+            buffer.close()
+
+    def _load_stream(self):
+        if self.compressed:
+            file_pointer = io.BufferedReader(CompressedReader(self._file_pointer))
+        else:
+            file_pointer = self._file_pointer
+        while file_pointer.peek(1):
             try:
                 e = event.load_next_event(
-                    self._file_pointer,
-                    self.mapping.mapping,
+                    file_pointer,
+                    self.mapping.dense,
                     with_thread_id=self.thread_support,
                 )
-                if self.mapping.is_valid(e):
+                if self.mapping.is_valid(e) and (
+                    self.event_types is None or e.event_type in self.event_types
+                ):
                     yield e
-            except (IndexError, ValueError, PickleError, KeyError):
+            except (IndexError, ValueError, PickleError, KeyError, AttributeError):
                 break
+
+    def load(self):
+        if self.bulk:
+            for batch in self.load_batches():
+                yield from batch.events()
+        else:
+            yield from self._load_stream()
+
+    def load_runs(self) -> Iterator[Tuple[Event, int]]:
+        """
+        Loads the events run length encoded, i.e., yields each event together with
+        the number of times it occurred in a row.
+        """
+        if self.bulk:
+            for batch in self.load_batches():
+                yield from batch.runs()
+        else:
+            last, repeat = None, 0
+            for e in self._load_stream():
+                if (
+                    last is not None
+                    and e.event_id == last.event_id
+                    and e.thread_id == last.thread_id
+                    and e.event_type in REPEATABLE
+                ):
+                    repeat += 1
+                else:
+                    if last is not None:
+                        yield last, repeat
+                    last, repeat = e, 1
+            if last is not None:
+                yield last, repeat
@@ -0,0 +1,132 @@
+import pickle
+from typing import Any, Optional
+
+from sflkitlib.events.event import DefEvent, FunctionExitEvent, Event
+
+
+def decode_value(value: bytes) -> Any:
+    # noinspection PyBroadException
+    try:
+        return pickle.loads(value)
+    except Exception:
+        value = value.decode("utf8", errors="replace")
+        if value == "True":
+            return True
+        elif value == "False":
+            return False
+        else:
+            return None
+
+
+UNDECODED = object()
+
+
+class LazyValue:
+    """
+    The raw bytes of a value written by the runtime, unpickled the first time the
+    value is requested.
+    """
+
+    __slots__ = ("raw", "_value")
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self._value = UNDECODED
+
+    def get(self) -> Any:
+        value = self._value
+        if value is UNDECODED:
+            value = self._value = decode_value(self.raw)
+        return value
+
+
+def unwrap(value: Any) -> Any:
+    if isinstance(value, LazyValue):
+        return value.get()
+    return value
+
+
+class LazyDefEvent(DefEvent):
+    @property
+    def value(self) -> Any:
+        return unwrap(self._value)
+
+    @value.setter
+    def value(self, value: Any):
+        self._value = value
+
+    def __repr__(self):
+        return (
+            f"{DefEvent.__name__}({self.file},{self.line},{self.event_id},"
+            f"{self.var},{self.var_id},{self.value})"
+        )
+
+
+class LazyFunctionExitEvent(FunctionExitEvent):
+    @property
+    def return_value(self) -> Any:
+        return unwrap(self._return_value)
+
+    @return_value.setter
+    def return_value(self, value: Any):
+        self._return_value = value
+
+    def __repr__(self):
+        return (
+            f"{FunctionExitEvent.__name__}({self.file},{self.line},{self.event_id},"
+            f"{self.function},{self.return_value},{self.type_})"
+        )
+
+
+def get_lazy_value(event: Event) -> Any:
+    """
+    Returns the value of a def or function exit event without unpickling it, if the
+    event was decoded lazily.
+    """
+    if isinstance(event, LazyDefEvent):
+        return event._value
+    elif isinstance(event, LazyFunctionExitEvent):
+        return event._return_value
+    elif isinstance(event, DefEvent):
+        return event.value
+    elif isinstance(event, FunctionExitEvent):
+        return event.return_value
+    return None
+
+
+def instantiate_def_event(
+    event: DefEvent,
+    var_id: int,
+    value: LazyValue,
+    type_: str,
+    thread_id: Optional[int] = None,
+) -> LazyDefEvent:
+    return LazyDefEvent(
+        event.file,
+        event.line,
+        event.event_id,
+        event.var,
+        var_id,
+        value,
+        type_,
+        thread_id,
+    )
+
+
+def instantiate_function_exit_event(
+    event: FunctionExitEvent,
+    value: LazyValue,
+    type_: str,
+    thread_id: Optional[int] = None,
+) -> LazyFunctionExitEvent:
+    return LazyFunctionExitEvent(
+        event.file,
+        event.line,
+        event.event_id,
+        event.function,
+        event.function_id,
+        event.tmp_var,
+        value,
+        type_,
+        thread_id,
+    )
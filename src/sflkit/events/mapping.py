@@ -1,17 +1,64 @@
+import hashlib
 import json
 import os
+import pickle
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, List
 
 from sflkitlib.events.event import Event, load_json, EventEncoder, load
 
 SFLKIT_PATH = Path.home() / ".sflkit"
+MAPPING_CACHE = SFLKIT_PATH / "cache"
+MAPPING_CACHE_VERSION = 1
 
 
 class InstrumentationError(RuntimeError):
     pass
 
 
+def get_cache_path(file: Path) -> Path:
+    return (
+        MAPPING_CACHE
+        / f"{hashlib.sha256(str(Path(file).resolve()).encode()).hexdigest()}.pickle"
+    )
+
+
+def load_cached_json(file: Path) -> Dict[int, Event]:
+    """
+    Loads the events of a json mapping from a binary cache, keyed by the path, size
+    and modification time of the mapping. The cache is rebuilt whenever the
+    mapping changes, failing to read or write the cache falls back to the json.
+    """
+    file = Path(file)
+    stat = file.stat()
+    key = (
+        MAPPING_CACHE_VERSION,
+        str(file.resolve()),
+        stat.st_size,
+        stat.st_mtime_ns,
+    )
+    cache = get_cache_path(file)
+    # noinspection PyBroadException
+    try:
+        with cache.open("rb") as fp:
+            if pickle.load(fp) == key:
+                return pickle.load(fp)
+    except Exception:
+        pass
+    events = load_json(file)
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        MAPPING_CACHE.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as fp:
+            pickle.dump(key, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(events, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except (OSError, pickle.PickleError):
+        if tmp.exists():
+            tmp.unlink()
+    return events
+
+
 class EventMapping:
     def __init__(
         self,
@@ -26,22 +73,37 @@ class EventMapping:
         self.valid = set(self.translation.values())
         self.alternative_mapping = alternative_mapping or dict()
         self.mapping = dict()
+        self._dense = None
         self.build_translation()
 
     def get(self, event_id) -> Optional[Event]:
         return self.mapping.get(event_id, None)
 
+    @property
+    def dense(self) -> List[Optional[Event]]:
+        """
+        The events indexed by their ids, None for ids without an event. Event ids
+        are dense, such that a list is the faster lookup in the decoding loops.
+        """
+        if self._dense is None:
+            dense = [None] * (max(self.mapping, default=-1) + 1)
+            for event_id, event in self.mapping.items():
+                dense[event_id] = event
+            self._dense = dense
+        return self._dense
+
     def build_translation(self):
         if not self.translation:
             self.translation = {
                 event_id: event_id for event_id in self.original_mapping
             }
             self.valid = set(self.translation.values())
-        self.mapping = dict()
-        for id_ in self.translation:
-            translated_id = self.translation[id_]
-            if translated_id in self.original_mapping:
-                self.mapping[id_] = self.original_mapping[translated_id]
+        self._dense = None
+        self.mapping = {
+            id_: self.original_mapping[translated_id]
+            for id_, translated_id in self.translation.items()
+            if translated_id in self.original_mapping
+        }
         for id_ in self.alternative_mapping:
             if id_ not in self.original_mapping:
                 self.mapping[id_] = self.alternative_mapping[id_]
@@ -62,7 +124,7 @@ class EventMapping:
     @staticmethod
     def load_from_file(file: Path, path: Optional[os.PathLike] = None):
         if file.exists():
-            return EventMapping(load_json(file), file)
+            return EventMapping(load_cached_json(file), file)
         else:
             raise InstrumentationError(
                 f"Cannot find information about instrumentation of {path or file}"
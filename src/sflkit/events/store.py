@@ -0,0 +1,295 @@
+import copy
+import json
+import mmap
+import os
+from threading import Lock
+from typing import List, Iterator, Optional, Collection
+
+import numpy
+from numpy.lib.format import open_memmap
+from sflkitlib.events import EventType
+from sflkitlib.events.codec import ENDIAN
+
+from sflkit.events.decoder import (
+    EventBatch,
+    DEFAULT_BATCH_SIZE,
+    OFFSET,
+    EVENT_ID,
+    THREAD_ID,
+    VAR_ID,
+    VALUE_OFFSET,
+    VALUE_LENGTH,
+    EXTRA,
+    COLUMNS,
+    NO_VALUE,
+)
+from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
+from sflkit.language.meta import IDGenerator
+
+STORE_META = "store.json"
+STORE_VALUES = "values.bin"
+STORE_VERSION = 1
+
+EVENT_IDS = "event_ids"
+RUN_IDS = "run_ids"
+THREAD_IDS = "thread_ids"
+VAR_IDS = "var_ids"
+VALUE_OFFSETS = "value_offsets"
+VALUE_LENGTHS = "value_lengths"
+EXTRAS = "extras"
+COUNTS = "counts"
+
+STORE_COLUMNS = {
+    EVENT_IDS: EVENT_ID,
+    RUN_IDS: None,
+    THREAD_IDS: THREAD_ID,
+    VAR_IDS: VAR_ID,
+    VALUE_OFFSETS: VALUE_OFFSET,
+    VALUE_LENGTHS: VALUE_LENGTH,
+    EXTRAS: EXTRA,
+}
+
+
+class EventStore:
+    """
+    A columnar store of the events of many runs. Every column is a numpy array
+    spanning all runs, the runs are consecutive ranges of rows described in the
+    meta file. The values of def and function exit events are copied together with
+    their types into a separate heap, keeping the layout of the event files, such
+    that the batches of the store decode values exactly like the event files.
+    Runs of identical events are run length encoded, the counts column holds the
+    number of events each row stands for.
+    """
+
+    def __init__(self, path: os.PathLike):
+        self.path = path
+        with open(os.path.join(path, STORE_META), "r") as fp:
+            meta = json.load(fp)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported event store version {meta.get('version')}")
+        self.runs: List[dict] = meta["runs"]
+        self.columns = None
+        self.values = None
+        # the number of entered event files of the store, the columns and values
+        # are mapped while at least one of them is entered
+        self.users = 0
+        self._lock = Lock()
+
+    def __getstate__(self):
+        # the mapped columns and values are not pickled, they are mapped again
+        # when an event file of the store is entered
+        state = self.__dict__.copy()
+        state["columns"] = None
+        state["values"] = None
+        state["users"] = 0
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @staticmethod
+    def is_store(path: os.PathLike) -> bool:
+        return os.path.isdir(path) and os.path.isfile(os.path.join(path, STORE_META))
+
+    def __len__(self):
+        return self.runs[-1]["end"] if self.runs else 0
+
+    def open(self):
+        with self._lock:
+            self.users += 1
+            if self.columns is None:
+                self._map()
+
+    def close(self):
+        with self._lock:
+            self.users = max(self.users - 1, 0)
+            if self.users == 0 and self.columns is not None:
+                if isinstance(self.values, mmap.mmap):
+                    self.values.close()
+                self.columns = None
+                self.values = None
+
+    def _map(self):
+        self.columns = {
+            column: numpy.load(os.path.join(self.path, f"{column}.npy"), mmap_mode="r")
+            for column in list(STORE_COLUMNS) + [COUNTS]
+        }
+        values = os.path.join(self.path, STORE_VALUES)
+        if os.path.getsize(values) > 0:
+            with open(values, "rb") as fp:
+                self.values = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.values = b""
+
+    def get_records(self, start: int, end: int) -> numpy.ndarray:
+        records = numpy.empty((end - start, COLUMNS), dtype=numpy.int64)
+        records[:, OFFSET] = numpy.arange(start, end)
+        for column, index in STORE_COLUMNS.items():
+            if index is not None:
+                records[:, index] = self.columns[column][start:end]
+        return records
+
+    def get_counts(self, start: int, end: int) -> numpy.ndarray:
+        return numpy.array(self.columns[COUNTS][start:end], dtype=numpy.int64)
+
+    def get_event_files(
+        self,
+        run_id_generator: IDGenerator,
+        mapping: EventMapping,
+        failing: Optional[bool] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        event_types: Optional[Collection[EventType]] = None,
+    ) -> List["StoredEventFile"]:
+        return [
+            StoredEventFile(
+                self,
+                run,
+                run_id_generator.get_next_id(),
+                mapping,
+                batch_size=batch_size,
+                event_types=event_types,
+            )
+            for run in range(len(self.runs))
+            if failing is None or self.runs[run]["failing"] == failing
+        ]
+
+
+class StoredEventFile(EventFile):
+    """
+    A run inside an event store, behaving like the event file it was compacted from.
+    """
+
+    def __init__(
+        self,
+        store: EventStore,
+        run: int,
+        run_id: int,
+        mapping: EventMapping,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        event_types: Optional[Collection[EventType]] = None,
+    ):
+        meta = store.runs[run]
+        super().__init__(
+            meta["path"],
+            run_id,
+            mapping,
+            failing=meta["failing"],
+            thread_support=meta["thread_support"],
+            batch_size=batch_size,
+            event_types=event_types,
+        )
+        self.store = store
+        self.run = run
+        self.start = meta["start"]
+        self.end = meta["end"]
+
+    def __enter__(self):
+        self.store.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.store.close()
+
+    def get_needed(self) -> Optional[numpy.ndarray]:
+        if self.event_types is None:
+            return None
+        needed = numpy.zeros(max(self.mapping.mapping, default=-1) + 1, dtype=bool)
+        for event_id, event in self.mapping.mapping.items():
+            needed[event_id] = event.event_type in self.event_types
+        return needed
+
+    def load_batches(self) -> Iterator[EventBatch]:
+        needed = self.get_needed()
+        for start in range(self.start, self.end, self.batch_size):
+            end = min(start + self.batch_size, self.end)
+            records = self.store.get_records(start, end)
+            counts = self.store.get_counts(start, end)
+            if needed is not None:
+                mask = needed[records[:, EVENT_ID]]
+                records, counts = records[mask], counts[mask]
+            yield EventBatch(self.store.values, self.mapping, records, counts)
+
+
+def compact(event_files: List[EventFile], path: os.PathLike) -> EventStore:
+    """
+    Converts the event files into an event store at path, run length encoding
+    the runs of identical events inside each batch. The columns are first
+    written as raw arrays and converted into npy files at the end, such that
+    neither the events nor the values ever have to fit into memory at once.
+    """
+    os.makedirs(path, exist_ok=True)
+    raw = {
+        column: open(os.path.join(path, f"{column}.raw"), "wb")
+        for column in list(STORE_COLUMNS) + [COUNTS]
+    }
+    runs = list()
+    position = 0
+    try:
+        with open(os.path.join(path, STORE_VALUES), "wb") as values:
+            heap = 0
+            for run, event_file in enumerate(event_files):
+                if event_file.event_types is not None:
+                    # the store keeps all events to serve any later analysis
+                    event_file = copy.copy(event_file)
+                    event_file.event_types = None
+                start = position
+                with event_file:
+                    for batch in event_file.load_batches():
+                        batch = batch.compress_runs()
+                        records = batch.records.copy()
+                        for row in numpy.flatnonzero(
+                            records[:, VALUE_OFFSET] != NO_VALUE
+                        ):
+                            offset = int(records[row, VALUE_OFFSET])
+                            length = int(records[row, VALUE_LENGTH])
+                            end = offset + length
+                            end += 2 + int.from_bytes(
+                                batch.buffer[end : end + 2], ENDIAN
+                            )
+                            values.write(batch.buffer[offset:end])
+                            records[row, VALUE_OFFSET] = heap
+                            heap += end - offset
+                        for column, index in STORE_COLUMNS.items():
+                            if index is None:
+                                numpy.full(len(records), run, dtype=numpy.int64).tofile(
+                                    raw[column]
+                                )
+                            else:
+                                numpy.ascontiguousarray(records[:, index]).tofile(
+                                    raw[column]
+                                )
+                        batch.counts.tofile(raw[COUNTS])
+                        position += len(records)
+                runs.append(
+                    {
+                        "path": str(event_file.path),
+                        "failing": event_file.failing,
+                        "thread_support": event_file.thread_support,
+                        "start": start,
+                        "end": position,
+                    }
+                )
+    finally:
+        for fp in raw.values():
+            fp.close()
+    for column in list(STORE_COLUMNS) + [COUNTS]:
+        raw_path = os.path.join(path, f"{column}.raw")
+        array = open_memmap(
+            os.path.join(path, f"{column}.npy"),
+            mode="w+",
+            dtype=numpy.int64,
+            shape=(position,),
+        )
+        if position > 0:
+            array[:] = numpy.memmap(
+                raw_path, dtype=numpy.int64, mode="r", shape=(position,)
+            )
+        array.flush()
+        del array
+        os.remove(raw_path)
+    with open(os.path.join(path, STORE_META), "w") as fp:
+        json.dump({"version": STORE_VERSION, "runs": runs}, fp, indent=2)
+    return EventStore(path)
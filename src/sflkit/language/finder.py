@@ -1,12 +1,111 @@
+import hashlib
+import os
+import pickle
+import threading
 from abc import abstractmethod, ABC
+from pathlib import Path
+from typing import Dict, Tuple, Any, List, Set, Optional
+
+from sflkit.events.mapping import SFLKIT_PATH
+
+LOCATIONS_CACHE = "LOCATIONS_CACHE"
+LOCATIONS_CACHE_PATH = SFLKIT_PATH / "locations"
+LOCATIONS_CACHE_VERSION = 1
+
+# the key of a location is its kind, its line and the name of the function or
+# whether the then branch is meant for branches
+Key = Tuple[str, int, Any]
+
+
+class LocationIndex(ABC):
+    """
+    The line ranges of the functions, loops and branches of a source file. The
+    index of a file is parsed once and kept in memory as long as the file does not
+    change. If the environment variable LOCATIONS_CACHE is set, the indices are
+    also cached on disk, keyed by the hash of the content of the file.
+    """
+
+    FUNCTION = "function"
+    LOOP = "loop"
+    BRANCH = "branch"
+
+    _indices: Dict[Tuple[type, str], Tuple[Tuple[int, int], "LocationIndex"]] = dict()
+    _lock = threading.Lock()
+
+    def __init__(self, locations: Dict[Key, List[Tuple[int, int]]]):
+        self.locations = locations
+
+    def get(self, kind: str, line: int, name: Any = None) -> Set[int]:
+        lines = {line}
+        for start, end in self.locations.get((kind, line, name), ()):
+            lines.update(range(start, end + 1))
+        return lines
+
+    @staticmethod
+    @abstractmethod
+    def parse(source: str) -> Dict[Key, List[Tuple[int, int]]]:
+        pass
+
+    @classmethod
+    def get_index(cls, path: os.PathLike) -> "LocationIndex":
+        path = str(Path(path).resolve())
+        stat = os.stat(path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        entry = cls._indices.get((cls, path))
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        with open(path, "rb") as fp:
+            content = fp.read()
+        index = cls(cls._load(content))
+        with cls._lock:
+            cls._indices[(cls, path)] = (key, index)
+        return index
+
+    @classmethod
+    def _load(cls, content: bytes) -> Dict[Key, List[Tuple[int, int]]]:
+        if not os.environ.get(LOCATIONS_CACHE):
+            return cls.parse(content.decode())
+        digest = hashlib.sha256(content).hexdigest()
+        cache = LOCATIONS_CACHE_PATH / f"{cls.__name__}-{digest}.pickle"
+        # noinspection PyBroadException
+        try:
+            with cache.open("rb") as fp:
+                if pickle.load(fp) == LOCATIONS_CACHE_VERSION:
+                    return pickle.load(fp)
+        except Exception:
+            pass
+        locations = cls.parse(content.decode())
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            LOCATIONS_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as fp:
+                pickle.dump(LOCATIONS_CACHE_VERSION, fp)
+                pickle.dump(locations, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cache)
+        except (OSError, pickle.PickleError):
+            if tmp.exists():
+                tmp.unlink()
+        return locations
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._indices.clear()
 
 
 class LocationsFinder(ABC):
+    INDEX: Optional[type] = None
+
     def __init__(self, file: str, line: int):
         self.file = file
         self.line = line
         self.lines = {line}
 
+    def get_index(self, base_dir: str) -> LocationIndex:
+        if os.path.isfile(base_dir):
+            base_dir = ""
+        return self.INDEX.get_index(os.path.join(base_dir, self.file))
+
     @abstractmethod
     def get_locations(self, base_dir: str):
         pass
@@ -17,12 +116,26 @@ class FunctionFinder(LocationsFinder, ABC):
         super().__init__(file, line)
         self.target = target
 
+    def get_locations(self, base_dir: str):
+        self.lines |= self.get_index(base_dir).get(
+            LocationIndex.FUNCTION, self.line, self.target
+        )
+        return sorted(self.lines)
+
 
 class LoopFinder(LocationsFinder, ABC):
-    pass
+    def get_locations(self, base_dir: str):
+        self.lines |= self.get_index(base_dir).get(LocationIndex.LOOP, self.line)
+        return sorted(self.lines)
 
 
 class BranchFinder(LocationsFinder, ABC):
     def __init__(self, file: str, line: int, then: bool):
         super().__init__(file, line)
         self.then = then
+
+    def get_locations(self, base_dir: str):
+        self.lines |= self.get_index(base_dir).get(
+            LocationIndex.BRANCH, self.line, self.then
+        )
+        return sorted(self.lines)
@@ -0,0 +1,95 @@
+from typing import Dict, List, Tuple
+
+import jast
+
+from sflkit.language.finder import (
+    Key,
+    LocationIndex,
+    LocationsFinder,
+    FunctionFinder,
+    LoopFinder,
+    BranchFinder,
+)
+
+
+class JavaLocationIndexBuilder(jast.JNodeVisitor):
+    def __init__(self):
+        self.locations: Dict[Key, List[Tuple[int, int]]] = dict()
+
+    def add(self, key: Key, *ranges: Tuple[int, int]):
+        self.locations.setdefault(key, []).extend(ranges)
+
+    def visit_function(self, node: jast.Method | jast.Constructor):
+        self.add(
+            (LocationIndex.FUNCTION, node.lineno, node.id.value),
+            (node.lineno, node.end_lineno),
+        )
+        return self.generic_visit(node)
+
+    def visit_Method(self, node: jast.Method):
+        return self.visit_function(node)
+
+    def visit_Constructor(self, node: jast.Constructor):
+        return self.visit_function(node)
+
+    def visit_loop(self, node: jast.For | jast.ForEach | jast.While | jast.DoWhile):
+        self.add(
+            (LocationIndex.LOOP, node.lineno, None), (node.lineno, node.end_lineno)
+        )
+        # the branches of a loop are entering its body or leaving the loop
+        self.add(
+            (LocationIndex.BRANCH, node.lineno, True), (node.lineno, node.end_lineno)
+        )
+        self.add((LocationIndex.BRANCH, node.lineno, False), (node.lineno, node.lineno))
+        return self.generic_visit(node)
+
+    def visit_For(self, node: jast.For):
+        return self.visit_loop(node)
+
+    def visit_ForEach(self, node: jast.ForEach):
+        return self.visit_loop(node)
+
+    def visit_While(self, node: jast.While):
+        return self.visit_loop(node)
+
+    def visit_DoWhile(self, node: jast.DoWhile):
+        return self.visit_loop(node)
+
+    def visit_If(self, node: jast.If):
+        test = (node.lineno, node.test.end_lineno)
+        self.add(
+            (LocationIndex.BRANCH, node.lineno, True),
+            test,
+            (node.body.lineno, node.body.end_lineno),
+        )
+        self.add((LocationIndex.BRANCH, node.lineno, False), test)
+        if node.orelse:
+            self.add(
+                (LocationIndex.BRANCH, node.lineno, False),
+                (node.orelse.lineno, node.orelse.end_lineno),
+            )
+        return self.generic_visit(node)
+
+
+class JavaLocationIndex(LocationIndex):
+    @staticmethod
+    def parse(source: str) -> Dict[Key, List[Tuple[int, int]]]:
+        builder = JavaLocationIndexBuilder()
+        builder.visit(jast.parse(source))
+        return builder.locations
+
+
+class JavaLocationsFinder(LocationsFinder):
+    INDEX = JavaLocationIndex
+
+
+class JavaFunctionFinder(JavaLocationsFinder, FunctionFinder):
+    pass
+
+
+class JavaLoopFinder(JavaLocationsFinder, LoopFinder):
+    pass
+
+
+class JavaBranchFinder(BranchFinder, JavaLocationsFinder):
+    pass
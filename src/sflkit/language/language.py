@@ -7,6 +7,11 @@ import sflkit.language.python.factory as python_factory
 from sflkit.analysis.analysis_type import AnalysisObject
 from sflkit.language.extract import VariableExtract, ConditionExtract
 from sflkit.language.finder import BranchFinder, LoopFinder, FunctionFinder
+from sflkit.language.java.finder import (
+    JavaFunctionFinder,
+    JavaLoopFinder,
+    JavaBranchFinder,
+)
 from sflkit.language.meta import MetaVisitor
 from sflkit.language.python.extract import PythonVarExtract, PythonConditionExtract
 from sflkit.language.python.finder import (
@@ -91,4 +96,14 @@ class Language(enum.Enum):
         ["py"],
     )
     C = (None, dict(), None, None, None, None, None, None, ["c", "h"])
-    JAVA = (None, dict(), None, None, None, None, None, None, ["java"])
+    JAVA = (
+        None,
+        dict(),
+        None,
+        None,
+        None,
+        JavaFunctionFinder,
+        JavaLoopFinder,
+        JavaBranchFinder,
+        ["java"],
+    )
@@ -1,8 +1,12 @@
-from concurrent.futures import ThreadPoolExecutor
+import threading
 from typing import Set, List, Optional
 
 from sflkit.analysis.analysis_type import AnalysisObject
+from sflkit.analysis.matrix import HitMatrix, HitRecorder
+from sflkit.analysis.table import AnalysisTable
+from sflkit.events.decoder import REPEATABLE
 from sflkit.events.event_file import EventFile
+from sflkit.events.lazy import get_lazy_value
 from sflkit.model.scope import Scope
 from sflkitlib.events.event import (
     Event,
@@ -43,14 +47,62 @@ class Model:
         self.variables: dict[EventFile, Scope] = dict()
         self.returns: dict[EventFile, Scope] = dict()
         self.workers: int = max(workers, 1)
+        # in streaming mode, the observations of a run are collapsed into the
+        # counts of its analysis objects as soon as the run is finished
+        self.streaming = False
+        self.touched: dict[EventFile, Set[AnalysisObject]] = dict()
+        self._lock = threading.Lock()
+        self.matrix: Optional[HitMatrix] = None
+        # if set, the observations are recorded into a bit matrix while the runs
+        # are analyzed instead of into the hits of the analysis objects
+        self.recorder: Optional[HitRecorder] = None
+        # if set, the counters of the analysis objects are stored in the table
+        self.table: Optional[AnalysisTable] = None
 
     def prepare(self, event_file: EventFile):
         self.factory.reset(event_file)
         self.variables[event_file] = Scope()
         self.returns[event_file] = Scope()
+        if self.streaming:
+            self.touched[event_file] = set()
+        if self.recorder is not None:
+            self.recorder.start(event_file)
 
     def follow_up(self, event_file):
-        pass
+        if self.streaming:
+            self.release(event_file)
+        if self.recorder is not None:
+            self.recorder.stop(event_file)
+
+    def release(self, event_file: EventFile):
+        """
+        Collapses the observations of a finished run into the counts of the analysis
+        objects it touched, depending on event_file.failing, and frees all state of
+        the run. The memory of the analysis thereby only depends on the largest run.
+        """
+        touched = self.touched.pop(event_file, ())
+        with self._lock:
+            for a in touched:
+                a.collapse(event_file, event_file.failing)
+        self.variables.pop(event_file, None)
+        self.returns.pop(event_file, None)
+        self.factory.reset(event_file)
+
+    def discard(self, event_file: EventFile):
+        """
+        Drops the observations and all state of a run that was not analyzed
+        completely, such that it neither counts as passing nor as failing.
+        """
+        if self.recorder is not None:
+            self.recorder.discard(event_file)
+        else:
+            touched = self.touched.pop(event_file, None)
+            with self._lock:
+                for a in self.get_analysis() if touched is None else touched:
+                    a.clear_run(event_file)
+        self.variables.pop(event_file, None)
+        self.returns.pop(event_file, None)
+        self.factory.reset(event_file)
 
     # noinspection PyUnresolvedReferences
     def handle_event(
@@ -58,11 +110,56 @@ class Model:
         event: Event,
         event_file: EventFile,
         scope: Scope = None,
-    ) -> Set[AnalysisObject]:
+    ) -> List[AnalysisObject]:
         analysis = self.factory.handle(event, event_file, scope=scope)
-        for a in analysis:
-            a.hit(event_file, event, scope=scope)
-        return set(analysis)
+        if self.recorder is None:
+            for a in analysis:
+                a.hit(event_file, event, scope=scope)
+        else:
+            record = self.recorder.record
+            for a in analysis:
+                record(event_file, a, a.observe(event_file, event, scope=scope))
+        if self.streaming:
+            self.touched[event_file].update(analysis)
+        return analysis
+
+    # noinspection PyUnresolvedReferences
+    def handle_repeated_event(
+        self,
+        event: Event,
+        event_file: EventFile,
+        repeat: int,
+        scope: Scope = None,
+    ) -> List[AnalysisObject]:
+        analysis = self.factory.handle_repeated(event, event_file, repeat, scope=scope)
+        if self.recorder is None:
+            for a in analysis:
+                a.hit_repeated(event_file, event, repeat, scope=scope)
+        else:
+            record = self.recorder.record
+            for a in analysis:
+                record(
+                    event_file,
+                    a,
+                    a.observe_repeated(event_file, event, repeat, scope=scope),
+                )
+        if self.streaming:
+            self.touched[event_file].update(analysis)
+        return analysis
+
+    def handle_repeated(self, event: Event, event_file: EventFile, repeat: int = 1):
+        """
+        Handles a run of repeat identical events. Runs of events that only hit
+        their analysis objects are applied in one pass, all others are handled
+        event by event.
+        """
+        if repeat == 1:
+            event.handle(self, event_file)
+        elif event.event_type in REPEATABLE:
+            self.handle_repeated_event(event, event_file, repeat)
+        else:
+            for _ in range(repeat):
+                event.handle(self, event_file)
 
     def handle_line_event(self, event: LineEvent, event_file: EventFile):
         self.handle_event(event, event_file)
@@ -79,7 +176,7 @@ class Model:
     def handle_function_exit_event(
         self, event: FunctionExitEvent, event_file: EventFile
     ):
-        self.returns[event_file].add(event.function, event.return_value, event.type_)
+        self.returns[event_file].add(event.function, get_lazy_value(event), event.type_)
         self.handle_event(event, event_file, self.returns[event_file])
         self.exit_scope(event_file)
 
@@ -90,7 +187,7 @@ class Model:
         self.exit_scope(event_file)
 
     def handle_def_event(self, event: DefEvent, event_file: EventFile):
-        self.variables[event_file].add(event.var, event.value, event.type_)
+        self.variables[event_file].add(event.var, get_lazy_value(event), event.type_)
         self.handle_event(event, event_file, self.variables[event_file])
 
     def handle_use_event(self, event: UseEvent, event_file: EventFile):
@@ -142,9 +239,20 @@ class Model:
     def finalize(
         self, passed: Optional[List[EventFile]], failed: Optional[List[EventFile]]
     ):
-        with ThreadPoolExecutor(max_workers=self.workers) as executor:
-            futures = []
-            for p in self.get_analysis():
-                futures.append(executor.submit(p.analyze, passed, failed))
-            for future in futures:
-                future.result()
+        failed, passed = list(failed or []), list(passed or [])
+        self.matrix = self.get_matrix(failed + passed)
+        self.matrix.finalize(
+            [self.matrix.run_index[event_file] for event_file in passed],
+            [self.matrix.run_index[event_file] for event_file in failed],
+            table=self.table,
+        )
+
+    def get_matrix(self, runs: List[EventFile]) -> HitMatrix:
+        """
+        Returns the observations of the analysis objects in the runs, from the
+        recorder or from the hits of the objects.
+        """
+        objects = list(self.get_analysis())
+        if self.recorder is None:
+            return HitMatrix.from_hits(runs, objects)
+        return self.recorder.get_matrix(runs, objects)
@@ -7,6 +7,7 @@ from sflkitlib.events.event import (
 )
 
 from sflkit.events.event_file import EventFile
+from sflkit.events.lazy import get_lazy_value
 from sflkit.model.model import Model
 from sflkit.model.scope import Scope
 
@@ -22,6 +23,16 @@ class ParallelModel(Model):
         self.variables_map = dict()
         self.returns_map = dict()
 
+    def release(self, event_file: EventFile):
+        super().release(event_file)
+        self.variables_map.pop(event_file, None)
+        self.returns_map.pop(event_file, None)
+
+    def discard(self, event_file: EventFile):
+        super().discard(event_file)
+        self.variables_map.pop(event_file, None)
+        self.returns_map.pop(event_file, None)
+
     def handle_function_enter_event(
         self, event: FunctionEnterEvent, event_file: EventFile
     ):
@@ -36,12 +47,12 @@ class ParallelModel(Model):
     ):
         if event.thread_id is None:
             self.returns[event_file].add(
-                event.function, event.return_value, event.type_
+                event.function, get_lazy_value(event), event.type_
             )
             self.handle_event(event, event_file, self.returns[event_file])
         else:
             self.returns_map[event_file].setdefault(event.thread_id, Scope()).add(
-                event.function, event.return_value, event.type_
+                event.function, get_lazy_value(event), event.type_
             )
             self.handle_event(
                 event, event_file, self.returns_map[event_file][event.thread_id]
@@ -62,12 +73,14 @@ class ParallelModel(Model):
 
     def handle_def_event(self, event: DefEvent, event_file: EventFile):
         if event.thread_id is None:
-            self.variables[event_file].add(event.var, event.value, event.type_)
+            self.variables[event_file].add(
+                event.var, get_lazy_value(event), event.type_
+            )
             self.handle_event(event, event_file, self.variables[event_file])
         else:
             self.variables_map[event_file].setdefault(
                 event.thread_id, self.variables[event_file]
-            ).add(event.var, event.value, event.type_)
+            ).add(event.var, get_lazy_value(event), event.type_)
             self.handle_event(
                 event, event_file, self.variables_map[event_file][event.thread_id]
             )
@@ -1,14 +1,26 @@
+import itertools
 from threading import Lock
-from typing import List
+from typing import List, Any, Dict, Optional
+
+from sflkit.events.lazy import unwrap
 
 
 class Var(object):
     def __init__(self, var, value, type_, id_: int = None):
         self.var = var
-        self.value = value
+        self._value = value
         self.type_ = type_
         self.id = id_ if id_ is not None else hash(self)
 
+    @property
+    def value(self) -> Any:
+        self._value = unwrap(self._value)
+        return self._value
+
+    @value.setter
+    def value(self, value: Any):
+        self._value = value
+
     def __hash__(self):
         return hash(self.var)
 
@@ -27,14 +39,42 @@ class IDGenerator:
             return self.current_id
 
 
+class Variables(dict):
+    """
+    The variables defined in a scope. Defining a variable invalidates the
+    resolved variables of the scope and, if the scope has open child scopes, of
+    all scopes.
+    """
+
+    def __init__(self, scope: "Scope"):
+        super().__init__()
+        self.scope = scope
+
+    def __setitem__(self, var, value):
+        super().__setitem__(var, value)
+        self.scope._define()
+
+
+# the value of a variable that is not visible in the cache of a scope
+_MISSING = object()
+
+
 class Scope(object):
 
-    SCOPE_ID = IDGenerator()
+    SCOPE_ID = itertools.count(1)
 
     def __init__(self, parent=None):
         self.parent = parent
-        self.variables = dict()
-        self.id = Scope.SCOPE_ID.get_next_id()
+        self.variables = Variables(self)
+        self.id = next(Scope.SCOPE_ID)
+        # the variables of the parents resolved by this scope, valid as long as
+        # the version shared by all scopes of the tree does not change
+        self._version: List[int] = parent._version if parent else [0]
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_version = -1
+        self._all: Optional[Dict[str, Var]] = None
+        self._all_version = -1
+        self._open = 0
 
     def __hash__(self):
         return hash(self.id)
@@ -43,40 +83,93 @@ class Scope(object):
         return isinstance(other, Scope) and self.id == other.id
 
     def enter(self):
+        self._open += 1
+        # only the innermost scopes keep their variables materialized
+        self._all = None
         return Scope(parent=self)
 
     def exit(self):
         if self.parent is not None:
+            self.parent._open -= 1
             return self.parent
         else:
             return self
 
+    def _define(self):
+        self._all = None
+        # only scopes that are still open, e.g., of other threads, can have
+        # resolved a variable of this scope that the definition shadows
+        if self._open:
+            self._version[0] += 1
+
+    def _lookup(self, var: str) -> Optional[Var]:
+        if var in self.variables:
+            return self.variables[var]
+        if self._cache_version != self._version[0]:
+            self._cache = None
+            self._cache_version = self._version[0]
+        if self._cache is None:
+            self._cache = dict()
+        elif var in self._cache:
+            value = self._cache[var]
+            return None if value is _MISSING else value
+        value = None
+        scope = self.parent
+        while scope is not None:
+            if var in scope.variables:
+                value = scope.variables[var]
+                break
+            if (
+                scope._cache is not None
+                and scope._cache_version == self._version[0]
+                and var in scope._cache
+            ):
+                value = scope._cache[var]
+                value = None if value is _MISSING else value
+                break
+            scope = scope.parent
+        self._cache[var] = _MISSING if value is None else value
+        return value
+
     def __contains__(self, var: str) -> bool:
-        current = self
-        while current is not None:
-            if var in current.variables:
-                return True
-            current = current.parent
-        return False
+        return self._lookup(var) is not None
 
     def value(self, var: str) -> Var:
-        current = self
-        while current is not None:
-            if var in current.variables:
-                return current.variables[var].value
-            current = current.parent
+        value = self._lookup(var)
+        if value is not None:
+            return value.value
         return None
 
     def add(self, var, value, type_, id_: int = None):
         self.variables[var] = Var(var, value, type_, id_)
 
+    def _get_all(self) -> Dict[str, Var]:
+        if self._all is None or self._all_version != self._version[0]:
+            variables = dict()
+            scope = self
+            while scope is not None:
+                for var, value in scope.variables.items():
+                    variables.setdefault(var, value)
+                scope = scope.parent
+            self._all = variables
+            self._all_version = self._version[0]
+        return self._all
+
     def get_all_vars_dict(self):
-        current = self
-        variables = dict()
-        while current is not None:
-            variables = {**current.variables, **variables}
-            current = current.parent
-        return variables
+        return dict(self._get_all())
 
     def get_all_vars(self) -> List[Var]:
-        return list(self.get_all_vars_dict().values())
+        return list(self._get_all().values())
+
+    def get_vars(self, max_depth: int) -> List[Var]:
+        """
+        Returns the visible variables defined at most max_depth scopes above this
+        one, e.g., only the variables of the current function for 0.
+        """
+        variables = dict()
+        scope, depth = self, 0
+        while scope is not None and depth <= max_depth:
+            for var, value in scope.variables.items():
+                variables.setdefault(var, value)
+            scope, depth = scope.parent, depth + 1
+        return list(variables.values())
@@ -1,5 +1,6 @@
 import enum
 
+from sflkit.runners.collector import EventCollector
 from sflkit.runners.run import (
     Runner,
     VoidRunner,
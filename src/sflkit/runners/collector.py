@@ -0,0 +1,174 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Iterator, Tuple
+
+from sflkitlib.events.event import Event
+
+from sflkit.analysis.analyzer import Analyzer
+from sflkit.analysis.factory import AnalysisFactory
+from sflkit.events.compression import Codec, CompressedWriter
+from sflkit.events.decoder import EventDecoder
+from sflkit.events.event_file import EventFile
+from sflkit.events.mapping import EventMapping
+from sflkit.language.meta import IDGenerator
+from sflkit.logger import LOGGER
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class EventStream:
+    """
+    The events of a single test streamed through a named pipe. The collector holds
+    a writing end of the pipe itself, such that the pipe neither blocks the test
+    when it opens its event file nor reports the end of the events before the
+    test has finished.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        event_file: EventFile,
+        copy: Optional[Path],
+        codec: Optional[Codec] = None,
+    ):
+        self.path = path
+        self.event_file = event_file
+        self.copy = copy
+        self.codec = codec
+        self.reader = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+        self.writer = os.open(path, os.O_WRONLY)
+        os.set_blocking(self.reader, True)
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def close(self):
+        if self.writer is not None:
+            os.close(self.writer)
+            self.writer = None
+
+
+class EventCollector:
+    """
+    Collects the events of running tests through named pipes and feeds them into
+    the model of an analyzer while the tests are running. The events of each test
+    can optionally be kept as an event file.
+    """
+
+    def __init__(
+        self,
+        mapping: EventMapping,
+        factory: AnalysisFactory,
+        thread_support: bool = False,
+        keep_events: bool = False,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.mapping = mapping
+        self.thread_support = thread_support
+        self.keep_events = keep_events
+        self.chunk_size = max(chunk_size, 1)
+        self.analyzer = Analyzer(list(), list(), factory, workers=1)
+        self.run_id_generator = IDGenerator()
+
+    def start(
+        self, path: Path, copy: Optional[Path] = None, codec: Optional[Codec] = None
+    ) -> EventStream:
+        """
+        Creates the named pipe at path, to which the test writes its events, and
+        starts analyzing them. If keep_events is set, the events are also written
+        to copy, compressed with codec while they are in memory if it is given.
+        """
+        if path.exists() or path.is_symlink():
+            path.unlink()
+        os.mkfifo(path)
+        copy = copy if self.keep_events else None
+        stream = EventStream(
+            path,
+            EventFile(
+                copy or path,
+                self.run_id_generator.get_next_id(),
+                self.mapping,
+                thread_support=self.thread_support,
+            ),
+            copy,
+            codec=codec,
+        )
+        stream.thread = threading.Thread(
+            target=self._collect, args=(stream,), daemon=True
+        )
+        stream.thread.start()
+        return stream
+
+    def _read(self, stream: EventStream) -> Iterator[bytes]:
+        copy = None
+        if stream.copy:
+            copy = open(stream.copy, "wb")
+            if stream.codec:
+                copy = CompressedWriter(copy, codec=stream.codec)
+        try:
+            while chunk := os.read(stream.reader, self.chunk_size):
+                if copy:
+                    copy.write(chunk)
+                yield chunk
+        finally:
+            if copy:
+                copy.close()
+
+    def _load_runs(self, stream: EventStream) -> Iterator[Tuple[Event, int]]:
+        decoder = EventDecoder(self.mapping, with_thread_id=self.thread_support)
+        chunks = self._read(stream)
+        rest = b""
+        for chunk in chunks:
+            buffer = rest + chunk
+            for batch in decoder.decode(buffer):
+                yield from batch.runs()
+            if decoder.stopped:
+                break
+            rest = buffer[decoder.position :]
+        # drain the pipe, such that the test never blocks on a full pipe
+        for _ in chunks:
+            pass
+
+    def _collect(self, stream: EventStream):
+        # noinspection PyBroadException
+        try:
+            self.analyzer.analyze_runs(stream.event_file, self._load_runs(stream))
+        except BaseException as e:
+            stream.error = e
+            while os.read(stream.reader, self.chunk_size):
+                pass
+        finally:
+            os.close(stream.reader)
+
+    def finish(self, stream: EventStream, failing: Optional[bool]) -> EventFile:
+        """
+        Waits until all events of the finished test are analyzed and registers its
+        event file as failing or passing, or as neither if failing is None or if
+        the analysis of its events failed.
+        """
+        stream.close()
+        stream.thread.join()
+        if stream.path.exists():
+            stream.path.unlink()
+        stream.event_file.failing = bool(failing)
+        if stream.error is not None:
+            LOGGER.warning(
+                f"Analyzing the events of {stream.event_file} failed, the test is "
+                f"excluded from the analysis: {stream.error}"
+            )
+            return stream.event_file
+        if failing is True:
+            self.analyzer.relevant_event_files.append(stream.event_file)
+        elif failing is False:
+            self.analyzer.irrelevant_event_files.append(stream.event_file)
+        self.analyzer.paths[stream.event_file.run_id] = stream.event_file.path
+        return stream.event_file
+
+    def finalize(self) -> Analyzer:
+        """
+        Finalizes the analysis of all collected tests and returns the analyzer.
+        """
+        self.analyzer.model.finalize(
+            self.analyzer.irrelevant_event_files, self.analyzer.relevant_event_files
+        )
+        return self.analyzer
@@ -10,7 +10,9 @@ from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Set
 
+from sflkit.events.compression import Codec, EVENTS_COMPRESSION, compress_file
 from sflkit.logger import LOGGER
+from sflkit.runners.collector import EventCollector
 
 Environment = Dict[str, str]
 
@@ -44,6 +46,9 @@ class Runner(abc.ABC):
         timeout=DEFAULT_TIMEOUT,
         is_parallel: bool = False,
         thread_support: bool = False,
+        compression: Optional[str] = None,
+        compress_events: bool = False,
+        collector: Optional[EventCollector] = None,
     ):
         self.timeout = timeout
         self.re_filter = re.compile(re_filter)
@@ -57,6 +62,9 @@ class Runner(abc.ABC):
         }
         self.is_parallel = is_parallel
         self.thread_support = thread_support
+        self.compression = Codec.get(compression)
+        self.compress_events = compress_events
+        self.collector = collector
 
     @staticmethod
     def use_parallel() -> type["Runner"]:
@@ -93,6 +101,50 @@ class Runner(abc.ABC):
                 s = s.replace(c, "_")
         return s
 
+    def store_events(self, events: Path, destination: Path):
+        """
+        Moves the event file of a test to destination. If compress_events is set,
+        an uncompressed event file is compressed instead, which costs a full read
+        and write of the file.
+        """
+        if self.compression and self.compress_events:
+            compress_file(events, destination, codec=self.compression)
+        else:
+            shutil.move(events, destination)
+
+    def run_collected_test(
+        self,
+        directory: Path,
+        output: Path,
+        test: str,
+        environ: Environment = None,
+        python="python3",
+    ) -> TestResult:
+        """
+        Runs a test that streams its events through a named pipe to the collector,
+        which analyzes them while the test is running.
+        """
+        events = (directory / "EVENTS_PATH").absolute()
+        environ = dict(os.environ if environ is None else environ)
+        environ["EVENTS_PATH"] = str(events)
+        stream = self.collector.start(
+            events, events.with_name("EVENTS_PATH_COPY"), codec=self.compression
+        )
+        test_result = TestResult.UNDEFINED
+        try:
+            test_result = self.run_test(directory, test, environ=environ, python=python)
+        finally:
+            event_file = self.collector.finish(
+                stream,
+                {TestResult.PASSING: False, TestResult.FAILING: True}.get(test_result),
+            )
+        self.tests[test_result].add(test)
+        if stream.copy and os.path.exists(stream.copy):
+            destination = output / test_result.get_dir() / self.safe(test)
+            self.store_events(stream.copy, destination)
+            event_file.path = destination
+        return test_result
+
     def run_tests(
         self,
         directory: Path,
@@ -105,10 +157,15 @@ class Runner(abc.ABC):
         for test_result in TestResult:
             (output / test_result.get_dir()).mkdir(parents=True, exist_ok=True)
         for event_file, test in enumerate(tests):
+            if self.collector:
+                self.run_collected_test(
+                    directory, output, test, environ=environ, python=python
+                )
+                continue
             test_result = self.run_test(directory, test, environ=environ, python=python)
             self.tests[test_result].add(test)
             if os.path.exists(directory / "EVENTS_PATH"):
-                shutil.move(
+                self.store_events(
                     directory / "EVENTS_PATH",
                     output / test_result.get_dir() / self.safe(test),
                 )
@@ -133,6 +190,9 @@ class Runner(abc.ABC):
         if environ is None:
             environ = os.environ.copy()
         environ["EVENTS_THREADS"] = "1" if self.thread_support else "0"
+        # the collector decodes the events it receives and compresses its copy
+        if self.compression and not self.collector:
+            environ[EVENTS_COMPRESSION] = self.compression.name.lower()
         self.run_tests(
             directory,
             output,
@@ -299,8 +359,18 @@ class PytestRunner(Runner):
         timeout=DEFAULT_TIMEOUT,
         set_python_path: bool = False,
         thread_support: bool = False,
+        compression: Optional[str] = None,
+        compress_events: bool = False,
+        collector: Optional[EventCollector] = None,
     ):
-        super().__init__(re_filter, timeout, thread_support=thread_support)
+        super().__init__(
+            re_filter,
+            timeout,
+            thread_support=thread_support,
+            compression=compression,
+            compress_events=compress_events,
+            collector=collector,
+        )
         self.set_python_path = set_python_path
 
     @staticmethod
@@ -504,8 +574,16 @@ class InputRunner(Runner):
         passing: List[str | List[str]],
         failing: List[str | List[str]],
         thread_support: bool = False,
+        compression: Optional[str] = None,
+        compress_events: bool = False,
+        collector: Optional[EventCollector] = None,
     ):
-        super().__init__(thread_support=thread_support)
+        super().__init__(
+            thread_support=thread_support,
+            compression=compression,
+            compress_events=compress_events,
+            collector=collector,
+        )
         self.access = access
         self.passing: Dict[str, List[str]] = self._prepare_tests(passing, "passing")
         self.failing: Dict[str, List[str]] = self._prepare_tests(failing, "failing")
@@ -584,9 +662,16 @@ class ParallelPytestRunner(PytestRunner):
         set_python_path: bool = False,
         workers: int = 4,
         thread_support: bool = False,
+        compression: Optional[str] = None,
+        compress_events: bool = False,
     ):
         super().__init__(
-            re_filter, timeout, set_python_path, thread_support=thread_support
+            re_filter,
+            timeout,
+            set_python_path,
+            thread_support=thread_support,
+            compression=compression,
+            compress_events=compress_events,
         )
         self.workers = max(min(workers, os.cpu_count() or DEFAULT_MAX_WORKERS), 1)
         self.is_parallel = True
@@ -611,7 +696,7 @@ class ParallelPytestRunner(PytestRunner):
         )
         self.tests[tr].add(test)
         if os.path.exists(self.directory / events_path_name):
-            shutil.move(
+            self.store_events(
                 self.directory / events_path_name,
                 self.output / tr.get_dir() / self.safe(test),
             )
@@ -652,8 +737,17 @@ class ParallelInputRunner(InputRunner):
         failing: List[str | List[str]],
         workers: int = 4,
         thread_support: bool = False,
+        compression: Optional[str] = None,
+        compress_events: bool = False,
     ):
-        super().__init__(access, passing, failing, thread_support=thread_support)
+        super().__init__(
+            access,
+            passing,
+            failing,
+            thread_support=thread_support,
+            compression=compression,
+            compress_events=compress_events,
+        )
         self.workers = max(min(workers, os.cpu_count() or DEFAULT_MAX_WORKERS), 1)
         self.is_parallel = True
         self.environ = None
@@ -676,7 +770,7 @@ class ParallelInputRunner(InputRunner):
         # noinspection PyUnresolvedReferences
         if os.path.exists(self.directory / events_path_name):
             # noinspection PyUnresolvedReferences
-            shutil.move(
+            self.store_events(
                 self.directory / events_path_name,
                 self.output / tr.get_dir() / self.safe(test_name),
             )
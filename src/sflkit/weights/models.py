@@ -49,11 +49,19 @@ class TestTimeModel(ParallelModel):
     # noinspection PyUnresolvedReferences
     def handle_event(
         self, event, event_file: EventFile, scope: Scope = None
-    ) -> Set["AnalysisObject"]:
+    ) -> List["AnalysisObject"]:
         analysis = super().handle_event(event, event_file, scope)
         self.current_analysis[event_file].extend(analysis)
         return analysis
 
+    # noinspection PyUnresolvedReferences
+    def handle_repeated_event(
+        self, event, event_file: EventFile, repeat: int, scope: Scope = None
+    ) -> List["AnalysisObject"]:
+        analysis = super().handle_repeated_event(event, event_file, repeat, scope)
+        self.current_analysis[event_file].extend(analysis)
+        return analysis
+
     def add(
         self, event, event_file: EventFile, force: bool = False
     ) -> Optional[WeightedAnalyses]:
@@ -89,6 +97,7 @@ class TestTimeModel(ParallelModel):
 
     def follow_up(self, event_file):
         self.add(None, event_file, force=True)
+        super().follow_up(event_file)
 
     def handle_test_line_event(self, event: TestLineEvent, event_file: EventFile):
         if self.current_test_failing:
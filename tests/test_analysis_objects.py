@@ -1,3 +1,6 @@
+import itertools
+from unittest.mock import patch
+
 from sflkitlib.events import EventType
 from sflkitlib.events.event import (
     LineEvent,
@@ -10,7 +13,8 @@ from sflkitlib.events.event import (
     LenEvent,
 )
 
-from sflkit.analysis.analysis_type import AnalysisType
+from sflkit.analysis.analysis_type import AnalysisType, EvaluationResult
+from sflkit.analysis.factory import ScalarPairFactory, VariableFactory
 from sflkit.analysis.predicate import (
     Branch,
     Condition,
@@ -26,6 +30,8 @@ from sflkit.analysis.predicate import (
     ContainsSpecialPredicate,
 )
 from sflkit.analysis.spectra import Line, Function, Loop, DefUse, Length
+from sflkit.events.event_file import EventFile
+from sflkit.model.scope import Scope
 from utils import BaseTest
 
 
@@ -205,3 +211,136 @@ class TestAnalysisObjects(BaseTest):
         self.assertEqual(b"", getattr(obj, "_get_second")(None))
         self.assertEqual(1, len(obj.events()))
         self.assertIn(EventType.DEF, obj.events())
+
+    def test_evaluate_all(self):
+        values = [0, 1, -2.5, float("nan"), True, False]
+        for x, y in itertools.product(values, repeat=2):
+            results = Comp.evaluate_all(x, y, Comp)
+            for comp in Comp:
+                self.assertEqual(comp.evaluate(x, y), results[comp], f"{x}{comp}{y}")
+        for x, y in itertools.product(["", "a", "b"], repeat=2):
+            results = Comp.evaluate_all(x, y, Comp)
+            for comp in Comp:
+                self.assertEqual(comp.evaluate(x, y), results[comp], f"{x}{comp}{y}")
+        self.assertEqual(
+            {Comp.EQ, Comp.NE}, set(Comp.evaluate_all(1, 2, [Comp.EQ, Comp.NE]))
+        )
+
+        # only the comparisons needed by the comparators are computed
+        class Unordered:
+            def __eq__(self, other):
+                raise AssertionError()
+
+            def __lt__(self, other):
+                return True
+
+        self.assertEqual(
+            {Comp.LT: True}, Comp.evaluate_all(Unordered(), Unordered(), [Comp.LT])
+        )
+
+    def test_comparison_group(self):
+        event_file = EventFile(self.ACCESS, 0, None)
+        scope = Scope()
+        scope.add("y", 2, "int")
+        scope.add("x", 1, "int")
+        event = DefEvent(self.ACCESS, 1, 0, "x", 0, 1, "int")
+        scalar_pairs = ScalarPairFactory().handle(event, event_file, scope=scope)
+        variables = VariableFactory().handle(event, event_file, scope=scope)
+        # the predicates take their results from the evaluation of their group
+        with (
+            patch.object(ScalarPair, "_evaluate_predicate", side_effect=AssertionError),
+            patch.object(
+                VariablePredicate, "_evaluate_predicate", side_effect=AssertionError
+            ),
+        ):
+            for obj in scalar_pairs + variables:
+                obj.hit(event_file, event, scope=scope)
+        true = {
+            (obj.var2, obj.op) for obj in scalar_pairs if obj._check_hits(event_file)
+        }
+        self.assertEqual(
+            {
+                ("x", Comp.EQ),
+                ("x", Comp.LE),
+                ("x", Comp.GE),
+                ("y", Comp.NE),
+                ("y", Comp.LT),
+                ("y", Comp.LE),
+            },
+            true,
+        )
+        self.assertEqual(
+            {Comp.NE, Comp.GT, Comp.GE},
+            {obj.op for obj in variables if obj._check_hits(event_file)},
+        )
+        # another run invalidates the results of the group
+        other = EventFile(self.ACCESS, 1, None)
+        for obj in scalar_pairs:
+            obj.hit(other, event, scope=scope)
+        self.assertEqual(
+            true,
+            {(obj.var2, obj.op) for obj in scalar_pairs if obj._check_hits(other)},
+        )
+        # as does another event of the same run, e.g., a later definition
+        scope.add("x", 0, "int")
+        later = DefEvent(self.ACCESS, 1, 0, "x", 0, 1, "int")
+        for obj in variables:
+            obj.hit(event_file, later, scope=scope)
+        self.assertEqual(
+            {Comp.EQ, Comp.LE, Comp.GE},
+            {
+                obj.op
+                for obj in variables
+                if obj.last_evaluation[event_file][None] == EvaluationResult.TRUE
+            },
+        )
+
+    def test_scalar_pair_budgets(self):
+        event_file = EventFile(self.ACCESS, 0, None)
+        scope = Scope()
+        for i in range(10):
+            scope.add(f"v{i}", i, "int")
+        inner = scope.enter()
+        inner.add("x", 1, "int")
+        inner.add("s", "a", "str")
+        event = DefEvent(self.ACCESS, 1, 0, "x", 0, 1, "int")
+
+        def partners(factory: ScalarPairFactory):
+            factory.handle(event, event_file, scope=inner)
+            return {obj.var2 for obj in factory.get_all()}
+
+        self.assertEqual(11, len(partners(ScalarPairFactory())))
+
+        factory = ScalarPairFactory(max_pairs=3)
+        selected = partners(factory)
+        self.assertEqual(3, len(selected))
+        self.assertEqual(8, factory.get_suppressed())
+        # the pairs of a site do not change once the budget is exhausted and the
+        # rejected pairs are counted once
+        self.assertEqual(selected, partners(factory))
+        self.assertEqual(8, factory.get_suppressed())
+        self.assertEqual(8, factory.get_suppressed((self.ACCESS, 1, "x")))
+        self.assertEqual(0, factory.get_suppressed((self.ACCESS, 2, "x")))
+        self.assertEqual(18, len(factory.get_all()))
+
+        # the pairs are kept by their ranks, independent of the order of the
+        # variables, evicted pairs are not reported
+        factory = ScalarPairFactory(max_pairs=3)
+        for i in reversed(range(10)):
+            single = Scope()
+            single.add(f"v{i}", i, "int")
+            single.add("x", 1, "int")
+            factory.handle(event, event_file, scope=single)
+        self.assertEqual(selected, {obj.var2 for obj in factory.get_all()})
+        self.assertEqual(8, factory.get_suppressed())
+
+        factory = ScalarPairFactory(max_depth=0)
+        self.assertEqual({"x"}, partners(factory))
+        self.assertEqual(0, factory.get_suppressed())
+
+        sampled = partners(ScalarPairFactory(sample=0.5, seed=1))
+        self.assertEqual(sampled, partners(ScalarPairFactory(sample=0.5, seed=1)))
+        self.assertLess(len(sampled), 11)
+        factory = ScalarPairFactory(sample=0.0)
+        self.assertEqual(set(), partners(factory))
+        self.assertEqual(11, factory.get_suppressed())
@@ -1,3 +1,5 @@
+import os
+
 from sflkitlib.events.event import (
     LineEvent,
     BranchEvent,
@@ -10,7 +12,10 @@ from sflkitlib.events.event import (
 )
 
 from sflkit import Analyzer
+from sflkit.analysis.analysis_type import AnalysisType
+from sflkit.analysis.columns import dump_columns, load_columns
 from sflkit.analysis.predicate import (
+    Predicate,
     Branch,
     ScalarPair,
     VariablePredicate,
@@ -25,7 +30,7 @@ from sflkit.analysis.predicate import (
     FunctionErrorPredicate,
     Comp,
 )
-from sflkit.analysis.spectra import Line, Function, Loop, DefUse, Length
+from sflkit.analysis.spectra import Spectrum, Line, Function, Loop, DefUse, Length
 from sflkit.model.model import MetaModel
 from utils import BaseTest
 
@@ -160,3 +165,126 @@ class TestAnalyzer(BaseTest):
             self.assertEqual(3, predicate.fail_false)
             self.assertEqual(4, predicate.increase_true)
             self.assertEqual(5, predicate.increase_false)
+
+    def test_dump_columns(self):
+        line = Line(LineEvent(self.ACCESS, 1, 0))
+        def_use = DefUse(
+            DefEvent(self.ACCESS, 1, 3, "var"), UseEvent(self.ACCESS, 1, 4, "var")
+        )
+        loop = Loop(LoopBeginEvent(self.ACCESS, 1, 2, 0))
+        branch = Branch(BranchEvent(self.ACCESS, 1, 0, 0, 1), then=True)
+        scalar_pair = ScalarPair(DefEvent(self.ACCESS, 1, 1, var="x"), Comp.LT, "y")
+        return_ = ReturnPredicate(
+            FunctionExitEvent(self.ACCESS, 1, 5, "f", 0, "f_tmp", 1), Comp.EQ, "a"
+        )
+        condition = Condition(self.ACCESS, 2, "x < 3", negate=True)
+        objects = [line, def_use, loop, branch, scalar_pair, return_, condition]
+        for i, obj in enumerate(objects):
+            obj.failed_observed = i
+            obj.failed_not_observed = 1
+            obj.passed_observed = 2
+            obj.passed_not_observed = i
+            obj.failed = i + 1
+            obj.passed = i + 2
+            obj.weight = i / 2
+        scalar_pair.fail_true = 0.25
+        analyzer = Analyzer(meta_model=MetaModel(set(objects)))
+        path = os.path.join(self.TEST_DIR, "analysis.npz")
+        os.makedirs(self.TEST_DIR, exist_ok=True)
+        dump_columns(analyzer, path)
+
+        reconstructed = load_columns(path)
+        columns = reconstructed.model.columns
+        self.assertEqual(len(objects), len(columns))
+        indices = columns.indices(AnalysisType.SCALAR_PAIR)
+        self.assertEqual(1, len(indices))
+        counts = columns.get_counts(AnalysisType.SCALAR_PAIR)
+        self.assertEqual([4], counts.fo.tolist())
+        self.assertEqual([4], counts.pn.tolist())
+        self.assertEqual(dict(), columns._objects)
+        self.assertEqual(scalar_pair.serialize(), columns[int(indices[0])].serialize())
+        self.assertEqual(1, len(columns._objects))
+
+        analysis = {obj: obj for obj in reconstructed.get_analysis()}
+        self.assertEqual(len(objects), len(analysis))
+        for obj in objects:
+            self.assertIn(obj, analysis)
+            self.assertEqual(obj.serialize(), analysis[obj].serialize())
+
+    def test_columns_suggestions(self):
+        objects = [Line(LineEvent(self.ACCESS, line, line)) for line in range(1, 9)]
+        objects += [Condition(self.ACCESS, 10 + i, f"x < {i}") for i in range(4)]
+        for i, obj in enumerate(objects):
+            obj.failed_observed = i % 3
+            obj.failed_not_observed = 2 - i % 3
+            obj.passed_observed = i % 5
+            obj.passed_not_observed = 4 - i % 5
+            obj.failed = 2
+            obj.passed = 4
+            obj.weight = 1 + i % 2
+        for i, obj in enumerate(objects[8:]):
+            obj.increase_true = i / 4
+        analyzer = Analyzer(meta_model=MetaModel(set(objects)))
+        path = os.path.join(self.TEST_DIR, "analysis.npz")
+        os.makedirs(self.TEST_DIR, exist_ok=True)
+        dump_columns(analyzer, path)
+
+        def located(values):
+            return [(set(map(str, s.lines)), s.suspiciousness) for s in values]
+
+        def suggestions(results):
+            return {
+                type_: {metric: located(values) for metric, values in result.items()}
+                for type_, result in results.items()
+            }
+
+        for types in (None, [AnalysisType.LINE, AnalysisType.CONDITION]):
+            for use_weight in (False, True):
+                reconstructed = load_columns(path)
+                self.assertEqual(
+                    suggestions(
+                        analyzer.get_top_suggestions(
+                            "",
+                            (None, Spectrum.Tarantula),
+                            types=types,
+                            k=2,
+                            use_weight=use_weight,
+                        )
+                    ),
+                    suggestions(
+                        reconstructed.get_top_suggestions(
+                            "",
+                            (None, Spectrum.Tarantula),
+                            types=types,
+                            k=2,
+                            use_weight=use_weight,
+                        )
+                    ),
+                )
+                # only the objects of the two highest values are deserialized
+                self.assertLess(len(reconstructed.columns._objects), len(objects))
+        for metric, type_ in (
+            (None, None),
+            (Spectrum.Tarantula, None),
+            (None, AnalysisType.CONDITION),
+            (Predicate.IncreaseTrue, AnalysisType.CONDITION),
+        ):
+            reconstructed = load_columns(path)
+            self.assertEqual(
+                located(analyzer.get_sorted_suggestions("", metric, type_)),
+                located(reconstructed.get_sorted_suggestions("", metric, type_)),
+            )
+            self.assertEqual(
+                analyzer.max_suspiciousness, reconstructed.max_suspiciousness
+            )
+
+    def test_columns_without_objects(self):
+        path = os.path.join(self.TEST_DIR, "empty.npz")
+        os.makedirs(self.TEST_DIR, exist_ok=True)
+        dump_columns(Analyzer(meta_model=MetaModel(set())), path)
+        reconstructed = load_columns(path)
+        self.assertEqual(0, len(reconstructed.columns.get_counts()))
+        self.assertEqual(
+            {None: {None: []}}, reconstructed.get_top_suggestions("", k=10)
+        )
+        self.assertEqual([], reconstructed.get_sorted_suggestions(""))
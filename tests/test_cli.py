@@ -34,6 +34,33 @@ class TestCli(BaseTest):
         except IOError:
             pass
 
+    def test_compact_analyze(self):
+        store_path = os.path.join(BaseTest.TEST_DIR, "store")
+        main("instrument", "-c", self.config_path)
+        self.execute_subject([], 0)
+        main("compact", "-c", self.config_path, "-o", store_path)
+        config = Config.create(
+            path=os.path.join(BaseTest.TEST_RESOURCES, self.TEST_LINES),
+            language="python",
+            events="line",
+            predicates="line",
+            failing=store_path,
+            working=BaseTest.TEST_DIR,
+            mapping_path=BaseTest.TEST_MAPPING,
+        )
+        Config.write(config, self.config_path)
+        main("analyze", "-c", self.config_path, "-o", self.results_path)
+        with open(self.results_path, "r") as fp:
+            results = json.load(fp)
+        suggestions = results[AnalysisType.LINE.name][Spectrum.Ochiai.__name__]
+        self.assertEqual(1, len(suggestions))
+        self.assertAlmostEqual(1, suggestions[0]["suspiciousness"], delta=self.DELTA)
+        locations = suggestions[0]["locations"]
+        self.assertEqual(3, len(locations))
+        self.assertIn(repr(Location(self.ACCESS, 1)), locations)
+        self.assertIn(repr(Location(self.ACCESS, 2)), locations)
+        self.assertIn(repr(Location(self.ACCESS, 3)), locations)
+
     def test_instrument_analyze(self):
         main("instrument", "-c", self.config_path)
         self.execute_subject([], 0)
@@ -55,3 +82,53 @@ class TestCli(BaseTest):
         self.assertIn(repr(Location(self.ACCESS, 1)), locations)
         self.assertIn(repr(Location(self.ACCESS, 2)), locations)
         self.assertIn(repr(Location(self.ACCESS, 3)), locations)
+
+    def test_map_reduce(self):
+        def write_config(failing, passing=None):
+            config = Config.create(
+                path=os.path.join(BaseTest.TEST_RESOURCES, self.TEST_SUGGESTIONS),
+                language="python",
+                events="line,branch,def,function_enter,function_exit,loop_begin,"
+                "loop_hit,loop_end",
+                predicates="line,branch,loop,scalar_pair,return",
+                failing=failing,
+                passing=passing,
+                working=BaseTest.TEST_DIR,
+                mapping_path=BaseTest.TEST_MAPPING,
+            )
+            Config.write(config, self.config_path)
+
+        def get_results():
+            with open(self.results_path, "r") as fp:
+                results = json.load(fp)
+            return {
+                (analysis_type, metric): {
+                    (s["suspiciousness"], frozenset(s["locations"]))
+                    for s in suggestions
+                }
+                for analysis_type, metrics in results.items()
+                for metric, suggestions in metrics.items()
+            }
+
+        write_config(None)
+        main("instrument", "-c", self.config_path)
+        paths = [
+            self.execute_subject(test, count)
+            for count, test in enumerate(
+                [["2", "1", "3"], ["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]]
+            )
+        ]
+        write_config(paths[0], ",".join(paths[1:]))
+        main("analyze", "-c", self.config_path, "-o", self.results_path)
+        expected = get_results()
+
+        partials = list()
+        for i, (failing, passing) in enumerate(
+            [(paths[0], paths[1]), (None, ",".join(paths[2:]))]
+        ):
+            partials.append(os.path.join(BaseTest.TEST_DIR, f"partial_{i}.json"))
+            write_config(failing, passing)
+            main("map", "-c", self.config_path, "-o", partials[-1], "-w", "2")
+        main("reduce", "-c", self.config_path, "-p", *partials, "-o", self.results_path)
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(expected, get_results())
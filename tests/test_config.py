@@ -6,7 +6,7 @@ from sflkitlib.events import EventType
 
 from sflkit import instrument, analyze
 from sflkit.analysis.analysis_type import AnalysisType
-from sflkit.analysis.factory import DefUseFactory
+from sflkit.analysis.factory import DefUseFactory, ScalarPairFactory
 from sflkit.analysis.spectra import Spectrum
 from sflkit.analysis.suggestion import Location
 from sflkit.config import Config, write_config
@@ -77,6 +77,51 @@ class ConfigTests(unittest.TestCase):
         self.assertEqual(0, len(config.instrument_exclude))
         self.assertIsNone(config.runner)
 
+    def test_scalar_pair_budgets(self):
+        config = Config.create(
+            path=os.path.join("test", "path"),
+            language="Python",
+            predicates="Scalar_Pair,Line",
+            working=os.path.join("instrumentation", "path"),
+            max_pairs=3,
+            max_depth=0,
+            sample=0.5,
+            seed=1,
+        )
+        factory = config.factory.factories[0]
+        self.assertIsInstance(factory, ScalarPairFactory)
+        self.assertEqual(3, factory.max_pairs)
+        self.assertEqual(0, factory.max_depth)
+        self.assertEqual(0.5, factory.sample)
+        self.assertEqual(1, factory.seed)
+        path = f"test_config_{abs(hash(self))}.ini"
+        try:
+            write_config(config, path)
+            self.assertEqual(config.scalar_pairs, Config(path).scalar_pairs)
+        finally:
+            os.remove(path)
+
+    def test_scoped_event_types(self):
+        config = Config.create(
+            path=os.path.join("test", "path"),
+            language="Python",
+            predicates="Variable,Line",
+            working=os.path.join("instrumentation", "path"),
+            passing=os.path.join("events", "passing"),
+        )
+        self.assertNotIn(EventType.FUNCTION_ENTER, config.events)
+        self.assertEqual(1, len(config.passing))
+        self.assertEqual(
+            {
+                EventType.DEF,
+                EventType.LINE,
+                EventType.FUNCTION_ENTER,
+                EventType.FUNCTION_EXIT,
+                EventType.FUNCTION_ERROR,
+            },
+            config.passing[0].event_types,
+        )
+
     def test_create_config(self):
         config = Config.create(
             path=os.path.join("test", "path"),
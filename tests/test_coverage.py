@@ -1,7 +1,13 @@
 from typing import List
 
-from sflkit.analysis.analysis_type import AnalysisType
+from sflkit import Analyzer
+from sflkit.analysis.analysis_type import AnalysisType, MetaEvent
+from sflkit.analysis.factory import CombinationFactory, analysis_factory_mapping
+from sflkit.analysis.coverage import CoverageAnalyzer
+from sflkit.analysis.matrix import HitMatrix, HitRecorder
+from sflkit.analysis.predicate import Branch
 from sflkit.analysis.spectra import Line
+from sflkit.events.event_file import EventFile
 from utils import BaseTest
 
 
@@ -17,3 +23,129 @@ class TestCoverage(BaseTest):
         coverage: List[Line] = analyzer.get_coverage(AnalysisType.LINE)
         coverage = {line.line for line in coverage}
         self.assertEqual(coverage, {1, 5, 6, 7, 9, 10, 12, 13, 16, 19, 20})
+
+    def test_coverage_analyzer(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,function_enter",
+            "line,branch,function",
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"]],
+        )
+        analyzer = Analyzer(relevant, irrelevant, config.factory)
+        analyzer.analyze()
+        coverage_analyzer = CoverageAnalyzer(relevant, irrelevant, config.predicates)
+        coverage_analyzer.analyze()
+        expected = sorted(
+            map(str, map(lambda o: o.serialize(), analyzer.get_analysis()))
+        )
+        actual = sorted(
+            map(str, map(lambda o: o.serialize(), coverage_analyzer.get_analysis()))
+        )
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(expected, actual)
+        for type_ in (AnalysisType.LINE, AnalysisType.BRANCH, AnalysisType.FUNCTION):
+            self.assertEqual(
+                [
+                    (s.suspiciousness, set(s.lines))
+                    for s in analyzer.get_sorted_suggestions(self.TEST_DIR, type_=type_)
+                ],
+                [
+                    (s.suspiciousness, set(s.lines))
+                    for s in coverage_analyzer.get_sorted_suggestions(
+                        self.TEST_DIR, type_=type_
+                    )
+                ],
+            )
+            self.assertEqual(
+                {line.line for line in analyzer.get_coverage(type_)},
+                {line.line for line in coverage_analyzer.get_coverage(type_)},
+            )
+
+    def test_hit_matrix(self):
+        runs = [EventFile(f"run_{i}", i, None) for i in range(11)]
+        failed, passed = runs[:3], runs[3:]
+
+        def create():
+            objects = [
+                Line(MetaEvent("main.py", 1)),
+                Line(MetaEvent("main.py", 2)),
+                Branch(MetaEvent("main.py", 3, then_id=4, else_id=5)),
+            ]
+            for i, run in enumerate(runs):
+                if i % 2:
+                    objects[0].hits[run] = {None: 1}
+                if i in (2, 8, 10):
+                    objects[1].hits[run] = {None: 3}
+                if i % 3:
+                    objects[2].hits[run] = {None: i % 2}
+            return objects
+
+        expected = create()
+        for obj in expected:
+            obj.analyze(passed, failed)
+        actual = create()
+        matrix = HitMatrix.from_hits(runs, actual)
+        matrix.finalize(range(3, 11), range(3))
+        self.assertEqual(
+            [obj.serialize() for obj in expected],
+            [obj.serialize() for obj in actual],
+        )
+        self.assertEqual(
+            {
+                run: set(objects)
+                for run, objects in matrix.get_coverage_per_run().items()
+            },
+            {
+                run: {obj for obj in actual if run in obj.hits}
+                for run in runs
+                if any(run in obj.hits for obj in actual)
+            },
+        )
+
+    def test_hit_recorder(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+
+        def analyze(**kwargs):
+            analyzer = Analyzer(
+                relevant,
+                irrelevant,
+                CombinationFactory(
+                    [analysis_factory_mapping[p]() for p in config.predicates]
+                ),
+                **kwargs,
+            )
+            analyzer.analyze()
+            return analyzer
+
+        # the parallel model counts the hits of the objects
+        expected = analyze(parallel=True, workers=1)
+        self.assertIsNone(expected.model.recorder)
+        expected_objects = {obj: obj.serialize() for obj in expected.get_analysis()}
+        expected_coverage = {
+            run.run_id: {str(obj) for obj in objects}
+            for run, objects in expected.get_coverage_per_run().items()
+        }
+        self.assertGreater(len(expected_objects), 0)
+        for workers in (1, 4):
+            actual = analyze(workers=workers)
+            self.assertIsInstance(actual.model.recorder, HitRecorder)
+            self.assertTrue(all(not obj.hits for obj in actual.get_analysis()))
+            self.assertEqual(
+                expected_objects,
+                {obj: obj.serialize() for obj in actual.get_analysis()},
+            )
+            self.assertEqual(
+                expected_coverage,
+                {
+                    run.run_id: {str(obj) for obj in objects}
+                    for run, objects in actual.get_coverage_per_run().items()
+                },
+            )
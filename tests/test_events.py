@@ -1,12 +1,44 @@
 import os
+import pickle
+import shutil
 import subprocess
+import time
+from pathlib import Path
+from unittest.mock import patch
 
 from parameterized import parameterized
-from sflkitlib.events import event
+from sflkitlib.events import event, EventType
+from sflkitlib.events.codec import (
+    encode_event,
+    encode_def_event,
+    encode_condition_event,
+)
 
 from sflkit import instrument_config
+from sflkit.analysis.analyzer import Analyzer
+from sflkit.analysis.factory import (
+    LineFactory,
+    LoopFactory,
+    CombinationFactory,
+    analysis_factory_mapping,
+)
 from sflkit.config import Config
-from sflkit.events.mapping import EventMapping
+from sflkit.events.compression import Codec, CompressedWriter
+from sflkit.events.decoder import SCAN_SIZE
+from sflkit.events.event_file import EventFile
+from sflkit.events.lazy import (
+    LazyDefEvent,
+    LazyFunctionExitEvent,
+    LazyValue,
+    UNDECODED,
+    get_lazy_value,
+)
+from sflkit.events import mapping as event_mapping
+from sflkit.events.mapping import EventMapping, get_cache_path
+from sflkit.events.store import EventStore, compact
+from sflkit.language.meta import IDGenerator
+from sflkit.model.model import Model
+from sflkit.model.scope import Scope
 from utils import BaseTest
 
 
@@ -418,6 +450,375 @@ class EventTests(BaseTest):
             self.assertEqual(line, e.line, f"{e} has not correct line")
 
 
+class BulkDecodingTest(BaseTest):
+    ALL_EVENTS = (
+        "line,branch,def,use,function_enter,function_exit,function_error,"
+        "condition,loop_begin,loop_hit,loop_end,len"
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        config = Config.create(
+            path=os.path.join(cls.TEST_RESOURCES, "test_events"),
+            language="python",
+            events=cls.ALL_EVENTS,
+            working=cls.TEST_DIR,
+        )
+        instrument_config(config)
+        subprocess.run([cls.PYTHON, cls.ACCESS], cwd=cls.TEST_DIR)
+        cls.mapping = EventMapping.load(config)
+        cls.path = os.path.join(cls.TEST_DIR, cls.TEST_PATH)
+
+    def _load(self, **kwargs):
+        with EventFile(self.path, 0, self.mapping, **kwargs) as event_file:
+            return list(event_file.load())
+
+    def test_bulk_equals_stream(self):
+        stream = self._load(bulk=False)
+        bulk = self._load(bulk=True)
+        self.assertGreater(len(stream), 0)
+        self.assertEqual(len(stream), len(bulk))
+        for expected, actual in zip(stream, bulk):
+            self.assertEqual(expected, actual)
+            self.assertEqual(repr(expected), repr(actual))
+            self.assertEqual(expected.thread_id, actual.thread_id)
+
+    def test_batches(self):
+        with EventFile(self.path, 0, self.mapping, batch_size=7) as event_file:
+            batches = list(event_file.load_batches())
+        self.assertGreater(len(batches), 1)
+        self.assertTrue(all(len(batch) <= 7 for batch in batches))
+        event_ids = [int(i) for batch in batches for i in batch.event_ids]
+        self.assertEqual(
+            [e.event_id for e in self._load(bulk=False)],
+            event_ids,
+        )
+
+    def test_event_types(self):
+        event_types = {EventType.LINE, EventType.BRANCH}
+        expected = [e for e in self._load(bulk=False) if e.event_type in event_types]
+        self.assertGreater(len(expected), 0)
+        for bulk in (True, False):
+            events = self._load(bulk=bulk, event_types=event_types)
+            self.assertEqual(expected, events)
+        store_path = os.path.join(self.TEST_DIR, "store_types")
+        compact([EventFile(self.path, 0, self.mapping)], store_path)
+        (event_file,) = EventStore(store_path).get_event_files(
+            IDGenerator(), self.mapping, event_types=event_types
+        )
+        with event_file:
+            self.assertEqual(expected, list(event_file.load()))
+
+    def test_translated_mapping(self):
+        lines = [
+            event_id
+            for event_id, e in self.mapping.mapping.items()
+            if e.event_type == EventType.LINE
+        ]
+        enter = next(
+            event_id
+            for event_id, e in self.mapping.mapping.items()
+            if e.event_type == EventType.FUNCTION_ENTER
+        )
+        translated = max(self.mapping.mapping) + 1
+        mapping = EventMapping(
+            self.mapping.original_mapping,
+            translation={
+                **{event_id: event_id for event_id in self.mapping.original_mapping},
+                translated: lines[0],
+            },
+        )
+        path = os.path.join(self.TEST_DIR, "translated")
+        with open(path, "wb") as fp:
+            for event_id in (lines[0], enter, lines[1], translated, translated):
+                fp.write(encode_event(event_id))
+        for event_types, count in (
+            (None, 5),
+            ({EventType.LINE}, 4),
+            ({EventType.FUNCTION_ENTER}, 1),
+        ):
+            with EventFile(
+                path, 0, mapping, bulk=False, event_types=event_types
+            ) as event_file:
+                expected = list(event_file.load())
+            self.assertEqual(count, len(expected))
+            with EventFile(
+                path, 0, mapping, bulk=True, event_types=event_types
+            ) as event_file:
+                self.assertEqual(expected, list(event_file.load()))
+
+    def test_routed_factories(self):
+        def get_factory():
+            return CombinationFactory(
+                [factory() for factory in analysis_factory_mapping.values()]
+            )
+
+        routed = get_factory()
+        self.assertEqual(1, len(routed.routes[EventType.LINE]))
+        self.assertIsInstance(routed.routes[EventType.LINE][0], LineFactory)
+        self.assertEqual(0, len(routed.routes[EventType.TEST_START]))
+        unrouted = get_factory()
+        unrouted.routes = {t: tuple(unrouted.factories) for t in EventType}
+        analysis = list()
+        for factory in (routed, unrouted):
+            analyzer = Analyzer(
+                [EventFile(self.path, 0, self.mapping, failing=True)], [], factory
+            )
+            analyzer.analyze()
+            analysis.append(
+                sorted(
+                    (str(a), a.failed_observed, a.passed_observed)
+                    for a in analyzer.get_analysis()
+                )
+            )
+        self.assertGreater(len(analysis[0]), 0)
+        self.assertEqual(analysis[1], analysis[0])
+
+    def test_materialized_factories(self):
+        analysis = list()
+        for materialize in (False, True):
+            factory = CombinationFactory(
+                [factory() for factory in analysis_factory_mapping.values()]
+            )
+            analyzer = Analyzer(
+                [EventFile(self.path, 0, self.mapping, failing=True)],
+                [],
+                factory,
+                materialize=materialize,
+            )
+            analyzer.analyze()
+            analysis.append(
+                sorted(
+                    (str(a), a.failed_observed, a.passed_observed)
+                    for a in analyzer.get_analysis()
+                )
+            )
+        line_factory = factory.factories[0]
+        self.assertIsInstance(line_factory, LineFactory)
+        self.assertIsNotNone(line_factory.materialized)
+        self.assertGreater(len(line_factory.objects), len(line_factory.get_all()))
+        self.assertGreater(len(analysis[0]), 0)
+        self.assertEqual(analysis[0], analysis[1])
+
+    def test_lazy_values(self):
+        stream = self._load(bulk=False)
+        bulk = self._load(bulk=True)
+        lazy = [e for e in bulk if isinstance(e, (LazyDefEvent, LazyFunctionExitEvent))]
+        self.assertGreater(len(lazy), 0)
+        for e in lazy:
+            self.assertIsInstance(get_lazy_value(e), LazyValue)
+            self.assertIs(UNDECODED, get_lazy_value(e)._value)
+        scope = Scope()
+        for expected, actual in zip(stream, bulk):
+            if isinstance(actual, LazyDefEvent):
+                scope.add(actual.var, get_lazy_value(actual), actual.type_)
+                self.assertIs(UNDECODED, get_lazy_value(actual)._value)
+                self.assertEqual(expected.value, scope.value(actual.var))
+                self.assertEqual(expected.value, actual.value)
+            elif isinstance(actual, LazyFunctionExitEvent):
+                self.assertEqual(expected.return_value, actual.return_value)
+
+    def test_scanned_records(self):
+        # the records cross the scanned bytes, a value is longer than them and
+        # the file ends with an id that is not in the mapping
+        ids = {
+            event_type: next(
+                event_id
+                for event_id, e in self.mapping.mapping.items()
+                if e.event_type == event_type
+            )
+            for event_type in (EventType.LINE, EventType.DEF, EventType.CONDITION)
+        }
+        threads = [1, 1 << 20, (1 << 62) + 3]
+        records = list()
+        for i in range(SCAN_SIZE // 2):
+            thread_id = threads[i % len(threads)]
+            if i % 97 == 0:
+                records.append(
+                    encode_def_event(
+                        ids[EventType.DEF],
+                        i,
+                        pickle.dumps("x" * (SCAN_SIZE + 3 if i == 97 else i)),
+                        "str",
+                        thread_id,
+                    )
+                )
+            elif i % 13 == 0:
+                records.append(
+                    encode_condition_event(ids[EventType.CONDITION], i % 2, thread_id)
+                )
+            else:
+                records.append(encode_event(ids[EventType.LINE], thread_id))
+        records.append(encode_event(max(self.mapping.mapping) + 1, 1))
+        path = os.path.join(self.TEST_DIR, "EVENTS_PATH_scanned")
+        with open(path, "wb") as fp:
+            fp.write(b"".join(records))
+        loaded = list()
+        for bulk in (False, True):
+            with EventFile(
+                path, 0, self.mapping, thread_support=True, bulk=bulk
+            ) as event_file:
+                loaded.append(list(event_file.load()))
+        stream, bulk = loaded
+        self.assertEqual(len(records) - 1, len(stream))
+        self.assertEqual([repr(e) for e in stream], [repr(e) for e in bulk])
+        self.assertEqual([e.thread_id for e in stream], [e.thread_id for e in bulk])
+        self.assertEqual(
+            [e.value for e in stream if e.event_type == EventType.DEF],
+            [e.value for e in bulk if e.event_type == EventType.DEF],
+        )
+
+    @parameterized.expand([("zlib", Codec.ZLIB), ("lzma", Codec.LZMA)])
+    def test_compressed(self, name, codec):
+        compressed_path = os.path.join(self.TEST_DIR, f"EVENTS_PATH_{name}")
+        with (
+            open(self.path, "rb") as source,
+            CompressedWriter(
+                open(compressed_path, "wb"), codec=codec, block_size=13
+            ) as writer,
+        ):
+            shutil.copyfileobj(source, writer)
+        expected = [repr(e) for e in self._load(bulk=False)]
+        for bulk in (True, False):
+            with EventFile(compressed_path, 0, self.mapping, bulk=bulk) as event_file:
+                self.assertTrue(event_file.compressed)
+                self.assertEqual(expected, [repr(e) for e in event_file.load()])
+
+    def test_store(self):
+        store_path = os.path.join(self.TEST_DIR, "store")
+        event_files = [
+            EventFile(self.path, 0, self.mapping, failing=True),
+            EventFile(self.path, 1, self.mapping),
+        ]
+        compact(event_files, store_path)
+        self.assertTrue(EventStore.is_store(store_path))
+        store = EventStore(store_path)
+        self.assertEqual(2, len(store.runs))
+        stream = self._load(bulk=False)
+        for event_file, failing in zip(
+            store.get_event_files(IDGenerator(), self.mapping), [True, False]
+        ):
+            self.assertEqual(failing, event_file.failing)
+            with event_file:
+                events = list(event_file.load())
+            self.assertEqual(len(stream), len(events))
+            for expected, actual in zip(stream, events):
+                self.assertEqual(repr(expected), repr(actual))
+
+
+class RunLengthTest(BaseTest):
+    def _run(self, events: str):
+        config = Config.create(
+            path=os.path.join(self.TEST_RESOURCES, self.TEST_LOOP),
+            language="python",
+            events=events,
+            working=self.TEST_DIR,
+        )
+        instrument_config(config)
+        subprocess.run([self.PYTHON, self.ACCESS, ""], cwd=self.TEST_DIR)
+        return EventMapping.load(config), os.path.join(self.TEST_DIR, self.TEST_PATH)
+
+    @staticmethod
+    def _get_hits(analysis, event_file):
+        return sorted(
+            (str(a), str(getattr(a, "evaluate_hit", None)), str(a.hits[event_file]))
+            for a in analysis
+        )
+
+    @staticmethod
+    def _get_coverage(matrix):
+        return sorted(
+            (str(obj), str(getattr(obj, "evaluate_hit", None)), matrix.column(index))
+            for index, obj in enumerate(matrix.objects)
+        )
+
+    @parameterized.expand([("line", "line"), ("loop", "loop_begin,loop_hit,loop_end")])
+    def test_runs(self, _, events):
+        mapping, path = self._run(events)
+        with EventFile(path, 0, mapping, bulk=False) as event_file:
+            expected = [repr(e) for e in event_file.load()]
+        for bulk in (True, False):
+            with EventFile(path, 0, mapping, bulk=bulk) as event_file:
+                runs = list(event_file.load_runs())
+            self.assertLess(len(runs), len(expected))
+            self.assertEqual(len(expected), sum(repeat for _, repeat in runs))
+            self.assertEqual(
+                expected, [repr(e) for e, repeat in runs for _ in range(repeat)]
+            )
+
+        store_path = os.path.join(self.TEST_DIR, f"store_{_}")
+        store = compact([EventFile(path, 0, mapping)], store_path)
+        self.assertLess(len(store), len(expected))
+        (event_file,) = store.get_event_files(IDGenerator(), mapping)
+        with event_file:
+            self.assertEqual(expected, [repr(e) for e in event_file.load()])
+
+    @parameterized.expand([("line", "line"), ("loop", "loop_begin,loop_hit,loop_end")])
+    def test_repeated_hits(self, _, events):
+        mapping, path = self._run(events)
+        event_file = EventFile(path, 0, mapping, failing=True)
+        model = Model(CombinationFactory([LineFactory(), LoopFactory()]))
+        model.prepare(event_file)
+        with event_file:
+            for e in event_file.load():
+                e.handle(model, event_file)
+        analyzer = Analyzer(
+            [event_file],
+            [],
+            CombinationFactory([LineFactory(), LoopFactory()]),
+            parallel=True,
+        )
+        analyzer.analyze()
+        self.assertGreater(len(model.get_analysis()), 0)
+        self.assertEqual(
+            self._get_hits(model.get_analysis(), event_file),
+            self._get_hits(analyzer.get_analysis(), event_file),
+        )
+        # the recorded observations equal those of the hits
+        analyzer = Analyzer(
+            [event_file], [], CombinationFactory([LineFactory(), LoopFactory()])
+        )
+        analyzer.analyze()
+        self.assertIsNotNone(analyzer.model.recorder)
+        self.assertEqual(
+            self._get_coverage(model.get_matrix([event_file])),
+            self._get_coverage(analyzer.model.matrix),
+        )
+
+
+class MappingCacheTest(BaseTest):
+    def test_cache(self):
+        config = Config.create(
+            path=os.path.join(self.TEST_RESOURCES, "test_events"),
+            language="python",
+            events=BulkDecodingTest.ALL_EVENTS,
+            working=self.TEST_DIR,
+            mapping_path=self.TEST_MAPPING,
+        )
+        instrument_config(config)
+        cache_dir = Path(self.TEST_DIR, "cache")
+        with patch.object(event_mapping, "MAPPING_CACHE", cache_dir):
+            cache = get_cache_path(Path(self.TEST_MAPPING))
+            self.assertEqual(cache_dir, cache.parent)
+            if cache.exists():
+                cache.unlink()
+            expected = EventMapping.load(config)
+            self.assertTrue(cache.exists())
+            cached = EventMapping.load(config)
+            self.assertEqual(
+                [repr(e) for e in expected.sorted()],
+                [repr(e) for e in cached.sorted()],
+            )
+            for event_id, e in cached.mapping.items():
+                self.assertIs(e, cached.dense[event_id])
+            self.assertEqual(max(cached.mapping) + 1, len(cached.dense))
+
+            time.sleep(0.01)
+            with open(self.TEST_MAPPING, "w") as fp:
+                fp.write("[]")
+            self.assertEqual(0, len(EventMapping.load(config)))
+
+
 class SerializeEventsTest(BaseTest):
     @parameterized.expand(map(lambda x: (str(x), x), BaseTest.EVENTS))
     def test_serialize(self, _, e):
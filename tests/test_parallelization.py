@@ -1,14 +1,18 @@
 import os
+import pickle
 from pathlib import Path
 from typing import List
 
 from jinja2.nodes import Test
 from sflkit import Analyzer, Config, instrument_config
 from sflkit.analysis.analysis_type import AnalysisType
+from sflkit.analysis.factory import CombinationFactory, analysis_factory_mapping
+from sflkit.analysis.process import ProcessAnalyzer, IncrementalAnalyzer
 from sflkit.analysis.spectra import Spectrum
 from sflkit.analysis.suggestion import Location
 from sflkit.events.event_file import EventFile
 from sflkit.events.mapping import EventMapping
+from sflkit.events.store import compact
 from sflkit.runners import ParallelPytestRunner, RunnerType
 from sflkitlib.events.event import DefEvent, LineEvent
 from utils import BaseTest
@@ -316,3 +320,295 @@ class ParallelizationTest(BaseTest):
                             f"Event type mismatch in {test_name} thread {thread_id}: "
                             f"expected {type(expected_event)}, got {type(observed_event)}"
                         )
+
+
+class ProcessAnalyzerTest(BaseTest):
+    def test_process_analyzer(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+        analyzer = Analyzer(relevant, irrelevant, config.factory)
+        analyzer.analyze()
+        process_analyzer = ProcessAnalyzer(
+            relevant,
+            irrelevant,
+            CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            ),
+            workers=2,
+            materialize=True,
+            chunks_per_worker=1,
+        )
+        process_analyzer.analyze()
+        expected = sorted(
+            map(str, map(lambda o: o.serialize(), analyzer.get_analysis()))
+        )
+        actual = sorted(
+            map(str, map(lambda o: o.serialize(), process_analyzer.get_analysis()))
+        )
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(expected, actual)
+        self.assertEqual(
+            {str(o) for o in analyzer.get_coverage(AnalysisType.LINE)},
+            {str(o) for o in process_analyzer.get_coverage(AnalysisType.LINE)},
+        )
+
+    def test_process_analyzer_store(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error",
+            "line,branch,function,def_use,scalar_pair",
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["1", "2", "3"]],
+        )
+        store_path = os.path.join(self.TEST_DIR, "store")
+        compact(relevant + irrelevant, store_path)
+        analyzer = Analyzer.from_store(
+            store_path, relevant[0].mapping, config.factory, workers=2
+        )
+        analyzer.analyze()
+        # the event files were entered, such that the store has been mapped
+        store = analyzer.relevant_event_files[0].store
+        self.assertIsNone(store.columns)
+        self.assertEqual(0, store.users)
+        process_analyzer = ProcessAnalyzer(
+            analyzer.relevant_event_files,
+            analyzer.irrelevant_event_files,
+            CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            ),
+            workers=2,
+            chunks_per_worker=1,
+        )
+        store.open()
+        try:
+            process_analyzer.analyze()
+        finally:
+            store.close()
+        expected = sorted(
+            map(str, map(lambda o: o.serialize(), analyzer.get_analysis()))
+        )
+        actual = sorted(
+            map(str, map(lambda o: o.serialize(), process_analyzer.get_analysis()))
+        )
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(expected, actual)
+
+
+class StreamingAnalysisTest(BaseTest):
+    def test_streaming(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+        analyzer = Analyzer(relevant, irrelevant, config.factory)
+        analyzer.analyze()
+        streaming_analyzer = Analyzer(
+            relevant,
+            irrelevant,
+            CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            ),
+            streaming=True,
+        )
+        streaming_analyzer.analyze()
+        expected = sorted(
+            map(str, map(lambda o: o.serialize(), analyzer.get_analysis()))
+        )
+        actual = sorted(
+            map(
+                str,
+                map(lambda o: o.serialize(), streaming_analyzer.get_analysis()),
+            )
+        )
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(expected, actual)
+        for obj in streaming_analyzer.get_analysis():
+            self.assertEqual(dict(), obj.hits)
+            self.assertEqual(dict(), obj.last_evaluation)
+        self.assertEqual(dict(), streaming_analyzer.model.variables)
+        self.assertEqual(dict(), streaming_analyzer.model.returns)
+        self.assertEqual(dict(), streaming_analyzer.model.touched)
+
+    def test_discard(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error",
+            "line,branch,scalar_pair",
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"]],
+        )
+
+        def broken(event_file: EventFile):
+            with event_file:
+                for i, run in enumerate(event_file.load_runs()):
+                    if i == 10:
+                        raise ValueError("broken")
+                    yield run
+
+        for options in ({}, {"streaming": True}, {"parallel": True}):
+            analyzer = Analyzer(
+                relevant,
+                irrelevant,
+                CombinationFactory(
+                    [analysis_factory_mapping[p]() for p in config.predicates]
+                ),
+                **options,
+            )
+            with self.assertRaises(ValueError):
+                analyzer.analyze_runs(relevant[0], broken(relevant[0]))
+            self.assertEqual(dict(), analyzer.model.variables)
+            self.assertEqual(dict(), analyzer.model.returns)
+            self.assertEqual(dict(), analyzer.model.touched)
+            if analyzer.model.recorder is not None:
+                self.assertEqual(dict(), analyzer.model.recorder.buffers)
+                self.assertEqual([], analyzer.model.recorder.runs)
+            else:
+                for obj in analyzer.get_analysis():
+                    self.assertNotIn(relevant[0], obj.hits)
+
+
+class IncrementalAnalyzerTest(BaseTest):
+    @staticmethod
+    def serialize(analyzer: Analyzer) -> List[str]:
+        # recomputed metrics may be floats where fresh ones are ints
+        return sorted(
+            str(
+                {
+                    key: float(value) if isinstance(value, (int, float)) else value
+                    for key, value in o.serialize().items()
+                }
+            )
+            for o in analyzer.get_analysis()
+        )
+
+    def test_incremental(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+
+        def factory():
+            return CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            )
+
+        analyzer = Analyzer(relevant, irrelevant, factory())
+        analyzer.analyze()
+
+        incremental = IncrementalAnalyzer(factory())
+        incremental.add_runs(relevant + irrelevant[:1])
+        state = os.path.join(self.TEST_DIR, "incremental.json")
+        incremental.dump_state(state)
+        incremental = IncrementalAnalyzer.load_state(state, factory())
+        incremental.add_runs(irrelevant[1:])
+        self.assertEqual(len(analyzer.get_analysis()), len(self.serialize(analyzer)))
+        self.assertGreater(len(self.serialize(analyzer)), 0)
+        self.assertEqual(self.serialize(analyzer), self.serialize(incremental))
+
+        # a rerun replaces the run with the same id
+        incremental.add_runs(irrelevant[:1])
+        self.assertEqual(self.serialize(analyzer), self.serialize(incremental))
+
+        incremental.remove_runs([irrelevant[0].run_id])
+        self.assertNotIn(irrelevant[0].run_id, incremental)
+        analyzer = Analyzer(relevant, irrelevant[1:], factory())
+        analyzer.analyze()
+        self.assertEqual(self.serialize(analyzer), self.serialize(incremental))
+        self.assertEqual(
+            [s.lines for s in analyzer.get_sorted_suggestions(self.TEST_DIR)],
+            [s.lines for s in incremental.get_sorted_suggestions(self.TEST_DIR)],
+        )
+
+    def test_remove_runs(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+
+        def factory():
+            return CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            )
+
+        incremental = IncrementalAnalyzer(factory())
+        incremental.add_runs(relevant + irrelevant)
+        # the only failing run observed the predicates that are true in it
+        incremental.remove_runs([relevant[0].run_id])
+        analyzer = Analyzer(list(), irrelevant, factory())
+        analyzer.analyze()
+        self.assertGreater(len(self.serialize(analyzer)), 0)
+        self.assertEqual(self.serialize(analyzer), self.serialize(incremental))
+
+
+class AnalysisTableTest(BaseTest):
+    def test_table(self):
+        config, relevant, irrelevant = self.run_analysis_event_files(
+            self.TEST_SUGGESTIONS,
+            "line,branch,def,use,function_enter,function_exit,function_error,"
+            "condition,loop_begin,loop_hit,loop_end,len",
+            ",".join(analysis_type.name.lower() for analysis_type in AnalysisType),
+            relevant=[["2", "1", "3"]],
+            irrelevant=[["3", "2", "1"], ["3", "1", "2"], ["1", "2", "3"]],
+        )
+        analyzer = Analyzer(relevant, irrelevant, config.factory)
+        analyzer.analyze()
+        table_analyzer = Analyzer(
+            relevant,
+            irrelevant,
+            CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            ),
+            table=True,
+        )
+        # the objects are bound as soon as the run that hit them first is finished
+        partial_analyzer = Analyzer(
+            relevant,
+            irrelevant,
+            CombinationFactory(
+                [analysis_factory_mapping[p]() for p in config.predicates]
+            ),
+            table=True,
+        )
+        partial_analyzer._analyze(relevant[0])
+        objects = partial_analyzer.model.get_analysis()
+        self.assertGreater(len(objects), 0)
+        for obj in objects:
+            self.assertIs(partial_analyzer.model.table, obj._table)
+            self.assertFalse(hasattr(obj, "_passed"))
+            for name in obj.RUNS:
+                self.assertFalse(hasattr(obj, name))
+        table_analyzer.analyze()
+        expected = {obj: obj.serialize() for obj in analyzer.get_analysis()}
+        self.assertGreater(len(expected), 0)
+        # every recorded object has a row, including equal objects of a factory
+        self.assertGreaterEqual(len(table_analyzer.model.table), len(expected))
+        for obj in table_analyzer.get_analysis():
+            self.assertIs(table_analyzer.model.table, obj._table)
+            self.assertFalse(hasattr(obj, "_passed"))
+            self.assertEqual(expected[obj], obj.serialize())
+            # a copy of a bound object is detached from the table
+            copy = pickle.loads(pickle.dumps(obj))
+            self.assertIsNone(copy._table)
+            self.assertEqual(expected[obj], copy.serialize())
+        self.assertEqual(
+            [s.lines for s in analyzer.get_sorted_suggestions(self.TEST_DIR)],
+            [s.lines for s in table_analyzer.get_sorted_suggestions(self.TEST_DIR)],
+        )
@@ -4,9 +4,12 @@ from unittest.mock import patch, MagicMock
 
 from sflkit import Config, instrument_config, Analyzer
 from sflkit.analysis.analysis_type import AnalysisType
+from sflkit.analysis.factory import LineFactory
 from sflkit.analysis.suggestion import Location
+from sflkit.events.compression import is_compressed
 from sflkit.events.mapping import EventMapping
 from sflkit.events.event_file import EventFile
+from sflkit.runners.collector import EventCollector
 from sflkit.runners.run import (
     PytestRunner,
     InputRunner,
@@ -117,6 +120,152 @@ class RunnerTests(BaseTest):
         self.assertEqual(1, len(suggestions[-1].lines))
         self.assertEqual(Location("main.py", 10), suggestions[-1].lines[0])
 
+    def test_input_runner_compression(self):
+        config = Config.create(
+            path=os.path.join(self.TEST_RESOURCES, BaseTest.TEST_SUGGESTIONS),
+            language="python",
+            events="line",
+            predicates="line",
+            working=BaseTest.TEST_DIR,
+            exclude="tests",
+            mapping_path=BaseTest.TEST_MAPPING,
+        )
+        instrument_config(config)
+        for compress_events in (False, True):
+            runner = InputRunner(
+                "main.py",
+                failing=[["2", "1", "3"]],
+                passing=[["3", "2", "1"], ["3", "1", "2"]],
+                compression="zlib",
+                compress_events=compress_events,
+            )
+            output = Path(BaseTest.TEST_DIR, "events").absolute()
+            runner.run(Path(BaseTest.TEST_DIR), output)
+            failing = output / "failing" / os.listdir(output / "failing")[0]
+            # the python subject writes its events uncompressed
+            with open(failing, "rb") as fp:
+                self.assertEqual(compress_events, is_compressed(fp))
+        mapping = EventMapping.load(config)
+        analyzer = Analyzer(
+            [EventFile(failing, 0, mapping, failing=True)],
+            [
+                EventFile(output / "passing" / path, run_id, mapping)
+                for run_id, path in enumerate(os.listdir(output / "passing"), start=1)
+            ],
+            config.factory,
+        )
+        analyzer.analyze()
+        predicates = analyzer.get_analysis_by_type(AnalysisType.LINE)
+        suggestions = sorted(map(lambda p: p.get_suggestion(), predicates))
+        self.assertEqual(1, suggestions[-1].suspiciousness)
+        self.assertEqual(1, len(suggestions[-1].lines))
+        self.assertEqual(Location("main.py", 10), suggestions[-1].lines[0])
+
+    def test_input_runner_collector(self):
+        config = Config.create(
+            path=os.path.join(self.TEST_RESOURCES, BaseTest.TEST_SUGGESTIONS),
+            language="python",
+            events="line",
+            predicates="line",
+            working=BaseTest.TEST_DIR,
+            exclude="tests",
+            mapping_path=BaseTest.TEST_MAPPING,
+        )
+        instrument_config(config)
+        mapping = EventMapping.load(config)
+        collector = EventCollector(mapping, config.factory, keep_events=True)
+        runner = InputRunner(
+            "main.py",
+            failing=[["2", "1", "3"]],
+            passing=[["3", "2", "1"], ["3", "1", "2"]],
+            compression="zlib",
+            collector=collector,
+        )
+        output = Path(BaseTest.TEST_DIR, "events").absolute()
+        runner.run(Path(BaseTest.TEST_DIR), output)
+        self.assertEqual(1, len(runner.failing_tests))
+        self.assertEqual(2, len(runner.passing_tests))
+        self.assertFalse(Path(BaseTest.TEST_DIR, "EVENTS_PATH").exists())
+        analyzer = collector.finalize()
+        self.assertEqual(1, len(analyzer.relevant_event_files))
+        self.assertEqual(2, len(analyzer.irrelevant_event_files))
+        for event_file in (
+            analyzer.relevant_event_files + analyzer.irrelevant_event_files
+        ):
+            self.assertPathExists(event_file.path)
+            # the collector compresses the kept events while copying them
+            with open(event_file.path, "rb") as fp:
+                self.assertTrue(is_compressed(fp))
+        expected = Analyzer(
+            analyzer.relevant_event_files,
+            analyzer.irrelevant_event_files,
+            LineFactory(),
+        )
+        expected.analyze()
+        self.assertEqual(
+            sorted(str(o.serialize()) for o in expected.get_analysis()),
+            sorted(str(o.serialize()) for o in analyzer.get_analysis()),
+        )
+        predicates = analyzer.get_analysis_by_type(AnalysisType.LINE)
+        suggestions = sorted(map(lambda p: p.get_suggestion(), predicates))
+        self.assertEqual(1, suggestions[-1].suspiciousness)
+        self.assertEqual(1, len(suggestions[-1].lines))
+        self.assertEqual(Location("main.py", 10), suggestions[-1].lines[0])
+
+    def test_input_runner_collector_error(self):
+        config = Config.create(
+            path=os.path.join(self.TEST_RESOURCES, BaseTest.TEST_SUGGESTIONS),
+            language="python",
+            events="line",
+            predicates="line",
+            working=BaseTest.TEST_DIR,
+            exclude="tests",
+            mapping_path=BaseTest.TEST_MAPPING,
+        )
+        instrument_config(config)
+        mapping = EventMapping.load(config)
+
+        class BrokenFactory(LineFactory):
+            # the analysis of the first run fails after a few events
+            def __init__(self):
+                super().__init__()
+                self.events = 0
+
+            def handle(self, event, event_file, scope=None):
+                if event_file.run_id == 1:
+                    self.events += 1
+                    if self.events > 3:
+                        raise ValueError("broken")
+                return super().handle(event, event_file, scope=scope)
+
+        collector = EventCollector(mapping, BrokenFactory(), keep_events=True)
+        runner = InputRunner(
+            "main.py",
+            failing=[["2", "1", "3"]],
+            passing=[["3", "2", "1"], ["3", "1", "2"]],
+            collector=collector,
+        )
+        output = Path(BaseTest.TEST_DIR, "events").absolute()
+        runner.run(Path(BaseTest.TEST_DIR), output)
+        self.assertEqual(1, len(runner.failing_tests))
+        self.assertEqual(2, len(runner.passing_tests))
+        analyzer = collector.finalize()
+        event_files = analyzer.relevant_event_files + analyzer.irrelevant_event_files
+        self.assertEqual(2, len(event_files))
+        self.assertNotIn(1, {event_file.run_id for event_file in event_files})
+        self.assertNotIn(1, analyzer.paths)
+        self.assertFalse(analyzer.model.recorder.buffers)
+        expected = Analyzer(
+            analyzer.relevant_event_files,
+            analyzer.irrelevant_event_files,
+            LineFactory(),
+        )
+        expected.analyze()
+        self.assertEqual(
+            sorted(str(o.serialize()) for o in expected.get_analysis()),
+            sorted(str(o.serialize()) for o in analyzer.get_analysis()),
+        )
+
     def test_parse_and_paths(self):
         collect = (
             "\n"
@@ -41,3 +41,54 @@ class TestScope(unittest.TestCase):
         self.assertIn("y", all_vars)
         self.assertEqual(all_vars["x"].value, 10)
         self.assertEqual(all_vars["y"].value, 20)
+
+    def test_scope_shadowing(self):
+        parent_scope = Scope()
+        parent_scope.add("x", 10, "int")
+        child_scope = parent_scope.enter()
+        child_scope.add("x", 20, "int")
+        self.assertEqual(20, child_scope.value("x"))
+        self.assertEqual(1, len(child_scope.get_all_vars()))
+        self.assertIs(parent_scope, child_scope.exit())
+        self.assertEqual(10, parent_scope.value("x"))
+
+    def test_scope_open_children(self):
+        parent_scope = Scope()
+        child_scope = parent_scope.enter()
+        child_scope.add("x", 20, "int")
+        parent_scope.add("x", 10, "int")
+        parent_scope.add("y", 30, "int")
+        self.assertEqual(20, child_scope.value("x"))
+        self.assertEqual(30, child_scope.value("y"))
+
+    def test_scope_deep(self):
+        scope = Scope()
+        for i in range(10000):
+            scope = scope.enter()
+            scope.add("n", i, "int")
+            scope.add(f"v{i % 10}", i, "int")
+        self.assertEqual(11, len(scope.get_all_vars()))
+        self.assertEqual(9999, scope.value("n"))
+        self.assertEqual(9990, scope.value("v0"))
+        for i in range(10000):
+            scope = scope.exit()
+        self.assertIsNone(scope.parent)
+        self.assertEqual(0, len(scope.get_all_vars()))
+
+    def test_scope_deep_open_children(self):
+        root = Scope()
+        root.add("g", 0, "int")
+        scope = root
+        for i in range(5000):
+            scope = scope.enter()
+            scope.add("n", i, "int")
+        self.assertEqual(0, scope.value("g"))
+        root.add("g", 1, "int")
+        root.add("h", 2, "int")
+        self.assertEqual(1, scope.value("g"))
+        self.assertEqual(2, scope.value("h"))
+        self.assertEqual(3, len(scope.get_all_vars()))
+        scope.add("g", 3, "int")
+        self.assertEqual(3, scope.value("g"))
+        self.assertEqual(1, scope.parent.value("g"))
+        self.assertEqual({"n", "g"}, set(scope.variables))
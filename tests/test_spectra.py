@@ -1,10 +1,13 @@
+import itertools
 import unittest
 
 from parameterized import parameterized
 from sflkitlib.events.event import LineEvent
 
 from sflkit.analysis import similarity
-from sflkit.analysis.spectra import Line
+from sflkit.analysis.analyzer import Analyzer
+from sflkit.analysis.spectra import Line, Spectrum, DummySpectrum
+from sflkit.model.model import MetaModel
 from utils import BaseTest
 
 
@@ -94,6 +97,42 @@ class TestSimilarityCoefficient(BaseTest):
         )
 
 
+class TestVectorizedCoefficients(unittest.TestCase):
+    @parameterized.expand(similarity.similarity_coefficients)
+    def test_coefficient(self, metric):
+        grid = list(itertools.product(range(4), repeat=4))
+        spectra = [DummySpectrum("", 0, po, pn, fo, fn) for fo, fn, po, pn in grid]
+        for spectrum, weight in zip(spectra, itertools.cycle([0.5, 1, 2])):
+            spectrum.weight = weight
+        for use_weight in (False, True):
+            expected = [
+                spectrum.get_metric(getattr(Spectrum, metric), use_weight=use_weight)
+                for spectrum in spectra
+            ]
+            actual = similarity.get_metrics(
+                spectra, getattr(Spectrum, metric), use_weight=use_weight
+            )
+            for counts, e, a in zip(grid, expected, actual.tolist()):
+                self.assertAlmostEqual(e, a, msg=f"{metric}{counts}", delta=0.00001)
+
+    def test_assigned_suspiciousness(self):
+        lines = [Line(LineEvent("main.py", i, i)) for i in range(4)]
+        for line, (fo, po) in zip(lines, [(1, 0), (1, 1), (0, 1), (0, 0)]):
+            line.failed_observed, line.failed_not_observed = fo, 1 - fo
+            line.passed_observed, line.passed_not_observed = po, 1 - po
+            line.failed, line.passed = 1, 1
+        analyzer = Analyzer(meta_model=MetaModel(set(lines)))
+        analyzer.get_sorted_suggestions_from_analysis("", lines, Spectrum.Ochiai)
+        for line in lines:
+            self.assertEqual(line.get_metric(Spectrum.Ochiai), line.suspiciousness)
+        self.assertEqual(lines[0], max(lines))
+
+    def test_not_vectorized(self):
+        line = Line(LineEvent("main.py", 1, 0))
+        self.assertIsNone(similarity.get_metrics([line], lambda s: 1))
+        self.assertIsNotNone(similarity.get_metrics([line]))
+
+
 class TestComparison(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
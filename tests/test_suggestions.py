@@ -1,10 +1,27 @@
 import os
 import json
+import time
 from os.path import join
+from pathlib import Path
+from unittest.mock import patch
 
 from sflkit.analysis.analysis_type import AnalysisType
+from sflkit.analysis.predicate import Predicate
 from sflkit.analysis.spectra import Spectrum
 from sflkit.analysis.suggestion import Location, Suggestion
+from sflkit.language import finder
+from sflkit.language.finder import LocationIndex
+from sflkit.language.java.finder import (
+    JavaFunctionFinder,
+    JavaLoopFinder,
+    JavaBranchFinder,
+)
+from sflkit.language.python.finder import (
+    PythonLocationIndex,
+    PythonFunctionFinder,
+    PythonLoopFinder,
+    PythonBranchFinder,
+)
 from utils import BaseTest
 
 
@@ -85,6 +102,42 @@ class SuggestionsFromPredicatesTest(BaseTest):
         self.assertEqual(3, len(suggestions[0].lines))
         self.assertIn(Location("main.py", 10), suggestions[0].lines)
 
+    def test_top_suggestions(self):
+        for types, metrics in [
+            (
+                [AnalysisType.LINE, AnalysisType.BRANCH, AnalysisType.DEF_USE],
+                [None, Spectrum.Ochiai, Spectrum.Tarantula],
+            ),
+            ([AnalysisType.BRANCH], [Predicate.IncreaseFalse]),
+        ]:
+            # unlike get_sorted_suggestions, the objects are not modified
+            suspiciousness = {
+                obj: obj.suspiciousness for obj in self.analyzer.get_analysis()
+            }
+            top = self.analyzer.get_top_suggestions(
+                self.original_dir, metrics, types, k=None
+            )
+            self.assertEqual(
+                suspiciousness,
+                {obj: obj.suspiciousness for obj in self.analyzer.get_analysis()},
+            )
+            for type_ in types:
+                for metric in metrics:
+                    expected = self.analyzer.get_sorted_suggestions(
+                        self.original_dir, metric, type_
+                    )
+                    self.assertEqual(
+                        [(s.suspiciousness, set(s.lines)) for s in expected],
+                        [(s.suspiciousness, set(s.lines)) for s in top[type_][metric]],
+                    )
+        top = self.analyzer.get_top_suggestions(self.original_dir, k=1)
+        self.assertEqual([None], list(top))
+        self.assertEqual(1, len(top[None][None]))
+        self.assertEqual(
+            self.analyzer.get_sorted_suggestions(self.original_dir)[0].lines,
+            top[None][None][0].lines,
+        )
+
 
 class SuggestionsFromPredicatesTest2(BaseTest):
     @classmethod
@@ -337,3 +390,94 @@ class SuggestionsFromPredicatesFunctionErrorTest(BaseTest):
         self.assertEqual(5, len(suggestions[1].lines))
         for i in range(11, 16):
             self.assertIn(Location("main.py", i), suggestions[1].lines)
+
+
+class LocationIndexTest(BaseTest):
+    PYTHON_SOURCE = """def f(x):
+    if x > 0:
+        return 1
+    else:
+        while x < 0:
+            x += 1
+    return x
+"""
+
+    JAVA_SOURCE = """class A {
+  int f(int x) {
+    if (x > 0) {
+      return 1;
+    } else {
+      while (x < 0) { x++; }
+    }
+    return x;
+  }
+}
+"""
+
+    def setUp(self):
+        LocationIndex.clear()
+        os.makedirs(self.TEST_DIR, exist_ok=True)
+        self.python_file = os.path.join(self.TEST_DIR, "index.py")
+        with open(self.python_file, "w") as fp:
+            fp.write(self.PYTHON_SOURCE)
+        self.java_file = os.path.join(self.TEST_DIR, "A.java")
+        with open(self.java_file, "w") as fp:
+            fp.write(self.JAVA_SOURCE)
+
+    def test_python_finders(self):
+        self.assertEqual(
+            list(range(1, 8)),
+            PythonFunctionFinder("index.py", 1, "f").get_locations(self.TEST_DIR),
+        )
+        self.assertEqual(
+            [1], PythonFunctionFinder("index.py", 1, "g").get_locations(self.TEST_DIR)
+        )
+        self.assertEqual(
+            [5, 6], PythonLoopFinder("index.py", 5).get_locations(self.TEST_DIR)
+        )
+        self.assertEqual(
+            [2, 3], PythonBranchFinder("index.py", 2, True).get_locations(self.TEST_DIR)
+        )
+        self.assertEqual(
+            [2, 5, 6],
+            PythonBranchFinder("index.py", 2, False).get_locations(self.TEST_DIR),
+        )
+
+    def test_java_finders(self):
+        self.assertEqual(
+            list(range(2, 10)),
+            JavaFunctionFinder("A.java", 2, "f").get_locations(self.TEST_DIR),
+        )
+        self.assertEqual([6], JavaLoopFinder("A.java", 6).get_locations(self.TEST_DIR))
+        self.assertEqual(
+            [3, 4, 5], JavaBranchFinder("A.java", 3, True).get_locations(self.TEST_DIR)
+        )
+        self.assertEqual(
+            [3, 5, 6, 7],
+            JavaBranchFinder("A.java", 3, False).get_locations(self.TEST_DIR),
+        )
+
+    def test_index_cache(self):
+        index = PythonLocationIndex.get_index(self.python_file)
+        self.assertIs(index, PythonLocationIndex.get_index(self.python_file))
+        time.sleep(0.01)
+        with open(self.python_file, "w") as fp:
+            fp.write("\n" + self.PYTHON_SOURCE)
+        changed = PythonLocationIndex.get_index(self.python_file)
+        self.assertIsNot(index, changed)
+        self.assertEqual(
+            {2, 3, 4, 5, 6, 7, 8}, changed.get(LocationIndex.FUNCTION, 2, "f")
+        )
+
+    def test_disk_cache(self):
+        cache_dir = Path(self.TEST_DIR, "locations")
+        with (
+            patch.object(finder, "LOCATIONS_CACHE_PATH", cache_dir),
+            patch.dict(os.environ, {finder.LOCATIONS_CACHE: "1"}),
+        ):
+            index = PythonLocationIndex.get_index(self.python_file)
+            self.assertEqual(1, len(list(cache_dir.iterdir())))
+            LocationIndex.clear()
+            with patch.object(PythonLocationIndex, "parse", side_effect=AssertionError):
+                cached = PythonLocationIndex.get_index(self.python_file)
+            self.assertEqual(index.locations, cached.locations)